@@ -0,0 +1,88 @@
+"""
+Checks the import time of helpinghand against a budget.
+
+Every statement is run in a fresh interpreter `--repeat` times and the fastest run
+counts, which is the least noisy estimate of the time the imports themselves take.
+Exits with 1 if a statement is over its budget or fails.
+
+	python benchmarks/import_time.py [--repeat 5] [--scale 1.0]
+"""
+import argparse
+import statistics
+import subprocess
+import sys
+import typing
+
+# statement -> budget in seconds, measured without interpreter start up
+IMPORT_BUDGETS: typing.Dict[str, float] = {
+	# must not import tequila, pytket, psi4 or pyscf
+	"import helpinghand": 0.05,
+	"from helpinghand import JsonLinesRecorder": 0.1,
+	# dominated by importing tequila
+	"from helpinghand import compute": 5.0,
+	"from helpinghand import CircuitAnalytics": 5.0,
+}
+
+# modules that must not be imported by the statements that stay light
+HEAVY_MODULES: typing.List[str] = ["tequila", "pytket", "psi4", "pyscf"]
+LIGHT_STATEMENTS: typing.List[str] = [
+	"import helpinghand",
+	"from helpinghand import JsonLinesRecorder",
+]
+
+_PROGRAM = """
+import sys, time
+start = time.perf_counter()
+exec({statement!r})
+duration = time.perf_counter() - start
+print(duration, ",".join(m for m in {heavy!r} if m in sys.modules))
+"""
+
+
+class StatementFailed(Exception):
+	"""The statement raised, the message is the last line of its stderr."""
+
+
+def measure(statement: str) -> typing.Tuple[float, typing.List[str]]:
+	"""Seconds the statement takes in a new interpreter and the heavy modules it imported."""
+	process = subprocess.run(
+		[sys.executable, "-c", _PROGRAM.format(statement=statement, heavy=HEAVY_MODULES)],
+		capture_output=True,
+		text=True
+	)
+	if process.returncode != 0:
+		lines = process.stderr.strip().splitlines()
+		raise StatementFailed(lines[-1] if lines else f"exit code {process.returncode}")
+	output = process.stdout.split()
+	return float(output[0]), output[1].split(",") if len(output) > 1 else []
+
+
+def main() -> int:
+	parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+	parser.add_argument("--repeat", type=int, default=5)
+	parser.add_argument("--scale", type=float, default=1.0, help="factor for all budgets")
+	arguments = parser.parse_args()
+
+	failed = False
+	for statement, budget in IMPORT_BUDGETS.items():
+		try:
+			runs = [measure(statement) for _ in range(arguments.repeat)]
+		except StatementFailed as error:
+			failed = True
+			print(f"{'FAIL':4}  {statement:45}  {error}")
+			continue
+		durations = [duration for duration, _ in runs]
+		heavy = runs[0][1]
+		budget *= arguments.scale
+		over = min(durations) > budget or (statement in LIGHT_STATEMENTS and bool(heavy))
+		failed = failed or over
+		imports = f"  imports {', '.join(heavy)}" if heavy else ""
+		print(
+			f"{'OVER' if over else 'ok':4}  {statement:45}  min {min(durations):7.3f}s  "
+			f"median {statistics.median(durations):7.3f}s  budget {budget:6.2f}s{imports}"
+		)
+	return 1 if failed else 0
+
+
+if __name__ == "__main__":
+	sys.exit(main())
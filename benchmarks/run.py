@@ -0,0 +1,313 @@
+"""
+Benchmarks of the hot paths of helpinghand, runs offline.
+
+Every benchmark is timed `--repeat` times after a fresh setup, the fastest run and the
+median are reported. Peak memory comes from one further run under tracemalloc, so it
+covers allocations made through Python (numpy included) but not inside simulator or
+tket C++ code. Results can be saved as a baseline and later runs compared against it;
+a benchmark that is slower or uses more memory than the baseline by more than
+`--threshold` is flagged and the exit code is 1.
+
+	python benchmarks/run.py --save benchmarks/baseline.json
+	python benchmarks/run.py --compare benchmarks/baseline.json [-k ansatz] [--quick]
+"""
+import argparse
+import json
+import platform
+import statistics
+import sys
+import time
+import tracemalloc
+import typing
+
+import numpy as np
+import tequila as tq
+from tequila.circuit.compiler import Compiler
+from tequila.hamiltonian.qubit_hamiltonian import PauliString
+
+import helpinghand
+from helpinghand import architectures, hardware_ansatz, measurement_grouping
+from helpinghand.analyse.CircuitAnalyser import DEFAULT_COMPILER_ARGUMENTS
+
+# Differences below these are noise, whatever the ratio.
+MIN_TIME_DIFFERENCE: float = 1e-3
+MIN_MEMORY_DIFFERENCE: int = 256 * 1024
+
+
+class Benchmark(typing.NamedTuple):
+	name: str
+	run: typing.Callable[[typing.Any], typing.Any]
+	setup: typing.Callable[[], typing.Any]
+	# part of the --quick selection
+	quick: bool
+
+
+BENCHMARKS: typing.List[Benchmark] = []
+
+
+def benchmark(
+	name: str,
+	setup: typing.Callable[[], typing.Any] = lambda: None,
+	quick: bool = True
+) -> typing.Callable:
+	"""Registers the decorated function, which gets the return value of setup."""
+	def register(run: typing.Callable[[typing.Any], typing.Any]) -> typing.Callable:
+		BENCHMARKS.append(Benchmark(name, run, setup, quick))
+		return run
+	return register
+
+
+# approximately the jordan wigner hamiltonian of H2/sto-3g at 0.735 angstrom
+H2_HAMILTONIAN: str = (
+	"-0.0989 + 0.1712*Z(0) + 0.1712*Z(1) - 0.2223*Z(2) - 0.2223*Z(3) + 0.1686*Z(0)Z(1)"
+	" + 0.1205*Z(0)Z(2) + 0.1659*Z(0)Z(3) + 0.1659*Z(1)Z(2) + 0.1205*Z(1)Z(3) + 0.1743*Z(2)Z(3)"
+	" - 0.0453*X(0)X(1)Y(2)Y(3) + 0.0453*X(0)Y(1)Y(2)X(3) + 0.0453*Y(0)X(1)X(2)Y(3)"
+	" - 0.0453*Y(0)Y(1)X(2)X(3)"
+)
+
+
+def h2_hamiltonians(count: int) -> typing.List[tq.QubitHamiltonian]:
+	"""H2 like hamiltonians of a scan, the H2 hamiltonian with scaled coefficients."""
+	hamiltonian = tq.QubitHamiltonian.from_string(H2_HAMILTONIAN)
+	return [hamiltonian * float(scale) for scale in np.linspace(0.8, 1.2, count)]
+
+
+def lih_style_hamiltonian(
+	n_qubits: int = 6,
+	n_terms: int = 100,
+	seed: int = 0
+) -> tq.QubitHamiltonian:
+	"""
+	Random hamiltonian with the structure of a small molecule: Z and ZZ terms and
+	XXYY like four qubit terms with smaller coefficients.
+	"""
+	random = np.random.default_rng(seed)
+	paulistrings = [
+		PauliString(data={qubit: "Z"}, coeff=random.normal()) for qubit in range(n_qubits)
+	]
+	for first, second in zip(*np.triu_indices(n_qubits, 1)):
+		paulistrings.append(
+			PauliString(data={int(first): "Z", int(second): "Z"}, coeff=random.normal() / 4)
+		)
+	while len(paulistrings) < n_terms:
+		qubits = sorted(random.choice(n_qubits, size=4, replace=False).tolist())
+		paulis = random.choice(["X", "Y"], size=4)
+		paulistrings.append(PauliString(data=dict(zip(qubits, paulis)), coeff=random.normal() / 20))
+	return tq.QubitHamiltonian.from_paulistrings(paulistrings)
+
+
+def _optimizer(**kwargs):
+	return tq.minimize(method="BFGS", maxiter=20, silent=True, **kwargs)
+
+
+def _short_optimizer(**kwargs):
+	return tq.minimize(method="BFGS", maxiter=3, silent=True, **kwargs)
+
+
+@benchmark("compute/h2")
+def _compute_h2(_):
+	hamiltonian = h2_hamiltonians(1)[0]
+	return helpinghand.compute(hamiltonian, helpinghand.create_hardware_ansatz(4, 1), _optimizer, 0.1)
+
+
+@benchmark("compute_many/h2_scan")
+def _compute_many_h2(_):
+	return helpinghand.compute_many(
+		h2_hamiltonians(5), helpinghand.create_hardware_ansatz(4, 1), 0.1, _optimizer,
+		mark=False, continuation=True
+	)
+
+
+@benchmark("compute/lih_style_numpy", setup=lih_style_hamiltonian)
+def _compute_lih_style(hamiltonian):
+	return helpinghand.compute(
+		hamiltonian, helpinghand.create_hardware_ansatz(6, 1), _short_optimizer, 0.1, backend="numpy"
+	)
+
+
+@benchmark("compute/lih_style_parameter_shift", setup=lih_style_hamiltonian)
+def _compute_lih_style_parameter_shift(hamiltonian):
+	return helpinghand.compute(
+		hamiltonian, helpinghand.create_hardware_ansatz(6, 1),
+		helpinghand.ParameterShiftOptimizer(maxiter=20), 0.1, backend="numpy"
+	)
+
+
+def _grouping_setup() -> tq.QubitHamiltonian:
+	# the grouping is cached per hamiltonian structure, clear it to time the colouring
+	measurement_grouping._GROUPS.clear()
+	return lih_style_hamiltonian(n_qubits=12, n_terms=600)
+
+
+@benchmark("measurement_grouping/qwc_n12", setup=_grouping_setup)
+def _qwc_groups(hamiltonian):
+	return helpinghand.qwc_groups(hamiltonian)
+
+
+def _clear_ansatz_caches() -> None:
+	hardware_ansatz._LAYERS.clear()
+	hardware_ansatz._TEMPLATES.clear()
+
+
+def _register_ansatz(n_qubits: int, depth: int) -> None:
+	# built from scratch every time, the cached construction is timed by the warm cases
+	@benchmark(
+		f"create_hardware_ansatz/n{n_qubits}_d{depth}",
+		setup=_clear_ansatz_caches,
+		quick=n_qubits * depth <= 64
+	)
+	def run(_):
+		return helpinghand.create_hardware_ansatz(n_qubits, depth)
+
+
+for _n_qubits in (4, 8, 16, 32):
+	for _depth in (1, 4, 16):
+		_register_ansatz(_n_qubits, _depth)
+
+
+@benchmark(
+	"create_hardware_ansatz/n32_d16_warm", setup=lambda: helpinghand.create_hardware_ansatz(32, 16)
+)
+def _ansatz_warm(_):
+	return helpinghand.create_hardware_ansatz(32, 16)
+
+
+@benchmark("create_hardware_ansatz/depth_sweep_n16", setup=_clear_ansatz_caches)
+def _ansatz_depth_sweep(_):
+	return [helpinghand.create_hardware_ansatz(16, depth) for depth in range(1, 17)]
+
+
+def _register_tket(n_qubits: int, depth: int) -> None:
+	@benchmark(
+		f"tket_round_trip/n{n_qubits}_d{depth}",
+		setup=lambda: helpinghand.create_hardware_ansatz(n_qubits, depth),
+		quick=n_qubits * depth <= 256
+	)
+	def run(circuit):
+		return helpinghand.from_tket(helpinghand.to_tket(circuit))
+
+
+for _n_qubits, _depth in ((16, 16), (32, 32), (64, 32)):
+	_register_tket(_n_qubits, _depth)
+
+
+def _analytics_setup(name: str) -> typing.Callable[[], typing.Tuple[tq.QCircuit, Compiler]]:
+	def setup():
+		qubits = 16 if architectures.ARCHITECTURE_CREATORS[name][1] else None
+		n_qubits = min(architectures.architecture_info(name, qubits).n_qubits, 10)
+		return helpinghand.create_hardware_ansatz(n_qubits, 3), Compiler(**DEFAULT_COMPILER_ARGUMENTS)
+	return setup
+
+
+def _register_analytics(name: str) -> None:
+	@benchmark(f"circuit_analytics/{name}/unrouted", setup=_analytics_setup(name))
+	def unrouted(arguments):
+		return helpinghand.CircuitAnalytics(*arguments).evaluate()
+
+	@benchmark(f"circuit_analytics/{name}/routed", setup=_analytics_setup(name))
+	def routed(arguments):
+		return helpinghand.CircuitAnalytics(*arguments, architecture=name).evaluate()
+
+
+def _register_select_architecture(name: str) -> None:
+	qubits = 64 if architectures.ARCHITECTURE_CREATORS[name][1] else None
+
+	# the registry keeps every created architecture, clear it to time the creation
+	@benchmark(f"select_architecture/{name}", setup=architectures._REGISTRY.clear)
+	def run(_):
+		return helpinghand.select_architecture(name, qubits)
+
+
+for _name in architectures.ARCHITECTURE_CREATORS:
+	_register_analytics(_name)
+	_register_select_architecture(_name)
+
+
+def measure(case: Benchmark, repeat: int) -> typing.Dict[str, float]:
+	durations = []
+	for _ in range(repeat):
+		state = case.setup()
+		start = time.perf_counter()
+		case.run(state)
+		durations.append(time.perf_counter() - start)
+	state = case.setup()
+	tracemalloc.start()
+	try:
+		case.run(state)
+		_, peak = tracemalloc.get_traced_memory()
+	finally:
+		tracemalloc.stop()
+	return {"time": min(durations), "median": statistics.median(durations), "peak_memory": peak}
+
+
+def regressions(
+	result: typing.Dict[str, float],
+	baseline: typing.Dict[str, float],
+	threshold: float
+) -> typing.List[str]:
+	"""Descriptions of the ways in which result is worse than baseline."""
+	found = []
+	slower = result["time"] - baseline["time"]
+	if slower > baseline["time"] * threshold and slower > MIN_TIME_DIFFERENCE:
+		found.append(f"time x{result['time'] / baseline['time']:.2f}")
+	larger = result["peak_memory"] - baseline["peak_memory"]
+	if larger > baseline["peak_memory"] * threshold and larger > MIN_MEMORY_DIFFERENCE:
+		found.append(f"memory x{result['peak_memory'] / max(baseline['peak_memory'], 1):.2f}")
+	return found
+
+
+def main() -> int:
+	parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+	parser.add_argument("-k", dest="select", default="", help="only names containing this")
+	parser.add_argument("--quick", action="store_true", help="skip the largest sizes")
+	parser.add_argument("--repeat", type=int, default=5)
+	parser.add_argument("--save", help="write the results as baseline to this file")
+	parser.add_argument("--compare", help="baseline file to flag regressions against")
+	parser.add_argument("--threshold", type=float, default=0.25, help="allowed relative increase")
+	arguments = parser.parse_args()
+
+	baseline = {}
+	if arguments.compare:
+		with open(arguments.compare) as file:
+			baseline = json.load(file)["benchmarks"]
+
+	results: typing.Dict[str, typing.Dict[str, float]] = {}
+	flagged = 0
+	for case in BENCHMARKS:
+		if arguments.select not in case.name or (arguments.quick and not case.quick):
+			continue
+		result = measure(case, arguments.repeat)
+		results[case.name] = result
+		found = []
+		if case.name in baseline:
+			found = regressions(result, baseline[case.name], arguments.threshold)
+		flagged += bool(found)
+		print(
+			f"{case.name:48} {result['time'] * 1e3:10.2f} ms  median {result['median'] * 1e3:10.2f} ms"
+			f"  peak {result['peak_memory'] / 2 ** 20:8.2f} MiB"
+			f"{'  REGRESSION ' + ', '.join(found) if found else ''}",
+			flush=True
+		)
+
+	if arguments.save:
+		# a partial run (-k, --quick) only replaces the benchmarks it ran
+		try:
+			with open(arguments.save) as file:
+				saved = json.load(file)["benchmarks"]
+		except FileNotFoundError:
+			saved = {}
+		with open(arguments.save, "w") as file:
+			json.dump({
+				"python": sys.version.split()[0],
+				"platform": platform.platform(),
+				"tequila": tq.__version__,
+				"repeat": arguments.repeat,
+				"benchmarks": {**saved, **results},
+			}, file, indent=1)
+	if flagged:
+		print(f"{flagged} regression(s) against {arguments.compare}")
+	return 1 if flagged else 0
+
+
+if __name__ == "__main__":
+	sys.exit(main())
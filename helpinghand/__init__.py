@@ -1,20 +1,117 @@
-from helpinghand.compute import compute, compute_many
-from helpinghand.hardware_ansatz import create_hardware_ansatz
-from helpinghand.gradient import get_max_from_result, get_max_from_VQE
-from helpinghand.analyse import CircuitAnalytics, CircuitAnalyser
-
-try:
-	from helpinghand.tket import to_tket, from_tket
-	from helpinghand.architectures import select_architecture
-except ModuleNotFoundError:
-	pass
-
-try:
-	from helpinghand.psi4_helper import molecus_for_working_psi4_distances
-except ModuleNotFoundError:
-	pass
-
-try:
-	from helpinghand.pyscf_helper import pyscf_create_hamiltonians
-except ModuleNotFoundError:
-	pass
+"""
+Public names are loaded on first access, so importing helpinghand (e.g. in a worker
+process) only imports tequila, pytket, psi4 or pyscf once something that needs them is
+used. Names of optional modules whose dependencies are missing raise AttributeError
+(ImportError for `from helpinghand import ...`) and are left out of __all__ and dir(),
+as if they were not defined.
+
+The "numpy" simulator is registered with tequila when helpinghand.statevector is
+imported, which compute, get_max_from_VQE and ObjectiveCache do themselves.
+"""
+import importlib
+import importlib.util
+import sys
+import types
+import typing
+
+# public name -> (module, attribute), attribute None for the module itself
+_ATTRIBUTES: typing.Dict[str, typing.Tuple[str, typing.Optional[str]]] = {
+	"compute": ("helpinghand.compute", "compute"),
+	"compute_many": ("helpinghand.compute", "compute_many"),
+	"compute_stream": ("helpinghand.compute", "compute_stream"),
+	"statevector": ("helpinghand.statevector", None),
+	"instrumentation": ("helpinghand.instrumentation", None),
+	"JsonLinesRecorder": ("helpinghand.instrumentation", "JsonLinesRecorder"),
+	"ParameterShiftGradient": ("helpinghand.parameter_shift", "ParameterShiftGradient"),
+	"ParameterShiftOptimizer": ("helpinghand.parameter_shift", "ParameterShiftOptimizer"),
+	"GradientVarianceSampler": ("helpinghand.gradient_variance", "GradientVarianceSampler"),
+	"scan_gradient_variance": ("helpinghand.gradient_variance", "scan_gradient_variance"),
+	"ObjectiveCache": ("helpinghand.objective_cache", "ObjectiveCache"),
+	"HamiltonianCache": ("helpinghand.hamiltonian_cache", "HamiltonianCache"),
+	"create_hardware_ansatz": ("helpinghand.hardware_ansatz", "create_hardware_ansatz"),
+	"hardware_ansatz_template": ("helpinghand.hardware_ansatz", "hardware_ansatz_template"),
+	"HardwareAnsatzTemplate": ("helpinghand.hardware_ansatz", "HardwareAnsatzTemplate"),
+	"CompactResults": ("helpinghand.results", "CompactResults"),
+	"ScanHamiltonian": ("helpinghand.scan_hamiltonian", "ScanHamiltonian"),
+	"grouped_expectation_value": ("helpinghand.measurement_grouping", "grouped_expectation_value"),
+	"qwc_groups": ("helpinghand.measurement_grouping", "qwc_groups"),
+	"get_max_from_result": ("helpinghand.gradient", "get_max_from_result"),
+	"get_max_from_VQE": ("helpinghand.gradient", "get_max_from_VQE"),
+	"CircuitAnalytics": ("helpinghand.analyse", "CircuitAnalytics"),
+	"CircuitAnalyser": ("helpinghand.analyse", "CircuitAnalyser"),
+	"CircuitMetrics": ("helpinghand.analyse", "CircuitMetrics"),
+	"SwapEstimator": ("helpinghand.analyse", "SwapEstimator"),
+}
+
+# names that are only there when their optional dependency is installed
+_OPTIONAL_ATTRIBUTES: typing.Dict[str, typing.Tuple[str, typing.Optional[str]]] = {
+	"to_tket": ("helpinghand.tket", "to_tket"),
+	"from_tket": ("helpinghand.tket", "from_tket"),
+	"TketTemplate": ("helpinghand.tket", "TketTemplate"),
+	"tket_template": ("helpinghand.tket", "tket_template"),
+	"select_architecture": ("helpinghand.architectures", "select_architecture"),
+	"architecture_info": ("helpinghand.architectures", "architecture_info"),
+	"ArchitectureInfo": ("helpinghand.architectures", "ArchitectureInfo"),
+	"molecus_for_working_psi4_distances": (
+		"helpinghand.psi4_helper", "molecus_for_working_psi4_distances"
+	),
+	"scan_psi4_distances": ("helpinghand.psi4_helper", "scan_psi4_distances"),
+	"pyscf_create_hamiltonians": ("helpinghand.pyscf_helper", "pyscf_create_hamiltonians"),
+}
+
+# optional module -> the dependency its names need
+_OPTIONAL_DEPENDENCIES: typing.Dict[str, str] = {
+	"helpinghand.tket": "pytket",
+	"helpinghand.architectures": "pytket",
+	"helpinghand.psi4_helper": "psi4",
+	"helpinghand.pyscf_helper": "pyscf",
+}
+
+
+def _available_optional_attributes() -> typing.List[str]:
+	"""Optional names whose dependency is installed, found without importing it."""
+	installed = {
+		dependency: importlib.util.find_spec(dependency) is not None
+		for dependency in set(_OPTIONAL_DEPENDENCIES.values())
+	}
+	return [
+		name for name, (module_name, _) in _OPTIONAL_ATTRIBUTES.items()
+		if installed[_OPTIONAL_DEPENDENCIES[module_name]]
+	]
+
+
+__all__ = list(_ATTRIBUTES) + _available_optional_attributes()
+
+
+def __getattr__(name: str) -> typing.Any:
+	if name in _ATTRIBUTES:
+		module_name, attribute = _ATTRIBUTES[name]
+		module = importlib.import_module(module_name)
+	elif name in _OPTIONAL_ATTRIBUTES and name in __all__:
+		module_name, attribute = _OPTIONAL_ATTRIBUTES[name]
+		try:
+			module = importlib.import_module(module_name)
+		except ModuleNotFoundError as error:
+			raise AttributeError(
+				f"module '{__name__}' has no attribute '{name}' ({error})"
+			) from error
+	else:
+		raise AttributeError(f"module '{__name__}' has no attribute '{name}'")
+	value = module if attribute is None else getattr(module, attribute)
+	globals()[name] = value
+	return value
+
+
+def __dir__() -> typing.List[str]:
+	return sorted(set(globals()) | set(__all__))
+
+
+class _Package(types.ModuleType):
+	def __setattr__(self, name: str, value: typing.Any) -> None:
+		# Importing the submodule helpinghand.compute must not hide the function compute.
+		if isinstance(value, types.ModuleType) and _ATTRIBUTES.get(name, (None, None))[1]:
+			return
+		super().__setattr__(name, value)
+
+
+sys.modules[__name__].__class__ = _Package
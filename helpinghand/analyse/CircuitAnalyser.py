@@ -1,6 +1,13 @@
 from helpinghand.analyse.CircuitAnalytics import CircuitAnalytics
 from helpinghand.architectures import select_architecture
+from helpinghand.cache import LRUCache
+from helpinghand.hashing import circuit_hash
+from concurrent.futures import ProcessPoolExecutor
+import hashlib
+import os
+import pickle
 import typing
+import uuid
 import tequila as tq
 from tequila.circuit.compiler import Compiler
 
@@ -33,14 +40,47 @@ DEFAULT_COMPILER_ARGUMENTS = {
 }
 
 
+def _analyse_pair(
+	arguments: typing.Tuple[tq.QCircuit, Compiler, typing.Optional[str]]
+) -> typing.Union[CircuitAnalytics, Exception]:
+	"""Analyses one circuit in a worker process, returning the exception instead of raising it."""
+	circuit, compiler, architecture_name = arguments
+	try:
+		architecture = None
+		if architecture_name is not None:
+			architecture = select_architecture(architecture_name, circuit.n_qubits)
+		return CircuitAnalytics(circuit, compiler, architecture).evaluate()
+	except Exception as error:
+		return error
+
+
+def architecture_key(architecture: typing.Optional[Architecture]) -> str:
+	"""Description of the coupling graph of an architecture."""
+	if architecture is None:
+		return 'none'
+	return repr(sorted(
+		(str(first), str(second)) for first, second in architecture.coupling
+	))
+
+
 class CircuitAnalyser:
-	"""Helper class to analyze circuits."""
+	"""
+	Helper class to analyze circuits.
+
+	Analytics are memoized on the structure of the circuit, the compiler settings
+	and the architecture, keeping the `cache_size` most recently used ones. With a
+	`cache_directory` they are also stored on disk and shared between sessions. Only
+	metrics that were computed are stored, they are written when the analytics are
+	asked for again and by flush().
+	"""
 	def __init__(
 		self,
 		compiler_arguments: typing.Dict[str, bool] = None,
 		compiler: Compiler = None,
 		architecture: Architecture = None,
-		qubits: int = None
+		qubits: int = None,
+		cache_size: int = 128,
+		cache_directory: str = None
 	):
 		if compiler_arguments is not None and compiler is not None:
 			raise ValueError("Give compiler_arguments or compiler, not both.")
@@ -53,6 +93,58 @@ class CircuitAnalyser:
 		if isinstance(architecture, str):
 			architecture = select_architecture(architecture, qubits)
 		self.architecture = architecture
+		self.cache: LRUCache = LRUCache(cache_size)
+		self.cache_directory: str = cache_directory
+		if cache_directory is not None:
+			os.makedirs(cache_directory, exist_ok=True)
+		# key -> attributes of the analytics when they were last stored or loaded
+		self._stored: typing.Dict[str, typing.FrozenSet[str]] = {}
+
+	def _key(self, circuit: tq.QCircuit, architecture: typing.Optional[Architecture]) -> str:
+		compiler_settings = repr(sorted(vars(self.compiler).items()))
+		description = '\n'.join([
+			circuit_hash(circuit),
+			compiler_settings,
+			architecture_key(architecture)
+		])
+		return hashlib.sha1(description.encode()).hexdigest()
+
+	def _load(self, key: str, circuit: tq.QCircuit) -> typing.Optional[CircuitAnalytics]:
+		if self.cache_directory is None:
+			return None
+		try:
+			with open(os.path.join(self.cache_directory, f'{key}.pickle'), 'rb') as file:
+				analytics: CircuitAnalytics = pickle.load(file)
+		except (OSError, EOFError, pickle.UnpicklingError):
+			return None
+		# Circuits that could not be pickled are left out, metrics that are still
+		# missing are computed from the circuit of the same key.
+		if "abstract_circuit" not in analytics.__dict__:
+			analytics.abstract_circuit = circuit
+		self._stored[key] = frozenset(analytics.__dict__)
+		return analytics
+
+	def _store(self, key: str, analytics: CircuitAnalytics) -> None:
+		"""Writes the analytics with the metrics computed so far, if there are new ones."""
+		if self.cache_directory is None or self._stored.get(key) == frozenset(analytics.__dict__):
+			return
+		path = os.path.join(self.cache_directory, f'{key}.pickle')
+		temporary_path = f'{path}.{uuid.uuid4().hex}.tmp'
+		with open(temporary_path, 'wb') as file:
+			pickle.dump(analytics, file, protocol=pickle.HIGHEST_PROTOCOL)
+		os.replace(temporary_path, path)
+		self._stored[key] = frozenset(analytics.__dict__)
+
+	def flush(self) -> None:
+		"""Writes the metrics computed since they were last stored of all memoized analytics."""
+		for key, analytics in self.cache.items():
+			self._store(key, analytics)
+
+	def __enter__(self) -> 'CircuitAnalyser':
+		return self
+
+	def __exit__(self, *args) -> None:
+		self.flush()
 
 	def __call__(
 		self,
@@ -62,15 +154,96 @@ class CircuitAnalyser:
 		if isinstance(architecture, str):
 			architecture = select_architecture(architecture, circuit.n_qubits)
 		arc = architecture if architecture else self.architecture
-		return CircuitAnalytics(circuit, self.compiler, arc)
+		key = self._key(circuit, arc)
+		analytics = self.cache.get(key)
+		if analytics is not None:
+			self._store(key, analytics)
+		else:
+			analytics = self._load(key, circuit)
+			if analytics is None:
+				analytics = CircuitAnalytics(circuit, self.compiler, arc)
+				if self.cache_directory is not None:
+					self._stored[key] = frozenset(analytics.__dict__)
+			self.cache.put(key, analytics)
+		return analytics
 
 	def info(
 		self,
 		circuit: tq.QCircuit,
 		architecture: typing.Union[Architecture, str] = None
 	) -> None:
-		if isinstance(architecture, str):
-			architecture = select_architecture(architecture, circuit.n_qubits)
 		"""Prints information about the circuit."""
-		arc = architecture if architecture else self.architecture
-		CircuitAnalytics(circuit, self.compiler, arc).info()
+		self(circuit, architecture).info()
+
+	def batch(
+		self,
+		circuits: typing.List[tq.QCircuit],
+		architectures: typing.List[typing.Optional[str]],
+		processes: int = None
+	) -> typing.List[typing.Dict[str, typing.Any]]:
+		"""
+		Analyses every circuit against every architecture name (None for no routing)
+		in a pool of `processes` worker processes. Returns one row per pair, circuit
+		major, with the failure of a pair in its 'error' column.
+		"""
+		pairs = [
+			(circuit_index, architecture_name)
+			for circuit_index in range(len(circuits))
+			for architecture_name in architectures
+		]
+		analyses: typing.Dict[typing.Tuple[int, typing.Optional[str]], typing.Any] = {}
+		keys: typing.Dict[typing.Tuple[int, typing.Optional[str]], str] = {}
+		missing = []
+		for circuit_index, architecture_name in pairs:
+			circuit = circuits[circuit_index]
+			try:
+				architecture = None
+				if architecture_name is not None:
+					architecture = select_architecture(architecture_name, circuit.n_qubits)
+			except ValueError as error:
+				analyses[(circuit_index, architecture_name)] = error
+				continue
+			key = self._key(circuit, architecture)
+			analytics = self.cache.get(key)
+			if analytics is None:
+				analytics = self._load(key, circuit)
+			if analytics is None:
+				keys[(circuit_index, architecture_name)] = key
+				missing.append((circuit_index, architecture_name))
+			else:
+				self.cache.put(key, analytics)
+				analyses[(circuit_index, architecture_name)] = analytics
+
+		if missing:
+			arguments = [
+				(circuits[circuit_index], self.compiler, architecture_name)
+				for circuit_index, architecture_name in missing
+			]
+			with ProcessPoolExecutor(max_workers=processes) as executor:
+				for pair, analytics in zip(missing, executor.map(_analyse_pair, arguments)):
+					analyses[pair] = analytics
+					if isinstance(analytics, CircuitAnalytics):
+						self._store(keys[pair], analytics)
+						self.cache.put(keys[pair], analytics)
+
+		rows: typing.List[typing.Dict[str, typing.Any]] = []
+		for circuit_index, architecture_name in pairs:
+			analytics = analyses[(circuit_index, architecture_name)]
+			row: typing.Dict[str, typing.Any] = {
+				"circuit": circuit_index,
+				"architecture": architecture_name,
+			}
+			if isinstance(analytics, CircuitAnalytics):
+				row.update({
+					"qubits": analytics.qubit_count,
+					"depth": analytics.gate_depth,
+					"gates": analytics.gate_count,
+					"parameters": analytics.parameter_count,
+					"two_qubit_gates": analytics.gate_qubit_counts.get(2, 0),
+					"gate_counts": dict(analytics.gate_counts),
+					"error": None,
+				})
+			else:
+				row["error"] = analytics
+			rows.append(row)
+		return rows
@@ -1,12 +1,16 @@
+from helpinghand import instrumentation
+from helpinghand.analyse.CircuitMetrics import CircuitArrays, CircuitMetrics
 from helpinghand.architectures import select_architecture
+from functools import cached_property
+import pickle
 import typing
 import tequila as tq
 from tequila.circuit.compiler import Compiler
-from tequila.circuit._gates_impl import QGateImpl
 from helpinghand.tket import from_tket, to_tket
 
 HAS_PYTKET = True
 try:
+	from pytket import Circuit
 	from pytket.routing import Architecture
 	from pytket.passes import DefaultMappingPass, DecomposeSwapsToCXs
 	from pytket.predicates import CompilationUnit
@@ -14,8 +18,26 @@ except ImportError:
 	HAS_PYTKET = False
 
 
+METRICS: typing.List[str] = [
+	"qubit_count",
+	"gate_depth",
+	"gate_count",
+	"parameter_count",
+	"gate_counts",
+	"gate_qubit_counts",
+	"compiled_gate_qubit_counts",
+]
+
+
 class CircuitAnalytics:
-	"""Helper for inspecting circuit analytics"""
+	"""
+	Helper for inspecting circuit analytics
+
+	Every metric is computed when it is first read and then kept. The circuit is only
+	routed to the architecture when a metric of the routed circuit is read. Metrics of
+	a routed circuit are read from the tket circuit directly, it is only converted
+	back to tequila when `circuit` is asked for.
+	"""
 	def __init__(
 		self,
 		circuit: tq.QCircuit,
@@ -23,49 +45,121 @@ class CircuitAnalytics:
 		architecture: typing.Union[Architecture, str] = None,
 	):
 		self.abstract_circuit: tq.QCircuit = circuit
+		self.compiler: Compiler = compiler
 
 		if architecture:
 			if not HAS_PYTKET:
 				raise ModuleNotFoundError(
 					"Pytket needs to be installed to use architecture when analysing circuits."
 				)
-			tket_circuit = to_tket(compiler(circuit))
 			if isinstance(architecture, str):
 				architecture = select_architecture(architecture, circuit.n_qubits)
-			mapper = DefaultMappingPass(architecture)
-			decomposer = DecomposeSwapsToCXs(architecture)
+		self.architecture: typing.Optional[Architecture] = architecture if architecture else None
+
+	@cached_property
+	def compiled_circuit(self) -> tq.QCircuit:
+		"""The compiled circuit, before routing."""
+		with instrumentation.stage("compile_circuit", gates=len(self.abstract_circuit.gates)):
+			return self.compiler(self.abstract_circuit)
+
+	@cached_property
+	def tket_circuit(self) -> typing.Optional['Circuit']:
+		"""The compiled circuit routed to the architecture, None without an architecture."""
+		if self.architecture is None:
+			return None
+		tket_circuit = to_tket(self.compiled_circuit)
+		with instrumentation.stage(
+			"route", qubits=tket_circuit.n_qubits, gates=tket_circuit.n_gates
+		) as route_stage:
+			mapper = DefaultMappingPass(self.architecture)
+			decomposer = DecomposeSwapsToCXs(self.architecture)
 			cu = CompilationUnit(tket_circuit)
 			mapper.apply(cu)
 			decomposer.apply(cu)
-			self.circuit: tq.QCircuit = from_tket(cu.circuit)
-		else:
-			self.circuit: tq.QCircuit = compiler(circuit)
-
-		self.qubit_count: int = self.circuit.n_qubits
-		self.gate_depth: int = self.circuit.depth
-		self.gate_count: int = len(self.circuit.gates)
-		self.parameter_count: int = len(
-			list(self.circuit.make_parameter_map().keys())
-		)
+			route_stage.update(routed_gates=cu.circuit.n_gates)
+		return cu.circuit
+
+	@cached_property
+	def circuit(self) -> tq.QCircuit:
+		"""The compiled circuit, routed to the architecture if there is one."""
+		if self.architecture is None:
+			return self.compiled_circuit
+		return from_tket(self.tket_circuit)
+
+	@cached_property
+	def arrays(self) -> CircuitArrays:
+		if self.architecture is None:
+			return CircuitArrays.from_tequila(self.compiled_circuit)
+		return CircuitArrays.from_tket(self.tket_circuit)
+
+	@cached_property
+	def metrics(self) -> CircuitMetrics:
+		"""Depth, 2-qubit depth, qubit busy time, critical path and layers of the circuit."""
+		return CircuitMetrics(self.arrays)
+
+	@cached_property
+	def qubit_count(self) -> int:
+		return self.arrays.n_qubits
+
+	@cached_property
+	def gate_depth(self) -> int:
+		return self.metrics.depth
+
+	@cached_property
+	def gate_count(self) -> int:
+		return len(self.arrays)
+
+	@cached_property
+	def parameter_count(self) -> int:
+		# Routing does not change the parameters, so the unrouted circuit is enough.
+		return len(list(self.compiled_circuit.make_parameter_map().keys()))
+
+	@cached_property
+	def _gate_statistics(self) -> typing.Tuple[typing.Dict[str, int], typing.Dict[int, int]]:
+		return self.arrays.gate_counts()
+
+	@cached_property
+	def gate_counts(self) -> typing.Dict[str, int]:
+		return self._gate_statistics[0]
+
+	@cached_property
+	def gate_qubit_counts(self) -> typing.Dict[int, int]:
+		return self._gate_statistics[1]
+
+	@cached_property
+	def compiled_gate_qubit_counts(self) -> typing.Dict[int, int]:
+		"""gate_qubit_counts of the circuit before routing."""
+		if self.architecture is None:
+			return self.gate_qubit_counts
+		return CircuitArrays.from_tequila(self.compiled_circuit).gate_counts()[1]
+
+	def evaluate(self) -> 'CircuitAnalytics':
+		"""Computes all metrics now, e.g. before the analytics are stored or sent elsewhere."""
+		for metric in METRICS:
+			getattr(self, metric)
+		return self
+
+	def __getstate__(self) -> typing.Dict[str, typing.Any]:
+		# Architectures can not be pickled, their coupling graph can. Circuits with
+		# parameters that can not be pickled (e.g. lambdas) are left out, computed
+		# metrics are kept.
+		state = self.__dict__.copy()
+		state.pop("tket_circuit", None)
+		for name in ("abstract_circuit", "compiled_circuit", "circuit"):
+			try:
+				pickle.dumps(state.get(name))
+			except (pickle.PicklingError, AttributeError, TypeError):
+				state.pop(name)
+		if self.architecture is not None:
+			state["architecture"] = [
+				[first.index[0], second.index[0]] for first, second in self.architecture.coupling
+			]
+		return state
 
-		self.gate_counts: typing.Dict[str, int] = {}
-		self.gate_qubit_counts: typing.Dict[int, int] = {}
-		gate: QGateImpl
-		for gate in self.circuit.gates:
-			targets: int = len(gate.target)
-			controls: int = len(gate.control)
-			qubits: int = targets + controls
-			name: str = f'{"C" * controls}{gate.name} ({qubits})'
-
-			if name in self.gate_counts:
-				self.gate_counts[name] += 1
-			else:
-				self.gate_counts[name] = 1
-
-			if qubits in self.gate_qubit_counts:
-				self.gate_qubit_counts[qubits] += 1
-			else:
-				self.gate_qubit_counts[qubits] = 1
+	def __setstate__(self, state: typing.Dict[str, typing.Any]) -> None:
+		if state.get("architecture") is not None:
+			state["architecture"] = Architecture(state["architecture"])
+		self.__dict__.update(state)
 
 	def __str__(self):
 		gate_qubit_counts: typing.List[str] = []
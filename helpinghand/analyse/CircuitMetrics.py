@@ -0,0 +1,177 @@
+import typing
+import numpy as np
+import tequila as tq
+
+HAS_PYTKET = True
+try:
+	from pytket import Circuit
+	from helpinghand.tket import TKET_TARGET_COUNTS, TKET_TO_TQ_NAMES
+except ImportError:
+	HAS_PYTKET = False
+
+
+class CircuitArrays:
+	"""
+	A circuit as arrays with one row per gate.
+
+	ops holds indices into names, targets and controls hold qubits padded with -1.
+	"""
+	def __init__(
+		self,
+		names: typing.List[str],
+		ops: np.ndarray,
+		targets: np.ndarray,
+		controls: np.ndarray,
+		n_qubits: int
+	):
+		self.names: typing.List[str] = names
+		self.ops: np.ndarray = ops
+		self.targets: np.ndarray = targets
+		self.controls: np.ndarray = controls
+		self.n_qubits: int = n_qubits
+
+	@classmethod
+	def from_gates(
+		cls,
+		gates: typing.Iterable[typing.Tuple[str, typing.Sequence[int], typing.Sequence[int]]],
+		n_qubits: int = None
+	) -> 'CircuitArrays':
+		"""Builds the arrays from (name, targets, controls) per gate."""
+		codes: typing.Dict[str, int] = {}
+		ops: typing.List[int] = []
+		target_rows: typing.List[typing.Sequence[int]] = []
+		control_rows: typing.List[typing.Sequence[int]] = []
+		for name, targets, controls in gates:
+			ops.append(codes.setdefault(name, len(codes)))
+			target_rows.append(targets)
+			control_rows.append(controls)
+		targets = _pad(target_rows)
+		controls = _pad(control_rows)
+		if n_qubits is None:
+			n_qubits = int(max(targets.max(initial=-1), controls.max(initial=-1))) + 1
+		return cls(list(codes), np.array(ops, dtype=np.int32), targets, controls, n_qubits)
+
+	@classmethod
+	def from_tequila(cls, circuit: tq.QCircuit) -> 'CircuitArrays':
+		return cls.from_gates(
+			(gate.name, gate.target, gate.control) for gate in circuit.gates
+		)
+
+	@classmethod
+	def from_tket(cls, circuit: 'Circuit') -> 'CircuitArrays':
+		"""Gates are named and split into targets and controls like from_tket does."""
+		if not HAS_PYTKET:
+			raise ModuleNotFoundError("Needed module pytket not found.")
+		gates = []
+		for command in circuit:
+			op_type = command.op.type
+			qubits = [argument.index[0] for argument in command.args]
+			split = len(qubits) - TKET_TARGET_COUNTS.get(op_type, 1)
+			name = TKET_TO_TQ_NAMES.get(op_type, op_type.name)
+			gates.append((name, qubits[split:], qubits[:split]))
+		return cls.from_gates(gates)
+
+	def __len__(self) -> int:
+		return len(self.ops)
+
+	@property
+	def qubit_counts(self) -> np.ndarray:
+		"""Number of qubits every gate acts on."""
+		return (self.targets >= 0).sum(axis=1) + (self.controls >= 0).sum(axis=1)
+
+	def gate_counts(self) -> typing.Tuple[typing.Dict[str, int], typing.Dict[int, int]]:
+		"""
+		Returns (gate_counts, gate_qubit_counts), gates named like 'CX (2)', in order of
+		first appearance.
+		"""
+		if len(self) == 0:
+			return ({}, {})
+		qubit_counts = self.qubit_counts
+		control_counts = (self.controls >= 0).sum(axis=1)
+		kinds = np.stack([self.ops, control_counts, qubit_counts], axis=1)
+		unique_kinds, first, counts = np.unique(
+			kinds, axis=0, return_index=True, return_counts=True
+		)
+		gate_counts: typing.Dict[str, int] = {}
+		for i in np.argsort(first):
+			op, controls, qubits = unique_kinds[i].tolist()
+			gate_counts[f'{"C" * controls}{self.names[op]} ({qubits})'] = int(counts[i])
+		unique_qubits, first, counts = np.unique(
+			qubit_counts, return_index=True, return_counts=True
+		)
+		gate_qubit_counts: typing.Dict[int, int] = {
+			int(unique_qubits[i]): int(counts[i]) for i in np.argsort(first)
+		}
+		return (gate_counts, gate_qubit_counts)
+
+	def gate_qubits(self) -> typing.List[typing.List[int]]:
+		qubits = np.concatenate([self.controls, self.targets], axis=1).tolist()
+		return [[qubit for qubit in row if qubit >= 0] for row in qubits]
+
+
+def _pad(rows: typing.List[typing.Sequence[int]]) -> np.ndarray:
+	width = max((len(row) for row in rows), default=0)
+	array = np.full((len(rows), width), -1, dtype=np.int32)
+	for i, row in enumerate(rows):
+		array[i, :len(row)] = row
+	return array
+
+
+class CircuitMetrics:
+	"""
+	Depth related metrics of a circuit, computed in one pass over its gates.
+
+	Gates are placed in the earliest layer after all earlier gates on their qubits.
+	"""
+	def __init__(self, circuit: typing.Union[CircuitArrays, tq.QCircuit, 'Circuit']):
+		if isinstance(circuit, tq.QCircuit):
+			circuit = CircuitArrays.from_tequila(circuit)
+		elif not isinstance(circuit, CircuitArrays):
+			circuit = CircuitArrays.from_tket(circuit)
+		self.arrays: CircuitArrays = circuit
+
+		n_qubits = circuit.n_qubits
+		multi_qubit = (circuit.qubit_counts > 1).tolist()
+		frontier = [0] * n_qubits
+		multi_frontier = [0] * n_qubits
+		last_gate = [-1] * n_qubits
+		layers = [0] * len(circuit)
+		predecessors = [-1] * len(circuit)
+		for gate, qubits in enumerate(circuit.gate_qubits()):
+			if not qubits:
+				continue
+			latest = max(qubits, key=frontier.__getitem__)
+			layer = frontier[latest] + 1
+			predecessors[gate] = last_gate[latest]
+			multi_layer = max(multi_frontier[qubit] for qubit in qubits) + multi_qubit[gate]
+			for qubit in qubits:
+				frontier[qubit] = layer
+				multi_frontier[qubit] = multi_layer
+				last_gate[qubit] = gate
+			layers[gate] = layer
+
+		# layer of every gate, starting at 1
+		self.layers: np.ndarray = np.array(layers, dtype=np.int64)
+		self.depth: int = max(frontier, default=0)
+		# depth counting only gates on two or more qubits
+		self.two_qubit_depth: int = max(multi_frontier, default=0)
+		# number of gates on every qubit
+		self.qubit_busy_time: np.ndarray = self._busy_time()
+		# number of gates in every layer
+		self.layer_histogram: np.ndarray = np.bincount(self.layers, minlength=self.depth + 1)[1:]
+		# gate indices of one longest chain of dependent gates
+		self.critical_path: typing.List[int] = self._critical_path(predecessors)
+
+	def _busy_time(self) -> np.ndarray:
+		qubits = np.concatenate([self.arrays.targets, self.arrays.controls], axis=1).ravel()
+		return np.bincount(qubits[qubits >= 0], minlength=self.arrays.n_qubits)
+
+	def _critical_path(self, predecessors: typing.List[int]) -> typing.List[int]:
+		if len(self.layers) == 0 or self.depth == 0:
+			return []
+		gate = int(np.argmax(self.layers))
+		path = []
+		while gate >= 0:
+			path.append(gate)
+			gate = predecessors[gate]
+		return path[::-1]
@@ -0,0 +1,177 @@
+import typing
+import numpy as np
+import tequila as tq
+
+from helpinghand.analyse.CircuitMetrics import CircuitArrays
+
+HAS_PYTKET = True
+try:
+	from pytket import Circuit
+	from pytket.routing import Architecture
+	from helpinghand.architectures import ArchitectureInfo, architecture_info
+except ImportError:
+	HAS_PYTKET = False
+
+
+class SwapEstimate(typing.NamedTuple):
+	swaps: int
+	# two qubit gates after routing, every SWAP counted as three CX
+	cx_count: int
+	cx_depth: int
+	# physical node of every logical qubit
+	placement: typing.Dict[int, int]
+
+
+class SwapEstimator:
+	"""
+	Estimates the routing overhead of circuits on an architecture without routing them.
+
+	Logical qubits are placed greedily along the interaction graph of the circuit and the
+	placement is optionally improved by simulated annealing. Every two qubit gate between
+	qubits at distance d is assumed to cost d - 1 SWAPs. Pass compiled circuits to get
+	counts in terms of the final gate set.
+	"""
+	def __init__(
+		self,
+		architecture: typing.Union[str, 'Architecture', 'ArchitectureInfo'],
+		qubits: int = None,
+		anneal_steps: int = 0,
+		seed: int = None
+	):
+		if not HAS_PYTKET:
+			raise ModuleNotFoundError("Needed module pytket not found.")
+		if isinstance(architecture, str):
+			architecture = architecture_info(architecture, qubits)
+		elif not isinstance(architecture, ArchitectureInfo):
+			architecture = ArchitectureInfo("custom", architecture)
+		self.architecture: ArchitectureInfo = architecture
+		self.anneal_steps: int = anneal_steps
+		self.seed: typing.Optional[int] = seed
+
+	@staticmethod
+	def interactions(arrays: CircuitArrays) -> typing.Tuple[np.ndarray, np.ndarray]:
+		"""Qubit pairs of all multi qubit gates, as (n_pairs, 2) array, and the weight matrix."""
+		pairs = []
+		for qubits in arrays.gate_qubits():
+			for i in range(len(qubits)):
+				for j in range(i + 1, len(qubits)):
+					pairs.append((qubits[i], qubits[j]))
+		pairs = np.array(pairs, dtype=np.int64).reshape(-1, 2)
+		weights = np.zeros((arrays.n_qubits, arrays.n_qubits), dtype=np.int64)
+		np.add.at(weights, (pairs[:, 0], pairs[:, 1]), 1)
+		return pairs, weights + weights.T
+
+	def place(self, weights: np.ndarray) -> np.ndarray:
+		"""Row in the architecture tables for every logical qubit."""
+		distances = self._distances()
+		n_logical = len(weights)
+		placement = np.full(n_logical, -1, dtype=np.int64)
+		free = np.ones(self.architecture.n_qubits, dtype=bool)
+		placed = np.zeros(n_logical, dtype=bool)
+		strength = weights.sum(axis=1)
+
+		first = int(np.argmax(strength))
+		placement[first] = int(np.argmax(self.architecture.degrees))
+		free[placement[first]] = False
+		placed[first] = True
+		for _ in range(n_logical - 1):
+			# most strongly coupled to the placed qubits, ties broken by overall coupling
+			attraction = weights[:, placed].sum(axis=1) * (strength.max() + 1) + strength
+			attraction[placed] = -1
+			logical = int(np.argmax(attraction))
+			neighbours = np.flatnonzero(placed)
+			cost = distances[:, placement[neighbours]] @ weights[logical, neighbours]
+			# prefer well connected nodes when the cost is equal
+			cost = cost * (self.architecture.degrees.max() + 1) - self.architecture.degrees
+			cost[~free] = np.iinfo(np.int64).max
+			placement[logical] = int(np.argmin(cost))
+			free[placement[logical]] = False
+			placed[logical] = True
+		if self.anneal_steps:
+			placement = self._anneal(weights, placement)
+		return placement
+
+	def _distances(self) -> np.ndarray:
+		distances = self.architecture.distances.astype(np.int64)
+		# unreachable pairs should never be chosen
+		distances[distances < 0] = self.architecture.n_qubits ** 2
+		return distances
+
+	def _anneal(self, weights: np.ndarray, placement: np.ndarray) -> np.ndarray:
+		# estimated SWAPs between two nodes, which is what the annealing minimises
+		distances = np.maximum(self._distances() - 1, 0)
+		random = np.random.default_rng(self.seed)
+		n_logical = len(placement)
+		n_physical = self.architecture.n_qubits
+		# physical node -> logical qubit, -1 for free nodes
+		occupant = np.full(n_physical, -1, dtype=np.int64)
+		occupant[placement] = np.arange(n_logical)
+		cost = best_cost = int((weights * distances[placement][:, placement]).sum()) // 2
+		best = placement.copy()
+		temperatures = np.geomspace(2.0, 0.05, self.anneal_steps)
+		for temperature, logical, node in zip(
+			temperatures,
+			random.integers(n_logical, size=self.anneal_steps),
+			random.integers(n_physical, size=self.anneal_steps)
+		):
+			old = placement[logical]
+			other = occupant[node]
+			if node == old:
+				continue
+			# change of the summed weighted distance when the two nodes swap contents
+			delta = weights[logical] @ (distances[node, placement] - distances[old, placement])
+			if other >= 0:
+				delta += weights[other] @ (distances[old, placement] - distances[node, placement])
+				delta += 2 * weights[logical, other] * distances[old, node]
+			if delta > 0 and random.random() >= np.exp(-delta / temperature):
+				continue
+			placement[logical] = node
+			occupant[node] = logical
+			occupant[old] = other
+			if other >= 0:
+				placement[other] = old
+			cost += delta
+			if cost < best_cost:
+				best_cost = cost
+				best = placement.copy()
+		return best
+
+	def __call__(self, circuit: typing.Union[CircuitArrays, tq.QCircuit, 'Circuit']) -> SwapEstimate:
+		if isinstance(circuit, tq.QCircuit):
+			circuit = CircuitArrays.from_tequila(circuit)
+		elif not isinstance(circuit, CircuitArrays):
+			circuit = CircuitArrays.from_tket(circuit)
+		if circuit.n_qubits > self.architecture.n_qubits:
+			raise ValueError(
+				f"Circuit with {circuit.n_qubits} qubits does not fit on "
+				f"'{self.architecture.name}' with {self.architecture.n_qubits} qubits."
+			)
+		pairs, weights = self.interactions(circuit)
+		placement = self.place(weights)
+		distances = self._distances()
+
+		gate_distances = distances[placement[pairs[:, 0]], placement[pairs[:, 1]]]
+		gate_swaps = np.maximum(gate_distances - 1, 0)
+		durations = (1 + 3 * gate_swaps).tolist()
+		frontier = [0] * circuit.n_qubits
+		for (first, second), duration in zip(pairs.tolist(), durations):
+			end = max(frontier[first], frontier[second]) + duration
+			frontier[first] = frontier[second] = end
+
+		return SwapEstimate(
+			swaps=int(gate_swaps.sum()),
+			cx_count=len(pairs) + 3 * int(gate_swaps.sum()),
+			cx_depth=max(frontier, default=0),
+			placement={
+				logical: int(self.architecture.qubits[row])
+				for logical, row in enumerate(placement.tolist())
+			}
+		)
+
+	def rank(
+		self,
+		circuits: typing.List[typing.Union[CircuitArrays, tq.QCircuit, 'Circuit']]
+	) -> typing.List[typing.Tuple[int, SwapEstimate]]:
+		"""(index, estimate) of every circuit, fewest estimated SWAPs first."""
+		estimates = [(index, self(circuit)) for index, circuit in enumerate(circuits)]
+		return sorted(estimates, key=lambda item: (item[1].swaps, item[1].cx_depth))
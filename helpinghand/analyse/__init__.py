@@ -1,2 +1,4 @@
 from helpinghand.analyse.CircuitAnalyser import CircuitAnalyser
 from helpinghand.analyse.CircuitAnalytics import CircuitAnalytics
+from helpinghand.analyse.CircuitMetrics import CircuitArrays, CircuitMetrics
+from helpinghand.analyse.SwapEstimator import SwapEstimate, SwapEstimator
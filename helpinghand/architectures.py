@@ -1,5 +1,12 @@
 import typing
+from functools import cached_property
+
+import numpy as np
 from pytket.routing import Architecture
+from scipy.sparse import csr_matrix
+from scipy.sparse.csgraph import shortest_path
+
+from helpinghand.cache import LRUCache
 
 
 def node_line(nodes: typing.List[int]) -> typing.List[typing.List[int]]:
@@ -102,6 +109,68 @@ def line(qubits: int) -> Architecture:
 	return Architecture([[i, i + 1] for i in range(qubits - 1)])
 
 
+def ring_edges(qubits: int) -> np.ndarray:
+	nodes = np.arange(qubits)
+	edges = np.stack([nodes, (nodes + 1) % qubits], axis=1)
+	# two or fewer nodes are a line
+	return edges if qubits > 2 else edges[:qubits - 1]
+
+
+def grid_edges(rows: int, columns: int) -> np.ndarray:
+	nodes = np.arange(rows * columns).reshape(rows, columns)
+	horizontal = np.stack([nodes[:, :-1].ravel(), nodes[:, 1:].ravel()], axis=1)
+	vertical = np.stack([nodes[:-1].ravel(), nodes[1:].ravel()], axis=1)
+	return np.concatenate([horizontal, vertical])
+
+
+def heavy_hex_edges(rows: int, width: int) -> np.ndarray:
+	"""
+	Rows of `width` qubits joined by bridge qubits every fourth column, shifted by two
+	columns between neighbouring gaps, as on Falcon and Hummingbird.
+	"""
+	nodes = np.arange(rows * width).reshape(rows, width)
+	edges = [np.stack([nodes[:, :-1].ravel(), nodes[:, 1:].ravel()], axis=1)]
+	bridge = rows * width
+	for gap in range(rows - 1):
+		columns = np.arange(2 * (gap % 2), width, 4)
+		bridges = np.arange(bridge, bridge + len(columns))
+		bridge += len(columns)
+		edges.append(np.stack([nodes[gap, columns], bridges], axis=1))
+		edges.append(np.stack([bridges, nodes[gap + 1, columns]], axis=1))
+	return np.concatenate(edges)
+
+
+def all_to_all_edges(qubits: int) -> np.ndarray:
+	return np.stack(np.triu_indices(qubits, 1), axis=1)
+
+
+def ring(qubits: int) -> Architecture:
+	return Architecture(ring_edges(qubits).tolist())
+
+
+def grid(qubits: int) -> Architecture:
+	"""Smallest close to square grid with at least `qubits` nodes"""
+	columns = int(np.ceil(np.sqrt(qubits)))
+	return Architecture(grid_edges(int(np.ceil(qubits / columns)), columns).tolist())
+
+
+def heavy_hex(qubits: int) -> Architecture:
+	"""Smallest close to square heavy hex lattice with at least `qubits` nodes"""
+	size = 1
+	while True:
+		width = 4 * size + 3
+		# every gap between two rows holds size + 1 bridge qubits
+		rows = int(np.ceil((qubits + size + 1) / (width + size + 1)))
+		if rows <= 2 * size + 2:
+			break
+		size += 1
+	return Architecture(heavy_hex_edges(max(rows, 1), width).tolist())
+
+
+def all_to_all(qubits: int) -> Architecture:
+	return Architecture(all_to_all_edges(qubits).tolist())
+
+
 ARCHITECTURE_CREATORS = {
 	"ourense": (ourense, False),
 	"valencia": (ourense, False),
@@ -117,21 +186,91 @@ ARCHITECTURE_CREATORS = {
 	"hummingbird": (hummingbird, False),
 	"sycamore": (sycamore, False),
 	"aspen9": (aspen9, False),
-	"line": (line, False)
+	"line": (line, True),
+	"ring": (ring, True),
+	"grid": (grid, True),
+	"heavy_hex": (heavy_hex, True),
+	"all_to_all": (all_to_all, True)
 }
 
 
-def select_architecture(name: str, qubits: int = None) -> Architecture:
-	creator, scalable = ARCHITECTURE_CREATORS.get(name.lower())
-	if scalable and not qubits:
-		raise ValueError(
-			f"Architecture '{name}' needs the 'qubits' parameter to be created."
-		)
+class ArchitectureInfo:
+	"""
+	An architecture with connectivity tables for fast lookups.
+
+	Rows and columns of the tables follow `qubits`, the sorted node indices of the
+	architecture; `index` maps a node index to its row. Unreachable pairs have distance -1.
+	The dense tables are built when they are first used.
+	"""
+
+	def __init__(self, name: str, architecture: Architecture):
+		self.name = name
+		self.architecture = architecture
+		self.qubits = np.array(sorted(node.index[0] for node in architecture.nodes), dtype=int)
+		self.index = {qubit: row for row, qubit in enumerate(self.qubits.tolist())}
+		rows = np.zeros(self.qubits.max(initial=0) + 1, dtype=int)
+		rows[self.qubits] = np.arange(len(self.qubits))
+		edges = np.array(
+			[(first.index[0], second.index[0]) for first, second in architecture.coupling], dtype=int
+		).reshape(-1, 2)
+		# unique undirected edges as rows of the tables
+		self.edges = np.unique(np.sort(rows[edges], axis=1), axis=0)
+		self.degrees = np.bincount(self.edges.ravel(), minlength=len(self.qubits))
+
+	@property
+	def n_qubits(self) -> int:
+		return len(self.qubits)
+
+	@cached_property
+	def adjacency(self) -> np.ndarray:
+		adjacency = np.zeros((self.n_qubits, self.n_qubits), dtype=bool)
+		adjacency[self.edges[:, 0], self.edges[:, 1]] = True
+		return adjacency | adjacency.T
+
+	@cached_property
+	def distances(self) -> np.ndarray:
+		return _distances(self.adjacency)
+
+	def distance(self, first: int, second: int) -> int:
+		"""Shortest path length between two node indices."""
+		return int(self.distances[self.index[first], self.index[second]])
+
+
+def _distances(adjacency: np.ndarray) -> np.ndarray:
+	"""All pairs shortest path lengths, by breadth first search from every node."""
+	distances = shortest_path(csr_matrix(adjacency), directed=False, unweighted=True)
+	distances[np.isinf(distances)] = -1
+	return distances.astype(int)
+
+
+_REGISTRY = LRUCache(maxsize=32)
+
+
+def architecture_info(name: str, qubits: int = None) -> ArchitectureInfo:
+	"""
+	Architecture and connectivity tables of a named architecture.
+
+	The most recently used architectures are kept; aliases share the same entry and
+	scalable ones get an entry per qubit count.
+	"""
+	creator, scalable = ARCHITECTURE_CREATORS.get(name.lower(), (None, False))
 	if not creator:
 		raise ValueError(
 			f"Architecture '{name}' not found. Select from {list(ARCHITECTURE_CREATORS.keys())}."
 		)
-	arc = creator(qubits)
-	if qubits and len(arc.nodes) < qubits:
+	if scalable and not qubits:
+		raise ValueError(
+			f"Architecture '{name}' needs the 'qubits' parameter to be created."
+		)
+	key = (creator, qubits if scalable else None)
+	info = _REGISTRY.get(key)
+	if info is None:
+		info = ArchitectureInfo(name.lower(), creator(qubits))
+		_REGISTRY.put(key, info)
+	if qubits and info.n_qubits < qubits:
 		raise ValueError(F"Selected architecture '{name}' does not support {qubits} qubits.")
-	return arc
+	return info
+
+
+def select_architecture(name: str, qubits: int = None) -> Architecture:
+	return architecture_info(name, qubits).architecture
@@ -0,0 +1,44 @@
+import collections
+import typing
+
+
+class LRUCache:
+	"""Mapping of bounded size, that drops the least recently used entry when full."""
+	def __init__(self, maxsize: int = 128):
+		if maxsize < 1:
+			raise ValueError("The size of a cache has to be at least 1.")
+		self.maxsize: int = maxsize
+		self.hits: int = 0
+		self.misses: int = 0
+		self._data: collections.OrderedDict = collections.OrderedDict()
+
+	def get(self, key: typing.Hashable, default: typing.Any = None) -> typing.Any:
+		try:
+			value = self._data[key]
+		except KeyError:
+			self.misses += 1
+			return default
+		self.hits += 1
+		self._data.move_to_end(key)
+		return value
+
+	def put(self, key: typing.Hashable, value: typing.Any) -> None:
+		self._data[key] = value
+		self._data.move_to_end(key)
+		while len(self._data) > self.maxsize:
+			self._data.popitem(last=False)
+
+	def items(self) -> typing.List[typing.Tuple[typing.Hashable, typing.Any]]:
+		"""Entries from least to most recently used, without counting as use."""
+		return list(self._data.items())
+
+	def clear(self) -> None:
+		self._data.clear()
+		self.hits = 0
+		self.misses = 0
+
+	def __contains__(self, key: typing.Hashable) -> bool:
+		return key in self._data
+
+	def __len__(self) -> int:
+		return len(self._data)
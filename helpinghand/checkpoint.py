@@ -0,0 +1,72 @@
+import os
+import pickle
+import struct
+import typing
+
+_KEY_LENGTH = struct.Struct('<I')
+_VALUE_LENGTH = struct.Struct('<Q')
+
+
+class Checkpoint:
+	"""
+	Append-only file of (key, value) records.
+
+	Only the keys and file offsets are kept in memory, values are unpickled when
+	loaded. A record that was cut off by a crash is dropped on opening.
+	"""
+	def __init__(self, path: str):
+		self.path: str = path
+		self.offsets: typing.Dict[str, int] = {}
+		self._scan()
+
+	def _scan(self) -> None:
+		if not os.path.exists(self.path):
+			return
+		size = os.path.getsize(self.path)
+		with open(self.path, 'rb') as file:
+			offset = 0
+			while offset < size:
+				header = file.read(_KEY_LENGTH.size)
+				if len(header) < _KEY_LENGTH.size:
+					break
+				key_length, = _KEY_LENGTH.unpack(header)
+				key = file.read(key_length)
+				header = file.read(_VALUE_LENGTH.size)
+				if len(key) < key_length or len(header) < _VALUE_LENGTH.size:
+					break
+				value_length, = _VALUE_LENGTH.unpack(header)
+				end = file.tell() + value_length
+				if end > size:
+					break
+				self.offsets[key.decode()] = offset
+				file.seek(end)
+				offset = end
+		if offset < size:
+			with open(self.path, 'r+b') as file:
+				file.truncate(offset)
+
+	def __contains__(self, key: str) -> bool:
+		return key in self.offsets
+
+	def __len__(self) -> int:
+		return len(self.offsets)
+
+	def load(self, key: str) -> typing.Any:
+		with open(self.path, 'rb') as file:
+			file.seek(self.offsets[key])
+			key_length, = _KEY_LENGTH.unpack(file.read(_KEY_LENGTH.size))
+			file.seek(key_length + _VALUE_LENGTH.size, os.SEEK_CUR)
+			return pickle.load(file)
+
+	def append(self, key: str, value: typing.Any) -> None:
+		encoded_key = key.encode()
+		data = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+		with open(self.path, 'ab') as file:
+			offset = file.tell()
+			file.write(_KEY_LENGTH.pack(len(encoded_key)))
+			file.write(encoded_key)
+			file.write(_VALUE_LENGTH.pack(len(data)))
+			file.write(data)
+			file.flush()
+			os.fsync(file.fileno())
+		self.offsets[key] = offset
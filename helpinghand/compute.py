@@ -1,4 +1,9 @@
+import copy
+import functools
+import hashlib
+import types
 import typing
+from concurrent.futures import ProcessPoolExecutor
 
 import tequila as tq
 from tequila import QCircuit, QubitHamiltonian
@@ -9,41 +14,123 @@ from tequila.objective.objective import (
 )
 from tequila.optimizers.optimizer_base import Optimizer, OptimizerResults
 
+from helpinghand.checkpoint import Checkpoint
+from helpinghand import instrumentation, statevector  # noqa: F401 registers the "numpy" backend
+from helpinghand.hashing import circuit_hash, hamiltonian_hash
+from helpinghand.measurement_grouping import grouped_expectation_value
+from helpinghand.objective_cache import ObjectiveCache
+
 
 class DifferentSizeInputListsError(Exception):
 	"""Raised when lists that are give as parameters have different sizes."""
 	pass
 
 
+def bind_backend(
+	optimizer: typing.Union[Optimizer, typing.Callable[..., OptimizerResults]],
+	backend: typing.Optional[str]
+) -> typing.Tuple[typing.Callable[..., OptimizerResults], typing.Dict[str, str]]:
+	"""
+	The optimizer to call and its keyword arguments to simulate with `backend`.
+
+	tequila Optimizer instances take the backend as attribute (a `backend` keyword
+	collides with it in compile), so a copy with the backend set is returned. Other
+	callables, e.g. tq.minimize, get it as `backend` keyword.
+	"""
+	if backend is None:
+		return optimizer, {}
+	if isinstance(optimizer, Optimizer):
+		optimizer = copy.copy(optimizer)
+		optimizer.backend = backend
+		return optimizer, {}
+	return optimizer, {"backend": backend}
+
+
 def compute(
 	hamiltonian: QubitHamiltonian,
 	circuit: QCircuit,
 	optimizer: Optimizer,
-	initial_values: typing.Union[int, typing.Dict[Variable, float]] = None
+	initial_values: typing.Union[int, typing.Dict[Variable, float]] = None,
+	objective_cache: ObjectiveCache = None,
+	backend: str = None,
+	grouping: str = None
 ) -> OptimizerResults:
-	objective: VectorObjective = tq.ExpectationValue(H=hamiltonian, U=circuit)
+	"""
+	With an objective_cache the optimizer simulates with the backend of the cache, which
+	reuses compiled circuits across calls that only differ in the hamiltonian. Otherwise
+	`backend` is passed on, e.g. "numpy" for the statevector simulator of
+	helpinghand.statevector. See bind_backend for how the optimizer gets it.
+
+	With grouping="qwc" the hamiltonian is measured in groups of qubit-wise
+	commuting pauli strings, one basis rotated circuit per group, see
+	helpinghand.measurement_grouping.
+
+	Emits the instrumentation events "objective" and "optimize", the latter with the
+	number of iterations and of energy and gradient evaluations.
+	"""
+	if objective_cache is not None:
+		if backend is not None:
+			raise ValueError("Pass the backend to the ObjectiveCache when using one.")
+		backend = objective_cache.backend
+	optimizer, optimizer_arguments = bind_backend(optimizer, backend)
+	with instrumentation.stage("objective", grouping=grouping) as objective_stage:
+		if grouping is None:
+			objective: VectorObjective = tq.ExpectationValue(H=hamiltonian, U=circuit)
+		else:
+			objective = grouped_expectation_value(hamiltonian, circuit, grouping)
+		if instrumentation.enabled():
+			objective_stage.update(
+				terms=len(hamiltonian.paulistrings),
+				gates=len(circuit.gates),
+				expectation_values=len(objective.get_expectationvalues())
+			)
 	if isinstance(initial_values, int) or isinstance(initial_values, float):
 		initial_values = {assign_variable(k): initial_values for k in objective.extract_variables()}
 	else:
 		initial_values = {assign_variable(k): float(v) for k, v in initial_values.items()}
-	result: OptimizerResults = optimizer(
-		objective=objective,
-		initial_values=initial_values
-	)
+	with instrumentation.stage(
+		"optimize", backend=backend
+	) as optimize_stage:
+		result: OptimizerResults = optimizer(
+			objective=objective,
+			initial_values=initial_values,
+			**optimizer_arguments
+		)
+		if instrumentation.enabled():
+			optimize_stage.update(
+				variables=len(initial_values),
+				energy=float(result.energy),
+				**_evaluation_counts(result)
+			)
 	return result
 
 
-def compute_many(
+def _evaluation_counts(result: OptimizerResults) -> typing.Dict[str, int]:
+	"""Iterations and energy and gradient evaluations of an optimizer run, as far as known."""
+	history = getattr(result, "history", None)
+	scipy_result = getattr(result, "scipy_result", None)
+	energy_evaluations = len(getattr(history, "energies_calls", []))
+	gradient_evaluations = len(getattr(history, "gradients_calls", []))
+	return {
+		"iterations": len(getattr(history, "energies", [])),
+		"energy_evaluations": energy_evaluations or getattr(scipy_result, "nfev", 0),
+		"gradient_evaluations": gradient_evaluations or getattr(scipy_result, "njev", 0),
+	}
+
+
+def _expand_inputs(
 	hamiltonians: typing.List[QubitHamiltonian],
 	circuits: typing.Union[typing.List[QCircuit], QCircuit],
 	initial_values: typing.Union[
 		int,
 		typing.Dict[Variable, float],
 		typing.List[typing.Dict[Variable, float]]
-	],
-	optimizer: Optimizer,
-	mark: bool = True
-) -> typing.List[OptimizerResults]:
+	]
+) -> typing.Tuple[
+	typing.List[QCircuit],
+	typing.List[typing.Union[int, typing.Dict[Variable, float]]]
+]:
+	"""Returns (circuits, initial_values) as lists with one entry per hamiltonian."""
 	hamiltonian_count: int = len(hamiltonians)
 	if not isinstance(circuits, list):
 		circuits = [circuits for _ in range(hamiltonian_count)]
@@ -52,17 +139,272 @@ def compute_many(
 
 	if not (hamiltonian_count == len(circuits) and len(circuits) == len(initial_values)):
 		raise DifferentSizeInputListsError()
+	return (circuits, initial_values)
+
+
+def _compute_item(
+	arguments: typing.Tuple[
+		QubitHamiltonian, QCircuit, Optimizer, typing.Any, ObjectiveCache, str, str
+	]
+) -> typing.Union[OptimizerResults, Exception]:
+	"""Runs compute in a worker process, returning the exception instead of raising it."""
+	try:
+		return compute(*arguments)
+	except Exception as error:
+		return error
+
+
+def compute_many(
+	hamiltonians: typing.List[QubitHamiltonian],
+	circuits: typing.Union[typing.List[QCircuit], QCircuit],
+	initial_values: typing.Union[
+		int,
+		typing.Dict[Variable, float],
+		typing.List[typing.Dict[Variable, float]]
+	],
+	optimizer: Optimizer,
+	mark: bool = True,
+	parallel: bool = False,
+	processes: int = None,
+	chunksize: int = 1,
+	continuation: bool = False,
+	bidirectional: bool = False,
+	objective_cache: ObjectiveCache = None,
+	backend: str = None,
+	grouping: str = None
+) -> typing.List[typing.Union[OptimizerResults, Exception]]:
+	"""
+	With parallel=True the points run in a pool of `processes` worker processes,
+	`chunksize` points per task. Results keep the input order and an exception of
+	a single point is returned in its place. The optimizer has to be picklable.
+
+	With continuation=True every point after the first starts from the optimized
+	angles of the previous point, which only helps if the hamiltonians are ordered
+	(e.g. by bond distance). bidirectional=True adds a sweep in reverse order and
+	keeps the result with the lower energy for every point. `objective_cache`, `backend`
+	and `grouping` are passed on to compute.
+	"""
+	hamiltonian_count: int = len(hamiltonians)
+	circuits, initial_values = _expand_inputs(hamiltonians, circuits, initial_values)
+
+	if parallel and continuation:
+		raise ValueError("Continuation can not be combined with parallel execution.")
+	if bidirectional and not continuation:
+		raise ValueError("bidirectional requires continuation")
+	if parallel:
+		return _compute_many_parallel(
+			hamiltonians, circuits, initial_values, optimizer, mark, processes, chunksize,
+			objective_cache, backend, grouping
+		)
+
+	order: typing.List[int] = list(range(hamiltonian_count))
+	results: typing.List[OptimizerResults] = _sweep(
+		hamiltonians, circuits, initial_values, optimizer, mark, order, continuation,
+		objective_cache, backend, grouping
+	)
+	if continuation and bidirectional:
+		reverse_results = _sweep(
+			hamiltonians, circuits, initial_values, optimizer, mark, order[::-1], continuation,
+			objective_cache, backend, grouping
+		)
+		results = [
+			reverse if reverse.energy < result.energy else result
+			for result, reverse in zip(results, reverse_results)
+		]
+	if mark:
+		print()
+	return results
+
 
-	results: typing.List[OptimizerResults] = []
-	for i in range(hamiltonian_count):
-		results.append(compute(
+def _sweep(
+	hamiltonians: typing.List[QubitHamiltonian],
+	circuits: typing.List[QCircuit],
+	initial_values: typing.List[typing.Union[int, typing.Dict[Variable, float]]],
+	optimizer: Optimizer,
+	mark: bool,
+	order: typing.List[int],
+	continuation: bool,
+	objective_cache: ObjectiveCache,
+	backend: str = None,
+	grouping: str = None
+) -> typing.List[OptimizerResults]:
+	"""Computes the points in the given order, returns the results in input order."""
+	results: typing.List[OptimizerResults] = [None] * len(hamiltonians)
+	previous: OptimizerResults = None
+	for i in order:
+		start = previous.angles if continuation and previous is not None else initial_values[i]
+		previous = compute(
 			hamiltonian=hamiltonians[i],
 			circuit=circuits[i],
 			optimizer=optimizer,
-			initial_values=initial_values[i]
-		))
+			initial_values=start,
+			objective_cache=objective_cache,
+			backend=backend,
+			grouping=grouping
+		)
+		results[i] = previous
+		instrumentation.emit("point", index=i, energy=float(previous.energy))
 		if mark:
 			print('.', end='')
+	return results
+
+
+def _compute_many_parallel(
+	hamiltonians: typing.List[QubitHamiltonian],
+	circuits: typing.List[QCircuit],
+	initial_values: typing.List[typing.Union[int, typing.Dict[Variable, float]]],
+	optimizer: Optimizer,
+	mark: bool,
+	processes: int,
+	chunksize: int,
+	objective_cache: ObjectiveCache,
+	backend: str = None,
+	grouping: str = None
+) -> typing.List[typing.Union[OptimizerResults, Exception]]:
+	arguments = [
+		(hamiltonians[i], circuits[i], optimizer, initial_values[i], objective_cache, backend, grouping)
+		for i in range(len(hamiltonians))
+	]
+	results: typing.List[typing.Union[OptimizerResults, Exception]] = []
+	with ProcessPoolExecutor(max_workers=processes) as executor:
+		for result in executor.map(_compute_item, arguments, chunksize=chunksize):
+			if not isinstance(result, Exception):
+				instrumentation.emit("point", index=len(results), energy=float(result.energy))
+			else:
+				instrumentation.emit("point", index=len(results), error=type(result).__name__)
+			results.append(result)
+			if mark:
+				print('.', end='')
 	if mark:
 		print()
 	return results
+
+
+_PLAIN_TYPES = (str, int, float, bool, type(None))
+
+
+def _is_plain(value: typing.Any) -> bool:
+	if isinstance(value, (tuple, list)):
+		return all(_is_plain(item) for item in value)
+	if isinstance(value, dict):
+		return all(_is_plain(k) and _is_plain(v) for k, v in value.items())
+	return isinstance(value, _PLAIN_TYPES)
+
+
+def _describe(value: typing.Any) -> str:
+	"""
+	Stable description of an optimizer or one of its settings. Raises ValueError for
+	functions that can not be told apart by name, e.g. lambdas.
+	"""
+	if _is_plain(value):
+		return repr(value)
+	if isinstance(value, (tuple, list)):
+		return f"[{', '.join(_describe(item) for item in value)}]"
+	if isinstance(value, dict):
+		items = sorted(f"{_describe(k)}: {_describe(v)}" for k, v in value.items())
+		return f"{{{', '.join(items)}}}"
+	if isinstance(value, functools.partial):
+		return (
+			f"partial({_describe(value.func)}, {_describe(value.args)}, "
+			f"{_describe(value.keywords)})"
+		)
+	if isinstance(value, types.MethodType):
+		return f"{_describe(value.__self__)}.{value.__func__.__name__}"
+	if isinstance(value, (types.FunctionType, types.BuiltinFunctionType, type)):
+		name = f"{value.__module__}.{value.__qualname__}"
+		if "<lambda>" in name or "<locals>" in name:
+			raise ValueError(
+				f"The optimizer {name} can not be told apart from others for the checkpoint, "
+				"pass an optimizer_key."
+			)
+		return name
+	# An instance, e.g. a tequila Optimizer: its type and plain settings. repr is not
+	# used because it may leave out settings (tequila) or contain an address.
+	settings = sorted(
+		(name, repr(setting)) for name, setting in getattr(value, "__dict__", {}).items()
+		if _is_plain(setting)
+	)
+	return f"{_describe(type(value))}{settings!r}"
+
+
+def _point_key(
+	hamiltonian: QubitHamiltonian,
+	circuit: QCircuit,
+	initial_values: typing.Union[int, typing.Dict[Variable, float]],
+	continuation: bool,
+	optimizer_key: str,
+	grouping: str = None,
+	backend: str = None
+) -> str:
+	if isinstance(initial_values, dict):
+		initial_values = sorted((str(k), float(v)) for k, v in initial_values.items())
+	description = '\n'.join([
+		hamiltonian_hash(hamiltonian),
+		circuit_hash(circuit),
+		repr(initial_values),
+		repr(continuation),
+		optimizer_key,
+		repr(grouping),
+		repr(backend)
+	])
+	return hashlib.sha1(description.encode()).hexdigest()
+
+
+def compute_stream(
+	hamiltonians: typing.List[QubitHamiltonian],
+	circuits: typing.Union[typing.List[QCircuit], QCircuit],
+	initial_values: typing.Union[
+		int,
+		typing.Dict[Variable, float],
+		typing.List[typing.Dict[Variable, float]]
+	],
+	optimizer: Optimizer,
+	checkpoint: str = None,
+	continuation: bool = False,
+	objective_cache: ObjectiveCache = None,
+	backend: str = None,
+	grouping: str = None,
+	optimizer_key: str = None
+) -> typing.Iterator[typing.Tuple[int, OptimizerResults]]:
+	"""
+	Runs compute for every hamiltonian and yields (index, result) as each point finishes.
+
+	With a checkpoint path every result is appended to that file right away. When
+	run again with the same hamiltonians, circuits, initial values, optimizer, backend and
+	grouping, points that are already in the checkpoint are read from it instead of being
+	computed. The optimizer is told apart by its type and settings, functions by name
+	(partial by its function and arguments); `optimizer_key` replaces that description,
+	e.g. for lambdas, which raise ValueError otherwise.
+	"""
+	circuits, initial_values = _expand_inputs(hamiltonians, circuits, initial_values)
+	done: Checkpoint = Checkpoint(checkpoint) if checkpoint else None
+	if done is not None and optimizer_key is None:
+		optimizer_key = _describe(optimizer)
+	simulator = objective_cache.base_backend if objective_cache is not None else backend
+
+	previous: OptimizerResults = None
+	for i in range(len(hamiltonians)):
+		key = None
+		if done is not None:
+			key = _point_key(
+				hamiltonians[i], circuits[i], initial_values[i], continuation, optimizer_key,
+				grouping, simulator
+			)
+		if key is not None and key in done:
+			result: OptimizerResults = done.load(key)
+		else:
+			start = previous.angles if continuation and previous is not None else initial_values[i]
+			result = compute(
+				hamiltonian=hamiltonians[i],
+				circuit=circuits[i],
+				optimizer=optimizer,
+				initial_values=start,
+				objective_cache=objective_cache,
+				backend=backend,
+				grouping=grouping
+			)
+			if done is not None:
+				done.append(key, result)
+		previous = result if continuation else None
+		instrumentation.emit("point", index=i, energy=float(result.energy))
+		yield (i, result)
@@ -7,8 +7,16 @@ from tequila.optimizers.optimizer_base import Optimizer, OptimizerResults
 from tequila.quantumchemistry import QuantumChemistryBase
 from tequila.objective.objective import Variable, assign_variable
 
+from helpinghand import statevector  # noqa: F401 registers the "numpy" backend
+from helpinghand.compute import bind_backend
+from helpinghand.results import CompactResults
 
-def get_max_from_result(result: OptimizerResults) -> typing.List[float]:
+
+def get_max_from_result(
+	result: typing.Union[OptimizerResults, CompactResults]
+) -> typing.List[float]:
+	if isinstance(result, CompactResults):
+		return result.max_gradients().tolist()
 	return [abs(max(gradient.values(), key=abs)) for gradient in result.history.gradients]
 
 
@@ -16,7 +24,8 @@ def get_max_from_VQE(
 	molecule: QuantumChemistryBase,
 	circuit_creator: typing.Callable[[QuantumChemistryBase], QCircuit],
 	optimizer: Optimizer,
-	initial_values: typing.Union[int, typing.Dict[Variable, float]] = None
+	initial_values: typing.Union[int, typing.Dict[Variable, float]] = None,
+	backend: str = None
 ) -> typing.Tuple[typing.List[float], int, float]:
 	H: QubitHamiltonian = molecule.make_hamiltonian()
 	U: QCircuit = circuit_creator(molecule)
@@ -26,9 +35,11 @@ def get_max_from_VQE(
 		initial_values = {assign_variable(k): initial_values for k in E.extract_variables()}
 	else:
 		initial_values = {assign_variable(k): float(v) for k, v in initial_values.items()}
+	optimizer, optimizer_arguments = bind_backend(optimizer, backend)
 	result: OptimizerResults = optimizer(
 		objective=E,
-		initial_values=initial_values
+		initial_values=initial_values,
+		**optimizer_arguments
 	)
 
 	gradients: typing.List[float] = get_max_from_result(result=result)
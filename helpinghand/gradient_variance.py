@@ -0,0 +1,203 @@
+import typing
+
+import numpy as np
+import scipy.stats
+from tequila import QCircuit, QubitHamiltonian
+
+from helpinghand import instrumentation
+from helpinghand.parameter_shift import ParameterShiftGradient
+
+
+class RunningStatistics:
+	"""Running mean and variance of vectors, updated a batch at a time (Chan et al.)."""
+	def __init__(self, size: int):
+		self.count: int = 0
+		self.mean: np.ndarray = np.zeros(size)
+		self.m2: np.ndarray = np.zeros(size)
+
+	def update(self, batch: np.ndarray) -> None:
+		"""Adds the rows of batch."""
+		batch = np.asarray(batch, dtype=float).reshape(-1, len(self.mean))
+		count = len(batch)
+		if count == 0:
+			return
+		mean = batch.mean(axis=0)
+		m2 = ((batch - mean) ** 2).sum(axis=0)
+		total = self.count + count
+		delta = mean - self.mean
+		self.mean = self.mean + delta * count / total
+		self.m2 = self.m2 + m2 + delta ** 2 * self.count * count / total
+		self.count = total
+
+	@property
+	def variance(self) -> np.ndarray:
+		"""Unbiased sample variance."""
+		if self.count < 2:
+			return np.full(len(self.mean), np.nan)
+		return self.m2 / (self.count - 1)
+
+	@property
+	def standard_error(self) -> np.ndarray:
+		"""Standard error of the mean."""
+		return np.sqrt(self.variance / self.count)
+
+
+class GradientVarianceEstimate(typing.NamedTuple):
+	samples: int
+	# per gradient component, ordered like the variables of the sampler
+	mean: np.ndarray
+	variance: np.ndarray
+	# variance averaged over components and the half width of its confidence interval
+	mean_variance: float
+	half_width: float
+	converged: bool
+
+
+class GradientVarianceSampler:
+	"""
+	Variance of the gradient components of <U|H|U> over random parameters, without optimizing.
+
+	Parameters are drawn uniformly from [low, high) and gradients are computed
+	`batch_size` points at a time with batched parameter shift gradients, on
+	`processes` worker processes if given. The confidence interval of the mean variance
+	comes from the running spread of the per sample mean squared deviation of the
+	components from their mean, whose mean is the mean variance (delta method).
+	"""
+	def __init__(
+		self,
+		hamiltonian: QubitHamiltonian,
+		circuit: QCircuit,
+		batch_size: int = 16,
+		processes: int = None,
+		seed: int = None,
+		low: float = 0.0,
+		high: float = 2 * np.pi
+	):
+		if batch_size < 1:
+			raise ValueError(f"batch_size has to be at least 1, got {batch_size}.")
+		if not low < high:
+			raise ValueError(f"low has to be smaller than high, got [{low}, {high}).")
+		self.gradient: ParameterShiftGradient = ParameterShiftGradient(
+			hamiltonian, circuit, processes=processes
+		)
+		self.batch_size: int = batch_size
+		self.random: np.random.Generator = np.random.default_rng(seed)
+		self.low: float = low
+		self.high: float = high
+
+	@property
+	def variables(self):
+		return self.gradient.variables
+
+	def sample(self, count: int) -> np.ndarray:
+		"""Gradients of shape (count, n_variables) at random parameters."""
+		values = self.random.uniform(self.low, self.high, size=(count, len(self.variables)))
+		return self.gradient.gradients(values)
+
+	def stream(
+		self,
+		max_samples: int = 10000,
+		min_samples: int = 64,
+		rtol: float = 0.05,
+		confidence: float = 0.95
+	) -> typing.Iterator[GradientVarianceEstimate]:
+		"""
+		Yields an estimate after every batch and stops after max_samples or once the
+		confidence interval of the mean variance is within rtol of it.
+		"""
+		if max_samples < 2:
+			raise ValueError(f"A variance needs max_samples of at least 2, got {max_samples}.")
+		if rtol < 0:
+			raise ValueError(f"rtol has to be non negative, got {rtol}.")
+		if not 0 < confidence < 1:
+			raise ValueError(f"confidence has to be between 0 and 1, got {confidence}.")
+		return self._stream(max_samples, min_samples, rtol, confidence)
+
+	def _stream(
+		self,
+		max_samples: int,
+		min_samples: int,
+		rtol: float,
+		confidence: float
+	) -> typing.Iterator[GradientVarianceEstimate]:
+		components = RunningStatistics(len(self.variables))
+		deviations = RunningStatistics(1)
+		z = scipy.stats.norm.ppf((1 + confidence) / 2)
+		try:
+			while components.count < max_samples:
+				gradients = self.sample(min(self.batch_size, max_samples - components.count))
+				# the mean so far stands in for the true mean, the first batch uses its own
+				reference = components.mean if components.count else gradients.mean(axis=0)
+				deviations.update(((gradients - reference) ** 2).mean(axis=1))
+				components.update(gradients)
+				if components.count < 2:
+					continue
+				mean_variance = float(components.variance.mean())
+				half_width = float(z * deviations.standard_error[0])
+				converged = (
+					components.count >= min_samples and half_width <= rtol * abs(mean_variance)
+				)
+				instrumentation.emit(
+					"gradient_variance",
+					samples=components.count,
+					mean_variance=mean_variance,
+					half_width=half_width,
+					converged=converged
+				)
+				yield GradientVarianceEstimate(
+					samples=components.count,
+					mean=components.mean,
+					variance=components.variance,
+					mean_variance=mean_variance,
+					half_width=half_width,
+					converged=converged
+				)
+				if converged:
+					return
+		finally:
+			self.gradient.close()
+
+	def run(self, **kwargs) -> GradientVarianceEstimate:
+		"""Last estimate of stream, which takes the same keyword arguments."""
+		estimate = None
+		for estimate in self.stream(**kwargs):
+			pass
+		return estimate
+
+
+def scan_gradient_variance(
+	hamiltonian_creator: typing.Callable[[int], QubitHamiltonian],
+	circuit_creator: typing.Callable[[int, int], QCircuit],
+	qubits: typing.List[int],
+	depths: typing.List[int],
+	batch_size: int = 16,
+	processes: int = None,
+	seed: int = None,
+	**kwargs
+) -> typing.List[typing.Dict[str, typing.Any]]:
+	"""
+	Gradient variance for every qubit count and depth, e.g. with create_hardware_ansatz
+	as circuit_creator. Further keyword arguments go to GradientVarianceSampler.stream.
+	"""
+	rows = []
+	for n_qubits in qubits:
+		hamiltonian = hamiltonian_creator(n_qubits)
+		for depth in depths:
+			sampler = GradientVarianceSampler(
+				hamiltonian,
+				circuit_creator(n_qubits, depth),
+				batch_size=batch_size,
+				processes=processes,
+				seed=seed
+			)
+			estimate = sampler.run(**kwargs)
+			rows.append({
+				"qubits": n_qubits,
+				"depth": depth,
+				"parameters": len(sampler.variables),
+				"samples": estimate.samples,
+				"variance": estimate.mean_variance,
+				"half_width": estimate.half_width,
+				"converged": estimate.converged,
+			})
+	return rows
@@ -0,0 +1,225 @@
+import hashlib
+import os
+import typing
+import uuid
+
+import numpy as np
+import tequila as tq
+from tequila import QubitHamiltonian
+from tequila.hamiltonian.qubit_hamiltonian import PauliString
+from tequila.quantumchemistry import INSTALLED_QCHEMISTRY_BACKENDS, ParametersQC
+from tequila.quantumchemistry.qc_base import QuantumChemistryBase
+
+from helpinghand.paulis import PAULI_CODES, PAULI_NAMES
+
+# A molecule or the keyword arguments of tq.Molecule that create it. With the arguments
+# the molecule (and its SCF) is only created when the cache does not have it.
+MoleculeSource = typing.Union[QuantumChemistryBase, typing.Mapping[str, typing.Any]]
+
+
+def _geometry_description(parameters: ParametersQC) -> str:
+	try:
+		return repr([
+			(atom, tuple(round(float(x), 10) for x in coordinates))
+			for atom, coordinates in parameters.get_geometry()
+		])
+	except Exception:
+		return str(parameters.geometry)
+
+
+def molecule_key(molecule: QuantumChemistryBase) -> str:
+	"""Content hash of everything the hamiltonian and fci energy of a molecule depend on."""
+	parameters = molecule.parameters
+	geometry = _geometry_description(parameters)
+	active_space = molecule.active_space
+	transformation = molecule.transformation
+	description = [
+		type(molecule).__name__,
+		geometry,
+		str(parameters.basis_set).lower(),
+		str(parameters.multiplicity),
+		str(parameters.charge),
+		str(None if active_space is None else active_space.active_orbitals),
+		str(None if active_space is None else active_space.reference_orbitals),
+		type(transformation).__name__,
+		str(getattr(transformation, 'up_then_down', '')),
+	]
+	return hashlib.sha256('\n'.join(description).encode()).hexdigest()
+
+
+def _argument_description(value: typing.Any) -> str:
+	if callable(value):
+		return f'{getattr(value, "__module__", "")}.{getattr(value, "__qualname__", repr(value))}'
+	return repr(value)
+
+
+def resolve_backend(arguments: typing.Mapping[str, typing.Any]) -> typing.Optional[str]:
+	"""The chemistry backend tq.Molecule uses for the arguments, None if there is none."""
+	if arguments.get("backend") is not None:
+		return arguments["backend"]
+	basis_set = arguments.get("basis_set")
+	if basis_set is None or basis_set.lower() in ("madness", "mra", "pno"):
+		return "madness"
+	for backend in ("psi4", "pyscf"):
+		if backend in INSTALLED_QCHEMISTRY_BACKENDS:
+			return backend
+	return None
+
+
+def arguments_key(arguments: typing.Mapping[str, typing.Any]) -> str:
+	"""
+	Content hash of keyword arguments of tq.Molecule, without creating the molecule.
+	The backend counts as resolved by resolve_backend.
+	"""
+	settings = dict(arguments)
+	settings["backend"] = resolve_backend(arguments)
+	geometry = _geometry_description(ParametersQC(geometry=settings.pop("geometry")))
+	settings["basis_set"] = str(settings.get("basis_set")).lower()
+	description = [
+		"arguments",
+		geometry,
+		repr(sorted((name, _argument_description(value)) for name, value in settings.items())),
+	]
+	return hashlib.sha256('\n'.join(description).encode()).hexdigest()
+
+
+def source_key(molecule: MoleculeSource) -> str:
+	"""arguments_key of tq.Molecule arguments, molecule_key of a molecule."""
+	if isinstance(molecule, typing.Mapping):
+		return arguments_key(molecule)
+	return molecule_key(molecule)
+
+
+def _hamiltonian_to_arrays(hamiltonian: QubitHamiltonian) -> typing.Dict[str, np.ndarray]:
+	lengths: typing.List[int] = []
+	qubits: typing.List[int] = []
+	codes: typing.List[int] = []
+	coefficients: typing.List[complex] = []
+	for paulistring in hamiltonian.paulistrings:
+		items = list(paulistring.items())
+		lengths.append(len(items))
+		qubits.extend(qubit for qubit, _ in items)
+		codes.extend(PAULI_CODES[pauli.upper()] for _, pauli in items)
+		coefficients.append(complex(paulistring.coeff))
+	coefficients = np.array(coefficients, dtype=np.complex128)
+	if not coefficients.imag.any():
+		coefficients = coefficients.real
+	return {
+		"lengths": np.array(lengths, dtype=np.int32),
+		"qubits": np.array(qubits, dtype=np.int32),
+		"codes": np.array(codes, dtype=np.uint8),
+		"coefficients": coefficients,
+	}
+
+
+def _hamiltonian_from_arrays(arrays: typing.Mapping[str, np.ndarray]) -> QubitHamiltonian:
+	qubits = arrays["qubits"].tolist()
+	codes = arrays["codes"].tolist()
+	coefficients = arrays["coefficients"].tolist()
+	paulistrings: typing.List[PauliString] = []
+	start = 0
+	for length, coefficient in zip(arrays["lengths"].tolist(), coefficients):
+		data = {qubits[i]: PAULI_NAMES[codes[i]] for i in range(start, start + length)}
+		paulistrings.append(PauliString(data=data, coeff=coefficient))
+		start += length
+	return QubitHamiltonian.from_paulistrings(paulistrings)
+
+
+class HamiltonianCache:
+	"""
+	Content addressed disk cache for qubit hamiltonians and fci energies of molecules.
+
+	Every molecule is stored in its own .npz file in `directory`, named after
+	source_key, and only read when it is asked for. When the files grow over
+	`max_bytes` the least recently used ones are deleted.
+	"""
+	def __init__(self, directory: str, max_bytes: int = 2 ** 30):
+		self.directory: str = directory
+		self.max_bytes: int = max_bytes
+		os.makedirs(directory, exist_ok=True)
+
+	def _path(self, key: str) -> str:
+		return os.path.join(self.directory, f'{key}.npz')
+
+	def load(self, molecule: MoleculeSource) -> typing.Optional[
+		typing.Tuple[QubitHamiltonian, float]
+	]:
+		path = self._path(source_key(molecule))
+		try:
+			with np.load(path) as arrays:
+				hamiltonian = _hamiltonian_from_arrays(arrays)
+				fci_energy = float(arrays["fci_energy"])
+		except (OSError, KeyError, ValueError):
+			return None
+		os.utime(path)
+		return (hamiltonian, fci_energy)
+
+	def store(
+		self,
+		molecule: MoleculeSource,
+		hamiltonian: QubitHamiltonian,
+		fci_energy: float
+	) -> None:
+		path = self._path(source_key(molecule))
+		temporary_path = f'{path}.{uuid.uuid4().hex}.tmp.npz'
+		np.savez_compressed(
+			temporary_path,
+			fci_energy=np.float64(fci_energy),
+			**_hamiltonian_to_arrays(hamiltonian)
+		)
+		os.replace(temporary_path, path)
+		self._evict()
+
+	def _evict(self) -> None:
+		entries = []
+		for name in os.listdir(self.directory):
+			if not name.endswith('.npz') or name.endswith('.tmp.npz'):
+				continue
+			try:
+				stat = os.stat(os.path.join(self.directory, name))
+			except FileNotFoundError:
+				continue
+			entries.append((stat.st_mtime, stat.st_size, name))
+		total = sum(size for _, size, _ in entries)
+		for _, size, name in sorted(entries):
+			if total <= self.max_bytes:
+				break
+			try:
+				os.remove(os.path.join(self.directory, name))
+			except FileNotFoundError:
+				pass
+			total -= size
+
+	def clear(self) -> None:
+		for name in os.listdir(self.directory):
+			if name.endswith('.npz'):
+				os.remove(os.path.join(self.directory, name))
+
+
+def hamiltonian_and_fci(
+	molecule: MoleculeSource,
+	cache: HamiltonianCache = None,
+	backend: str = None
+) -> typing.Tuple[QubitHamiltonian, float]:
+	"""
+	Returns (hamiltonian, fci_energy), from the cache if it is given and has them.
+	Given the arguments of tq.Molecule, the molecule is only created on a cache miss,
+	with `backend` if the arguments do not name one.
+	"""
+	if isinstance(molecule, typing.Mapping):
+		molecule = dict(molecule)
+		if backend is not None:
+			molecule.setdefault("backend", backend)
+		molecule["backend"] = resolve_backend(molecule)
+	if cache is not None:
+		cached = cache.load(molecule)
+		if cached is not None:
+			return cached
+	created: QuantumChemistryBase = (
+		tq.Molecule(**molecule) if isinstance(molecule, typing.Mapping) else molecule
+	)
+	hamiltonian: QubitHamiltonian = created.make_hamiltonian()
+	fci_energy: float = created.compute_energy('fci')
+	if cache is not None:
+		cache.store(molecule, hamiltonian, fci_energy)
+	return (hamiltonian, fci_energy)
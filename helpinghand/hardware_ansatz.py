@@ -1,23 +1,112 @@
+import collections
+import copy
+import typing
+
 import tequila as tq
 from tequila.circuit.circuit import QCircuit
+from tequila.objective.objective import Variable
+
+from helpinghand.cache import LRUCache
+from helpinghand.hashing import circuit_hash
+from helpinghand.variables import VariableOrder
+
+# Prototype gates of every rotation layer and entangling layer, created once and reused
+# by all depths. They never leave this module: circuits get copies, because tequila
+# changes gates in place (e.g. QCircuit.add_controls).
+_LAYERS = LRUCache(maxsize=4096)
+_TEMPLATES = LRUCache(maxsize=64)
+
+
+def _copy_gates(gates: typing.Iterable) -> typing.List:
+	# Tequila replaces the attributes of a gate instead of changing them, so a shallow
+	# copy is enough to keep changes of the copy away from the prototype.
+	return [copy.copy(gate) for gate in gates]
+
+
+def _uent_gates(n_qubits: int) -> typing.Tuple:
+	key = ("uent", n_qubits)
+	gates = _LAYERS.get(key)
+	if gates is None:
+		pairs = [(i - 1, i) for i in range(1, n_qubits, 2)] + [(i - 1, i) for i in range(2, n_qubits, 2)]
+		gates = tuple(
+			tq.gates.CZ(target=target, control=control).gates[0] for control, target in pairs
+		)
+		_LAYERS.put(key, gates)
+	return gates
+
+
+def _rotation_gates(n_qubits: int, depth_position: int) -> typing.Tuple:
+	key = ("rotations", n_qubits, depth_position)
+	gates = _LAYERS.get(key)
+	if gates is None:
+		gates = tuple(
+			gate(f'{qubit}^{depth_position}_{k}', target=qubit).gates[0]
+			for qubit in range(n_qubits)
+			for k, gate in enumerate((tq.gates.Rz, tq.gates.Rx, tq.gates.Rz))
+		)
+		_LAYERS.put(key, gates)
+	return gates
 
 
 def create_uent(n_qubits: int) -> QCircuit:
-	circuit: QCircuit = QCircuit()
-	for i in range(1, n_qubits, 2):
-		circuit += tq.gates.CZ(target=i, control=i - 1)
-	for i in range(2, n_qubits, 2):
-		circuit += tq.gates.CZ(target=i, control=i - 1)
-	return circuit
+	return QCircuit(gates=_copy_gates(_uent_gates(n_qubits)))
 
 
 def create_rotations(n_qubits: int, depth_position: int):
-	circuit: QCircuit = QCircuit()
-	for qubit in range(n_qubits):
-		circuit += tq.gates.Rz(f'{qubit}^{depth_position}_0', target=qubit)
-		circuit += tq.gates.Rx(f'{qubit}^{depth_position}_1', target=qubit)
-		circuit += tq.gates.Rz(f'{qubit}^{depth_position}_2', target=qubit)
-	return circuit
+	return QCircuit(gates=_copy_gates(_rotation_gates(n_qubits, depth_position)))
+
+
+class HardwareAnsatzTemplate(VariableOrder):
+	"""
+	Structure and parameters of a hardware efficient ansatz, see hardware_ansatz_template.
+
+	`variables` fixes the order of the flat parameter vector: rotation layer, then
+	qubit, then the Rz, Rx, Rz of the qubit. `index` maps variable names to positions.
+	"""
+	def __init__(self, n_qubits: int, d: int, gates: typing.Sequence):
+		self.n_qubits: int = n_qubits
+		self.d: int = d
+		self._prototypes: typing.Tuple = tuple(gates)
+		# variable -> positions of the gates it appears in
+		self._positions: typing.Dict[Variable, typing.Tuple[int, ...]] = {
+			variable: tuple(position for position, _ in gates)
+			for variable, gates in QCircuit(gates=self._prototypes).make_parameter_map().items()
+		}
+		self.variables: typing.List[Variable] = list(self._positions)
+		self.index: typing.Dict[typing.Hashable, int] = {
+			variable.name: position for position, variable in enumerate(self.variables)
+		}
+
+	@property
+	def n_parameters(self) -> int:
+		return len(self.variables)
+
+	def circuit(self) -> QCircuit:
+		"""A new circuit of the ansatz with its own gates, copied from the cached ones."""
+		gates = _copy_gates(self._prototypes)
+		parameter_map = collections.defaultdict(list)
+		for variable, positions in self._positions.items():
+			parameter_map[variable] = [(position, gates[position]) for position in positions]
+		return QCircuit(gates=gates, parameter_map=parameter_map)
+
+
+def hardware_ansatz_template(
+	n_qubits: int,
+	d: int,
+	uent: QCircuit = None
+) -> HardwareAnsatzTemplate:
+	"""The cached HardwareAnsatzTemplate of create_hardware_ansatz(n_qubits, d, uent)."""
+	key = (n_qubits, d, None if not uent else circuit_hash(uent))
+	template = _TEMPLATES.get(key)
+	if template is None:
+		uent_gates = tuple(_copy_gates(uent.gates)) if uent else _uent_gates(n_qubits)
+		gates = list(_rotation_gates(n_qubits, 0))
+		for depth in range(d):
+			gates.extend(uent_gates)
+			gates.extend(_rotation_gates(n_qubits, depth + 1))
+		template = HardwareAnsatzTemplate(n_qubits, d, gates)
+		_TEMPLATES.put(key, template)
+	return template
 
 
 def create_hardware_ansatz(
@@ -25,10 +114,4 @@ def create_hardware_ansatz(
 	d: int,
 	uent: QCircuit = None
 ) -> QCircuit:
-	if not uent:
-		uent = create_uent(n_qubits)
-	circuit: QCircuit = create_rotations(n_qubits, 0)
-	for depth in range(d):
-		circuit += uent
-		circuit += create_rotations(n_qubits, depth + 1)
-	return circuit
+	return hardware_ansatz_template(n_qubits, d, uent).circuit()
@@ -0,0 +1,57 @@
+import hashlib
+import typing
+
+import tequila as tq
+from tequila.circuit._gates_impl import QGateImpl
+from tequila.objective.objective import FixedVariable, Objective, Variable
+
+# Objective parameters are told apart by their value at this (arbitrary) point.
+_PROBE_VALUE: float = 0.6180339887498949
+
+
+def _parameter_key(parameter: typing.Any) -> str:
+	if isinstance(parameter, FixedVariable):
+		return f'fixed:{float(parameter)!r}'
+	if isinstance(parameter, Variable):
+		return f'variable:{parameter.name}'
+	if isinstance(parameter, Objective):
+		variables = parameter.extract_variables()
+		value = parameter({variable: _PROBE_VALUE for variable in variables})
+		names = ','.join(sorted(str(variable.name) for variable in variables))
+		return f'objective:{names}:{float(value)!r}'
+	return f'value:{parameter!r}'
+
+
+def gate_key(gate: QGateImpl) -> str:
+	"""Structural description of a gate: type, name, qubits, parameter and generator."""
+	parameter = _parameter_key(gate.parameter) if gate.is_parametrized() else ''
+	return '|'.join([
+		type(gate).__name__,
+		gate.name,
+		str(tuple(gate.target)),
+		str(tuple(gate.control)),
+		parameter,
+		str(getattr(gate, 'generator', '')),
+		str(getattr(gate, 'paulistring', '')),
+		str(getattr(gate, 'steps', '')),
+	])
+
+
+def circuit_hash(circuit: tq.QCircuit) -> str:
+	"""Hash of the gate sequence of a circuit, equal for structurally equal circuits."""
+	digest = hashlib.sha1()
+	for gate in circuit.gates:
+		digest.update(gate_key(gate).encode())
+		digest.update(b'\n')
+	return digest.hexdigest()
+
+
+def hamiltonian_hash(hamiltonian: tq.QubitHamiltonian, coefficients: bool = True) -> str:
+	"""Hash of the pauli strings of a hamiltonian, with or without their coefficients."""
+	terms = []
+	for paulistring in hamiltonian.paulistrings:
+		term = ' '.join(f'{pauli}{qubit}' for qubit, pauli in sorted(paulistring.items()))
+		if coefficients:
+			term = f'{term}:{complex(paulistring.coeff)!r}'
+		terms.append(term)
+	return hashlib.sha1('\n'.join(sorted(terms)).encode()).hexdigest()
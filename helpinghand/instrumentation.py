@@ -0,0 +1,122 @@
+import json
+import os
+import time
+import typing
+
+Hook = typing.Callable[[typing.Dict[str, typing.Any]], None]
+
+_HOOKS: typing.List[Hook] = []
+
+
+def add_hook(hook: Hook) -> None:
+	"""Calls hook with the record dictionary of every following event."""
+	_HOOKS.append(hook)
+
+
+def remove_hook(hook: Hook) -> None:
+	if hook in _HOOKS:
+		_HOOKS.remove(hook)
+
+
+def enabled() -> bool:
+	return bool(_HOOKS)
+
+
+def emit(event: str, **fields) -> None:
+	"""Reports an event to all hooks, does nothing if there are none."""
+	if not _HOOKS:
+		return
+	record = {"event": event, "time": time.time(), "pid": os.getpid(), **fields}
+	for hook in list(_HOOKS):
+		hook(record)
+
+
+class _Stage:
+	"""Times the enclosed block and emits it as one event with a duration in seconds."""
+	__slots__ = ("event", "fields", "start")
+
+	def __init__(self, event: str, fields: typing.Dict[str, typing.Any]):
+		self.event: str = event
+		self.fields: typing.Dict[str, typing.Any] = fields
+		self.start: float = 0.0
+
+	def update(self, **fields) -> None:
+		"""Adds fields to the event, e.g. counts that are only known at the end."""
+		self.fields.update(fields)
+
+	def __enter__(self) -> '_Stage':
+		self.start = time.perf_counter()
+		return self
+
+	def __exit__(self, kind, error, traceback) -> bool:
+		duration = time.perf_counter() - self.start
+		if kind is not None:
+			self.fields["error"] = kind.__name__
+		emit(self.event, duration=duration, **self.fields)
+		return False
+
+
+class _NullStage:
+	__slots__ = ()
+
+	def update(self, **fields) -> None:
+		pass
+
+	def __enter__(self) -> '_NullStage':
+		return self
+
+	def __exit__(self, kind, error, traceback) -> bool:
+		return False
+
+
+_NULL_STAGE = _NullStage()
+
+
+def stage(event: str, **fields) -> typing.Union[_Stage, _NullStage]:
+	"""
+	Context manager that emits `event` with the duration of the block.
+
+	Without hooks a shared object that does nothing is returned, so instrumented code
+	costs one function call and one list check per stage.
+	"""
+	if not _HOOKS:
+		return _NULL_STAGE
+	return _Stage(event, fields)
+
+
+class JsonLinesRecorder:
+	"""
+	Hook that appends every event as one JSON line to a file.
+
+	Used as context manager it registers itself on enter and unregisters and closes
+	the file on exit. Values that are not JSON serialisable are written as strings.
+	"""
+	def __init__(self, path: str, mode: str = "a"):
+		self.path: str = path
+		self.mode: str = mode
+		self._file: typing.Optional[typing.TextIO] = None
+
+	def __call__(self, record: typing.Dict[str, typing.Any]) -> None:
+		if self._file is None:
+			self._file = open(self.path, self.mode)
+		self._file.write(json.dumps(record, default=str) + "\n")
+		self._file.flush()
+
+	def close(self) -> None:
+		if self._file is not None:
+			self._file.close()
+			self._file = None
+
+	def __enter__(self) -> 'JsonLinesRecorder':
+		add_hook(self)
+		return self
+
+	def __exit__(self, *args) -> None:
+		remove_hook(self)
+		self.close()
+
+
+def read_records(path: str) -> typing.List[typing.Dict[str, typing.Any]]:
+	"""All records of a JSON lines file written by JsonLinesRecorder."""
+	with open(path) as file:
+		return [json.loads(line) for line in file if line.strip()]
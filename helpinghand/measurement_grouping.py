@@ -0,0 +1,123 @@
+import typing
+
+import numpy as np
+import tequila as tq
+from tequila import QCircuit, QubitHamiltonian
+from tequila.hamiltonian.qubit_hamiltonian import PauliString
+from tequila.objective.objective import Objective
+
+from helpinghand.cache import LRUCache
+from helpinghand.hashing import hamiltonian_hash
+from helpinghand.paulis import PAULI_CODES, PAULI_NAMES, PauliKey, pauli_coefficients
+
+GROUPINGS: typing.Tuple[str, ...] = ("qwc",)
+# Largest number of (term, term, qubit) entries compared at once.
+_CHUNK_ENTRIES: int = 2 ** 24
+_GROUPS = LRUCache(maxsize=32)
+
+
+class MeasurementGroup(typing.NamedTuple):
+	# pauli measured on every qubit any term of the group acts on
+	basis: typing.Dict[int, str]
+	terms: typing.List[PauliKey]
+
+
+def _conflict_degrees(codes: np.ndarray) -> np.ndarray:
+	"""Number of terms every term does not qubit-wise commute with."""
+	n_terms, n_qubits = codes.shape
+	chunk = max(1, _CHUNK_ENTRIES // max(1, n_terms * n_qubits))
+	active = codes != 0
+	degrees = np.zeros(n_terms, dtype=np.int64)
+	for start in range(0, n_terms, chunk):
+		rows = slice(start, start + chunk)
+		conflicts = (
+			active[rows, None, :] & active[None, :, :] & (codes[rows, None, :] != codes[None, :, :])
+		).any(axis=2)
+		degrees[rows] = conflicts.sum(axis=1)
+	return degrees
+
+
+def qwc_groups(hamiltonian: QubitHamiltonian) -> typing.List[MeasurementGroup]:
+	"""
+	Partition of the pauli strings into qubit-wise commuting groups.
+
+	Greedy colouring of the conflict graph: terms are taken in order of decreasing
+	conflict degree and put into the first group they commute with on every qubit.
+	The grouping only depends on the pauli strings, so it is cached per structure.
+	"""
+	key = hamiltonian_hash(hamiltonian, coefficients=False)
+	groups = _GROUPS.get(key)
+	if groups is not None:
+		return groups
+
+	terms = list(pauli_coefficients(hamiltonian))
+	n_qubits = max((qubit + 1 for term in terms for qubit, _ in term), default=0)
+	codes = np.zeros((len(terms), n_qubits), dtype=np.int8)
+	for row, term in enumerate(terms):
+		for qubit, pauli in term:
+			codes[row, qubit] = PAULI_CODES[pauli]
+
+	order = np.argsort(-_conflict_degrees(codes), kind="stable")
+	bases = np.zeros((len(terms), n_qubits), dtype=np.int8)
+	members: typing.List[typing.List[int]] = []
+	for term in order.tolist():
+		code = codes[term]
+		fits = ((bases[:len(members)] == 0) | (code == 0) | (bases[:len(members)] == code)).all(axis=1)
+		hits = np.flatnonzero(fits)
+		if len(hits):
+			group = int(hits[0])
+		else:
+			group = len(members)
+			members.append([])
+		bases[group] = np.where(code != 0, code, bases[group])
+		members[group].append(term)
+
+	groups = [
+		MeasurementGroup(
+			basis={
+				qubit: PAULI_NAMES[bases[group, qubit]]
+				for qubit in np.flatnonzero(bases[group]).tolist()
+			},
+			terms=[terms[term] for term in rows]
+		)
+		for group, rows in enumerate(members)
+	]
+	_GROUPS.put(key, groups)
+	return groups
+
+
+def basis_rotation(basis: typing.Dict[int, str]) -> QCircuit:
+	"""Circuit after which measuring Z on every qubit measures the given basis."""
+	rotation = QCircuit()
+	for qubit, pauli in sorted(basis.items()):
+		if pauli == "X":
+			rotation += tq.gates.H(target=qubit)
+		elif pauli == "Y":
+			rotation += tq.gates.Rx(angle=np.pi / 2, target=qubit)
+	return rotation
+
+
+def grouped_expectation_value(
+	hamiltonian: QubitHamiltonian,
+	circuit: QCircuit,
+	grouping: str = "qwc"
+) -> Objective:
+	"""
+	<U|H|U> as a sum with one expectation value per measurement group.
+
+	With "qwc" every group is measured with U followed by single qubit basis rotations
+	and a hamiltonian of Z strings.
+	"""
+	if grouping != "qwc":
+		raise ValueError(f"Unknown grouping '{grouping}', expected one of {GROUPINGS}.")
+
+	coefficients = pauli_coefficients(hamiltonian)
+	objective: Objective = None
+	for group in qwc_groups(hamiltonian):
+		diagonal = QubitHamiltonian.from_paulistrings([
+			PauliString(data={qubit: "Z" for qubit, _ in term}, coeff=coefficients[term])
+			for term in group.terms
+		])
+		expectation_value = tq.ExpectationValue(H=diagonal, U=circuit + basis_rotation(group.basis))
+		objective = expectation_value if objective is None else objective + expectation_value
+	return objective
@@ -0,0 +1,131 @@
+import itertools
+import typing
+import uuid
+import weakref
+
+from tequila import QCircuit
+from tequila.simulators import simulator_api
+
+from helpinghand import instrumentation, statevector  # noqa: F401 registers the "numpy" backend
+from helpinghand.cache import LRUCache
+from helpinghand.hashing import circuit_hash
+
+# Caches by token. Weak, so a cache and its compiled circuits go away with the last
+# reference to it; caches restored in a worker process are kept for the life of the worker,
+# so that its tasks share them.
+_OBJECTIVE_CACHES: typing.MutableMapping[str, 'ObjectiveCache'] = weakref.WeakValueDictionary()
+_RESTORED_CACHES: typing.Dict[str, 'ObjectiveCache'] = {}
+_BACKEND_COUNTER = itertools.count()
+
+
+class ObjectiveCache:
+	"""
+	Tequila backend that compiles every distinct circuit only once.
+
+	Expectation values compiled with the backend `cache.backend` reuse the compiled
+	circuit of any earlier expectation value with the same circuit, so for a new
+	hamiltonian only the hamiltonian is bound. The least recently used of at most
+	`maxsize` compiled circuits are kept.
+
+	The backend is registered with tequila until close() is called, the cache is used
+	as context manager or it is garbage collected.
+	"""
+	def __init__(self, maxsize: int = 32, backend: str = None, _token: str = None):
+		self.maxsize: int = maxsize
+		self.base_backend: str = simulator_api.pick_backend(backend=backend)
+		self.backend: str = f'{self.base_backend}_cached_{next(_BACKEND_COUNTER)}'
+		self.circuits: LRUCache = LRUCache(maxsize)
+		self._token: str = _token if _token else uuid.uuid4().hex
+		self._register()
+		_OBJECTIVE_CACHES[self._token] = self
+		self._finalizer = weakref.finalize(self, _unregister, self.backend)
+
+	def _register(self) -> None:
+		base_types = simulator_api.INSTALLED_SIMULATORS[self.base_backend]
+		backend_types = simulator_api.BackendTypes(
+			CircType=base_types.CircType,
+			ExpValueType=_cached_expectation_value_type(base_types.ExpValueType, self._token)
+		)
+		simulator_api.SUPPORTED_BACKENDS.append(self.backend)
+		simulator_api.INSTALLED_SIMULATORS[self.backend] = backend_types
+		if self.base_backend in simulator_api.INSTALLED_SAMPLERS:
+			simulator_api.INSTALLED_SAMPLERS[self.backend] = backend_types
+		if self.base_backend in simulator_api.INSTALLED_NOISE_SAMPLERS:
+			simulator_api.INSTALLED_NOISE_SAMPLERS[self.backend] = backend_types
+
+	def compiled_circuit(
+		self,
+		circuit: QCircuit,
+		key: typing.Tuple,
+		compile: typing.Callable[[], typing.Any]
+	) -> typing.Any:
+		cache_key = (circuit_hash(circuit), *key)
+		compiled = self.circuits.get(cache_key)
+		if compiled is None:
+			with instrumentation.stage("compile", backend=self.base_backend, cached=False):
+				compiled = compile()
+			self.circuits.put(cache_key, compiled)
+		else:
+			instrumentation.emit("compile", backend=self.base_backend, cached=True, duration=0.0)
+		return compiled
+
+	def clear(self) -> None:
+		self.circuits.clear()
+
+	def close(self) -> None:
+		"""Unregisters the backend and drops the compiled circuits."""
+		self._finalizer()
+		self.clear()
+		if _RESTORED_CACHES.get(self._token) is self:
+			del _RESTORED_CACHES[self._token]
+
+	def __enter__(self) -> 'ObjectiveCache':
+		return self
+
+	def __exit__(self, *args) -> None:
+		self.close()
+
+	def __len__(self) -> int:
+		return len(self.circuits)
+
+	def __reduce__(self):
+		# Worker processes share one cache per parent cache instead of one per task.
+		return (_restore_objective_cache, (self._token, self.maxsize, self.base_backend))
+
+
+def _restore_objective_cache(token: str, maxsize: int, backend: str) -> ObjectiveCache:
+	cache = _OBJECTIVE_CACHES.get(token)
+	if cache is None:
+		cache = ObjectiveCache(maxsize=maxsize, backend=backend, _token=token)
+		_RESTORED_CACHES[token] = cache
+	return cache
+
+
+def _unregister(backend: str) -> None:
+	if backend in simulator_api.SUPPORTED_BACKENDS:
+		simulator_api.SUPPORTED_BACKENDS.remove(backend)
+	for registry in (
+		simulator_api.INSTALLED_SIMULATORS,
+		simulator_api.INSTALLED_SAMPLERS,
+		simulator_api.INSTALLED_NOISE_SAMPLERS
+	):
+		registry.pop(backend, None)
+
+
+def _cached_expectation_value_type(base: type, token: str) -> type:
+	# The type only knows the token, a registered backend must not keep its cache alive.
+	class CachedExpectationValue(base):
+		def initialize_unitary(self, U, variables, noise, device, *args, **kwargs):
+			def compile():
+				return super(CachedExpectationValue, self).initialize_unitary(
+					U, variables, noise, device, *args, **kwargs
+				)
+
+			cache = _OBJECTIVE_CACHES.get(token)
+			if cache is None:
+				return compile()
+			key = (repr(noise), repr(device), repr(args), repr(sorted(kwargs.items())))
+			return cache.compiled_circuit(U, key, compile)
+
+	CachedExpectationValue.__name__ = f'Cached{base.__name__}'
+	return CachedExpectationValue
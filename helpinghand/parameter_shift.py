@@ -0,0 +1,264 @@
+import typing
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import scipy.optimize
+import tequila as tq
+from tequila import QCircuit, QubitHamiltonian
+from tequila.objective.objective import FixedVariable, Objective, Variable
+from tequila.optimizers.optimizer_base import OptimizerHistory
+from tequila.optimizers.optimizer_scipy import SciPyResults
+
+from helpinghand import instrumentation
+from helpinghand.cache import LRUCache
+from helpinghand.hashing import circuit_hash, hamiltonian_hash
+from helpinghand.statevector import BACKEND, BackendExpectationValueStatevector
+from helpinghand.variables import VariableOrder
+
+_ENGINES = LRUCache(maxsize=8)
+_WORKER_ENGINE: typing.Optional[BackendExpectationValueStatevector] = None
+
+
+def _engine(hamiltonian: QubitHamiltonian, circuit: QCircuit) -> BackendExpectationValueStatevector:
+	key = (circuit_hash(circuit), hamiltonian_hash(hamiltonian))
+	engine = _ENGINES.get(key)
+	if engine is None:
+		expectation_value = tq.ExpectationValue(U=circuit, H=hamiltonian).get_expectationvalues()[0]
+		engine = BackendExpectationValueStatevector(
+			expectation_value, variables=None, noise=None, device=None
+		)
+		_ENGINES.put(key, engine)
+	return engine
+
+
+def _energies(engine: BackendExpectationValueStatevector, angles: np.ndarray) -> np.ndarray:
+	states = engine.U.statevectors(angles)
+	return sum(H.expectation_values(states) for H in engine.H)
+
+
+def _initialize_worker(hamiltonian: QubitHamiltonian, circuit: QCircuit) -> None:
+	global _WORKER_ENGINE
+	_WORKER_ENGINE = _engine(hamiltonian, circuit)
+
+
+def _worker_energies(angles: np.ndarray) -> np.ndarray:
+	return _energies(_WORKER_ENGINE, angles)
+
+
+class ParameterShiftGradient(VariableOrder):
+	"""
+	Gradients of <U|H|U> by the parameter shift rule, evaluated in batches.
+
+	The angle of every rotation gate is shifted by +-pi/2, the shifted angle vectors of all
+	gates (and all points) are stacked into one matrix and simulated `batch_size` rows at a
+	time with the numpy statevector engine, in this process or, with `processes` > 1, on a
+	worker pool that lives until close(). Gates whose parameter is an objective of
+	variables enter by the chain rule.
+	"""
+	def __init__(
+		self,
+		hamiltonian: QubitHamiltonian,
+		circuit: QCircuit,
+		batch_size: int = 64,
+		processes: int = None
+	):
+		self.hamiltonian: QubitHamiltonian = hamiltonian
+		self.circuit: QCircuit = circuit
+		self.batch_size: int = batch_size
+		self.processes: typing.Optional[int] = processes
+		self.engine: BackendExpectationValueStatevector = _engine(hamiltonian, circuit)
+		self.variables: typing.List[Variable] = list(circuit.extract_variables())
+		self.index: typing.Dict[typing.Hashable, int] = {
+			variable.name: column for column, variable in enumerate(self.variables)
+		}
+		self._executor: typing.Optional[ProcessPoolExecutor] = None
+
+		parameters = self.engine.U.parameters
+		self.n_gates: int = len(parameters)
+		# gates with a plain variable as angle, their row among the shifted gates and column
+		self._direct_gates: typing.List[int] = []
+		self._direct_rows: typing.List[int] = []
+		self._direct_columns: typing.List[int] = []
+		# gates with a fixed value or an objective as angle
+		self._other_gates: typing.List[int] = []
+		# shifted gates, and the derivatives of objective angles by their variables
+		self._shifted: typing.List[int] = []
+		self._derivatives: typing.List[typing.Tuple[int, int, Objective]] = []
+		for gate, parameter in enumerate(parameters):
+			if parameter is None:
+				continue
+			if isinstance(parameter, Variable) and not isinstance(parameter, FixedVariable):
+				self._direct_gates.append(gate)
+				self._direct_rows.append(len(self._shifted))
+				self._direct_columns.append(self.index[parameter.name])
+				self._shifted.append(gate)
+				continue
+			self._other_gates.append(gate)
+			variables = [] if isinstance(parameter, FixedVariable) else parameter.extract_variables()
+			if variables:
+				for variable in variables:
+					self._derivatives.append((
+						len(self._shifted), self.index[variable.name], tq.grad(parameter, variable)
+					))
+				self._shifted.append(gate)
+
+		# d angle / d variable of the shifted gates, fixed part
+		self._jacobian: np.ndarray = np.zeros((len(self._shifted), len(self.variables)))
+		self._jacobian[self._direct_rows, self._direct_columns] = 1.0
+		self._shifts: np.ndarray = np.zeros((2 * len(self._shifted), self.n_gates))
+		self._shifts[np.arange(len(self._shifted)), self._shifted] = np.pi / 2
+		self._shifts[np.arange(len(self._shifted)) + len(self._shifted), self._shifted] = -np.pi / 2
+
+	def _points(self, values: typing.Union[typing.Dict, np.ndarray]) -> np.ndarray:
+		if isinstance(values, dict):
+			values = self.to_array(values)
+		values = np.asarray(values, dtype=float)
+		if values.ndim != 2 or values.shape[1] != len(self.variables):
+			values = values.reshape(-1, len(self.variables))
+		return values
+
+	def angles(self, values: np.ndarray) -> np.ndarray:
+		"""Gate angles (n_points, n_gates) for variable values (n_points, n_variables)."""
+		angles = np.zeros((len(values), self.n_gates))
+		angles[:, self._direct_gates] = values[:, self._direct_columns]
+		if self._other_gates:
+			parameters = self.engine.U.parameters
+			for row, point in enumerate(values):
+				variables = self.to_dict(point)
+				for gate in self._other_gates:
+					angles[row, gate] = float(parameters[gate](variables))
+		return angles
+
+	def evaluate(self, angles: np.ndarray) -> np.ndarray:
+		"""Energies for gate angles of shape (n_points, n_gates)."""
+		chunks = [
+			angles[start:start + self.batch_size] for start in range(0, len(angles), self.batch_size)
+		]
+		parallel = self.processes is not None and self.processes > 1 and len(chunks) > 1
+		with instrumentation.stage("evaluate", points=len(angles), chunks=len(chunks), parallel=parallel):
+			if parallel:
+				return np.concatenate(list(self.executor.map(_worker_energies, chunks)))
+			return np.concatenate([_energies(self.engine, chunk) for chunk in chunks] or [np.zeros(0)])
+
+	@property
+	def executor(self) -> ProcessPoolExecutor:
+		if self._executor is None:
+			self._executor = ProcessPoolExecutor(
+				max_workers=self.processes,
+				initializer=_initialize_worker,
+				initargs=(self.hamiltonian, self.circuit)
+			)
+		return self._executor
+
+	def close(self) -> None:
+		if self._executor is not None:
+			self._executor.shutdown()
+			self._executor = None
+
+	def __enter__(self) -> 'ParameterShiftGradient':
+		return self
+
+	def __exit__(self, *args) -> None:
+		self.close()
+
+	def energies(self, values: np.ndarray) -> np.ndarray:
+		"""Energies for variable values of shape (n_points, n_variables)."""
+		return self.evaluate(self.angles(self._points(values)))
+
+	def gradients(self, values: np.ndarray) -> np.ndarray:
+		"""Gradients of shape (n_points, n_variables) at the rows of values."""
+		values = self._points(values)
+		angles = self.angles(values)
+		shifted = (angles[:, None, :] + self._shifts[None]).reshape(-1, self.n_gates)
+		energies = self.evaluate(shifted).reshape(len(values), 2, len(self._shifted))
+		angle_gradients = (energies[:, 0] - energies[:, 1]) / 2
+		if not self._derivatives:
+			return angle_gradients @ self._jacobian
+		result = np.empty((len(values), len(self.variables)))
+		for row, point in enumerate(values):
+			jacobian = self._jacobian.copy()
+			variables = self.to_dict(point)
+			for gate, column, derivative in self._derivatives:
+				jacobian[gate, column] += float(derivative(variables))
+			result[row] = angle_gradients[row] @ jacobian
+		return result
+
+	def __call__(self, values: typing.Union[typing.Dict, np.ndarray]) -> np.ndarray:
+		"""Full gradient vector, ordered like self.variables."""
+		return self.gradients(values)[0]
+
+
+class ParameterShiftOptimizer:
+	"""
+	scipy.optimize.minimize of one expectation value with ParameterShiftGradient gradients.
+
+	Called like tq.minimize and returns SciPyResults with the energy, angle and gradient of
+	every iteration, so it can be the optimizer of compute and get_max_from_VQE.
+	"""
+	def __init__(
+		self,
+		method: str = "BFGS",
+		maxiter: int = None,
+		tol: float = None,
+		batch_size: int = 64,
+		processes: int = None
+	):
+		self.method: str = method
+		self.maxiter: typing.Optional[int] = maxiter
+		self.tol: typing.Optional[float] = tol
+		self.batch_size: int = batch_size
+		self.processes: typing.Optional[int] = processes
+
+	def __call__(
+		self,
+		objective: Objective,
+		initial_values: typing.Dict[Variable, float] = None,
+		backend: str = None
+	) -> SciPyResults:
+		if backend is not None and backend != BACKEND:
+			raise ValueError(f"ParameterShiftOptimizer only simulates with the '{BACKEND}' backend.")
+		if not objective.is_expectationvalue():
+			raise ValueError("ParameterShiftOptimizer only minimizes a single expectation value.")
+		expectation_value = objective.get_expectationvalues()[0]
+		if len(expectation_value.H) != 1:
+			raise ValueError("ParameterShiftOptimizer only minimizes a single hamiltonian.")
+
+		with ParameterShiftGradient(
+			expectation_value.H[0],
+			expectation_value.U,
+			batch_size=self.batch_size,
+			processes=self.processes
+		) as gradient:
+			x0 = gradient.to_array(initial_values) if initial_values else np.zeros(len(gradient.variables))
+			energies: typing.Dict[bytes, float] = {}
+			gradients: typing.Dict[bytes, np.ndarray] = {}
+			history = OptimizerHistory()
+
+			def energy(x: np.ndarray) -> float:
+				if x.tobytes() not in energies:
+					energies[x.tobytes()] = float(gradient.energies(x)[0])
+					history.energies_calls.append(energies[x.tobytes()])
+				return energies[x.tobytes()]
+
+			def jacobian(x: np.ndarray) -> np.ndarray:
+				if x.tobytes() not in gradients:
+					gradients[x.tobytes()] = gradient(x)
+					history.gradients_calls.append(gradient.to_dict(gradients[x.tobytes()]))
+				return gradients[x.tobytes()]
+
+			def callback(x: np.ndarray) -> None:
+				history.energies.append(energy(x))
+				history.angles.append(gradient.to_dict(x))
+				history.gradients.append(gradient.to_dict(jacobian(x)))
+
+			options = {} if self.maxiter is None else {"maxiter": self.maxiter}
+			result = scipy.optimize.minimize(
+				energy, x0, jac=jacobian, method=self.method, tol=self.tol,
+				callback=callback, options=options
+			)
+			return SciPyResults(
+				energy=energy(result.x),
+				history=history,
+				variables=gradient.to_dict(result.x),
+				scipy_result=result
+			)
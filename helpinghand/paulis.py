@@ -0,0 +1,92 @@
+import typing
+
+import numpy as np
+from tequila import QubitHamiltonian
+from tequila.hamiltonian.qubit_hamiltonian import PauliString
+
+PAULI_CODES: typing.Dict[str, int] = {"X": 1, "Y": 2, "Z": 3}
+PAULI_NAMES: typing.Dict[int, str] = {code: name for name, code in PAULI_CODES.items()}
+# Largest number of (term, basis state) sign entries built at once.
+_CHUNK_ENTRIES: int = 2 ** 22
+
+PauliKey = typing.Tuple[typing.Tuple[int, str], ...]
+
+
+def pauli_key(paulistring: PauliString) -> PauliKey:
+	return tuple(sorted((qubit, pauli.upper()) for qubit, pauli in paulistring.items()))
+
+
+def pauli_coefficients(hamiltonian: QubitHamiltonian) -> typing.Dict[PauliKey, complex]:
+	"""Coefficient of every distinct pauli string, in order of first appearance."""
+	coefficients: typing.Dict[PauliKey, complex] = {}
+	for paulistring in hamiltonian.paulistrings:
+		key = pauli_key(paulistring)
+		coefficients[key] = coefficients.get(key, 0) + complex(paulistring.coeff)
+	return coefficients
+
+
+class PauliTerms:
+	"""
+	Pauli strings as (terms x qubits) X and Z bit rows, Y sets both.
+
+	Every string is i^(number of Y) X^x Z^z: it flips the qubits in x of a basis state
+	and changes its sign by the parity of the qubits in z. Qubit 0 is the most
+	significant bit of the state index, as in tequila.
+	"""
+	def __init__(self, x: np.ndarray, z: np.ndarray):
+		self.x: np.ndarray = np.asarray(x, dtype=bool)
+		self.z: np.ndarray = np.asarray(z, dtype=bool)
+		self.n_qubits: int = self.x.shape[1]
+		powers = 1 << np.arange(self.n_qubits - 1, -1, -1, dtype=np.int64)
+		# basis state index flipped by every term
+		self.flips: np.ndarray = self.x.astype(np.int64) @ powers
+		self.phases: np.ndarray = 1j ** (self.x & self.z).sum(axis=1)
+
+	@classmethod
+	def from_keys(
+		cls,
+		keys: typing.Sequence[PauliKey],
+		qubits: typing.Dict[int, int],
+		n_qubits: int
+	) -> 'PauliTerms':
+		"""Terms of pauli keys, with qubits mapping their qubits to columns."""
+		x = np.zeros((len(keys), n_qubits), dtype=bool)
+		z = np.zeros((len(keys), n_qubits), dtype=bool)
+		for row, key in enumerate(keys):
+			for qubit, pauli in key:
+				x[row, qubits[qubit]] = pauli in ("X", "Y")
+				z[row, qubits[qubit]] = pauli in ("Z", "Y")
+		return cls(x, z)
+
+	def __len__(self) -> int:
+		return len(self.flips)
+
+	def _groups(self) -> typing.Iterator[typing.Tuple[int, np.ndarray, np.ndarray]]:
+		"""(flip, terms, signs) for chunks of the terms sharing a flip, signs per basis state."""
+		indices = np.arange(2 ** self.n_qubits)
+		bits = (indices[None, :] >> np.arange(self.n_qubits - 1, -1, -1)[:, None]) & 1
+		chunk = max(1, _CHUNK_ENTRIES // len(indices))
+		for flip in np.unique(self.flips).tolist():
+			terms = np.flatnonzero(self.flips == flip)
+			for start in range(0, len(terms), chunk):
+				selected = terms[start:start + chunk]
+				yield flip, selected, 1 - 2 * ((self.z[selected].astype(np.int64) @ bits) & 1)
+
+	def diagonals(self, coefficients: np.ndarray) -> typing.Dict[int, np.ndarray]:
+		"""sum_x d_x X^x of the weighted terms, as flip -> diagonal d_x."""
+		weights = np.asarray(coefficients) * self.phases
+		diagonals: typing.Dict[int, np.ndarray] = {}
+		for flip, selected, signs in self._groups():
+			diagonal = weights[selected] @ signs
+			diagonals[flip] = diagonals[flip] + diagonal if flip in diagonals else diagonal
+		return diagonals
+
+	def expectation_values(self, states: np.ndarray) -> np.ndarray:
+		"""<state|P|state> of every term, shape (n_points, terms) for (n_points, 2**n_qubits)."""
+		states = np.asarray(states, dtype=complex)
+		indices = np.arange(states.shape[1])
+		result = np.zeros((len(states), len(self)), dtype=complex)
+		for flip, selected, signs in self._groups():
+			overlaps = states[:, indices ^ flip].conj() * states
+			result[:, selected] = overlaps @ signs.T
+		return (result * self.phases).real
@@ -1,12 +1,33 @@
+import collections
+import multiprocessing
+import os
+import time
 import typing
+from multiprocessing.connection import Connection, wait
 
 from tequila import QubitHamiltonian
-from tequila.quantumchemistry.psi4_interface import QuantumChemistryPsi4
+
+from helpinghand import instrumentation
+from helpinghand.hamiltonian_cache import HamiltonianCache, MoleculeSource, hamiltonian_and_fci
+
+HAS_PSI4 = True
+try:
+	from tequila.quantumchemistry.psi4_interface import QuantumChemistryPsi4  # noqa: F401
+except ImportError:
+	HAS_PSI4 = False
+
+
+# distance -> molecule, or the keyword arguments of tq.Molecule that create it
+MoleculeCreator = typing.Callable[
+	[float],
+	typing.Union['QuantumChemistryPsi4', typing.Dict[str, typing.Any]]
+]
 
 
 def molecus_for_working_psi4_distances(
-	molecule_creator: typing.Callable[[float], QuantumChemistryPsi4],
-	distances: typing.List[float]
+	molecule_creator: MoleculeCreator,
+	distances: typing.List[float],
+	cache: HamiltonianCache = None
 ) -> typing.Tuple[
 	typing.List[QubitHamiltonian],
 	typing.List[float],
@@ -14,31 +35,200 @@ def molecus_for_working_psi4_distances(
 ]:
 	"""
 	Returns (hamiltonians, readl_distances, fci_energies)
+
+	molecule_creator returns a molecule or the keyword arguments of tq.Molecule for it, see
+	pyscf_create_hamiltonians. Arguments without a backend use psi4.
 	"""
 	hamiltonians: typing.List[QubitHamiltonian] = []
 	real_distances: typing.List[float] = []
 	fci_energies: typing.List[float] = []
 	for distance in distances:
 		try:
-			molecule: QuantumChemistryPsi4 = molecule_creator(distance)
-			fci_energies.append(molecule.compute_energy("fci"))
+			molecule: MoleculeSource = molecule_creator(distance)
+			hamiltonian, fci_energy = hamiltonian_and_fci(molecule, cache, "psi4")
+			fci_energies.append(fci_energy)
 			real_distances.append(distance)
-			hamiltonians.append(molecule.make_hamiltonian())
+			hamiltonians.append(hamiltonian)
 		except SystemError:
 			print(f'Failed at distance {distance}')
+			instrumentation.emit("psi4_failed", distance=distance)
 			approximated: bool = False
 			i = 1
 			while not approximated and i < 11:
 				new_R = distance - 0.001 * i
 				try:
-					molecule: QuantumChemistryPsi4 = molecule_creator(new_R)
-					fci_energies.append(molecule.compute_energy("fci"))
+					molecule: MoleculeSource = molecule_creator(new_R)
+					hamiltonian, fci_energy = hamiltonian_and_fci(molecule, cache, "psi4")
+					fci_energies.append(fci_energy)
 					real_distances.append(distance)
-					hamiltonians.append(molecule.make_hamiltonian())
+					hamiltonians.append(hamiltonian)
 					approximated = True
 				except SystemError:
 					print(f'Failed at distance {new_R}')
+					instrumentation.emit("psi4_failed", distance=new_R)
 					i += 1
 			if not approximated:
 				print(f'Gave up on distance {distance} :(')
+				instrumentation.emit("psi4_gave_up", distance=distance)
 	return (hamiltonians, real_distances, fci_energies)
+
+
+POINT_OK: str = "ok"
+POINT_APPROXIMATED: str = "approximated"
+POINT_FAILED: str = "failed"
+
+
+class ScanPoint(typing.NamedTuple):
+	"""Outcome of one distance of scan_psi4_distances."""
+	distance: float
+	status: str  # POINT_OK, POINT_APPROXIMATED or POINT_FAILED
+	computed_distance: typing.Optional[float]
+	hamiltonian: typing.Optional[QubitHamiltonian]
+	fci_energy: typing.Optional[float]
+	errors: typing.List[str]
+
+
+class _Attempt(typing.NamedTuple):
+	point: int
+	retry: int
+	distance: float
+
+
+class _RunningAttempt(typing.NamedTuple):
+	attempt: _Attempt
+	process: multiprocessing.Process
+	connection: Connection
+	started: float
+
+
+def _run_attempt(
+	connection: Connection,
+	molecule_creator: MoleculeCreator,
+	distance: float,
+	cache: HamiltonianCache
+) -> None:
+	try:
+		molecule: MoleculeSource = molecule_creator(distance)
+		hamiltonian, fci_energy = hamiltonian_and_fci(molecule, cache, "psi4")
+		connection.send((hamiltonian, fci_energy, None, False))
+	except SystemError as error:
+		# psi4 failed at this geometry, a slightly shifted one may work
+		connection.send((None, None, f'{type(error).__name__}: {error}', True))
+	except BaseException as error:
+		connection.send((None, None, f'{type(error).__name__}: {error}', False))
+	finally:
+		connection.close()
+
+
+def scan_psi4_distances(
+	molecule_creator: MoleculeCreator,
+	distances: typing.List[float],
+	processes: int = None,
+	timeout: float = None,
+	retries: int = 10,
+	step: float = 0.001,
+	cache: HamiltonianCache = None
+) -> typing.List[ScanPoint]:
+	"""
+	Computes every distance in a separate process, at most `processes` at a time.
+
+	An attempt fails on an exception, on a crash of its process or after `timeout`
+	seconds. When a distance fails with a SystemError (as psi4 raises them), a crash or a
+	timeout, the geometries distance - step * i for i up to `retries` are tried
+	concurrently and the smallest working shift is used. Other exceptions, e.g. of the
+	molecule_creator itself, fail the distance without retries.
+	molecule_creator may return the keyword arguments of tq.Molecule instead of a
+	molecule, then cached distances do not create the molecule.
+	"""
+	processes = processes if processes else os.cpu_count()
+	errors: typing.List[typing.List[str]] = [[] for _ in distances]
+	outcomes: typing.List[typing.Dict[int, tuple]] = [{} for _ in distances]
+	points: typing.List[typing.Optional[ScanPoint]] = [None for _ in distances]
+	pending: typing.Deque[_Attempt] = collections.deque(
+		_Attempt(point, 0, distance) for point, distance in enumerate(distances)
+	)
+	running: typing.List[_RunningAttempt] = []
+
+	def resolve(point: int) -> None:
+		distance = distances[point]
+		retry_outcomes = outcomes[point]
+		for retry in range(retries + 1):
+			if retry not in retry_outcomes:
+				return
+			hamiltonian, fci_energy, computed_distance = retry_outcomes[retry]
+			if hamiltonian is not None:
+				status = POINT_OK if retry == 0 else POINT_APPROXIMATED
+				points[point] = ScanPoint(
+					distance, status, computed_distance, hamiltonian, fci_energy, errors[point]
+				)
+				return
+		points[point] = ScanPoint(distance, POINT_FAILED, None, None, None, errors[point])
+
+	def finish(running_attempt: _RunningAttempt, result: tuple) -> None:
+		attempt = running_attempt.attempt
+		hamiltonian, fci_energy, error, retryable = result
+		if error is not None:
+			errors[attempt.point].append(f'{attempt.distance}: {error}')
+		outcomes[attempt.point][attempt.retry] = (hamiltonian, fci_energy, attempt.distance)
+		if attempt.retry == 0 and hamiltonian is None:
+			if not retryable:
+				points[attempt.point] = ScanPoint(
+					distances[attempt.point], POINT_FAILED, None, None, None, errors[attempt.point]
+				)
+				return
+			pending.extendleft(
+				_Attempt(attempt.point, retry, distances[attempt.point] - step * retry)
+				for retry in range(retries, 0, -1)
+			)
+		resolve(attempt.point)
+
+	while pending or running:
+		while pending and len(running) < processes:
+			attempt = pending.popleft()
+			if points[attempt.point] is not None:
+				continue
+			receiver, sender = multiprocessing.Pipe(duplex=False)
+			process = multiprocessing.Process(
+				target=_run_attempt,
+				args=(sender, molecule_creator, attempt.distance, cache),
+				daemon=True
+			)
+			process.start()
+			sender.close()
+			running.append(_RunningAttempt(attempt, process, receiver, time.monotonic()))
+		if not running:
+			continue
+
+		wait_time = None
+		if timeout is not None:
+			oldest = min(running_attempt.started for running_attempt in running)
+			wait_time = max(0.0, oldest + timeout - time.monotonic())
+		ready = wait([running_attempt.connection for running_attempt in running], wait_time)
+
+		for running_attempt in list(running):
+			if running_attempt.connection in ready:
+				try:
+					result = running_attempt.connection.recv()
+				except EOFError:
+					running_attempt.process.join()
+					result = (
+						None, None, f'process died with exit code {running_attempt.process.exitcode}', True
+					)
+			elif timeout is not None and time.monotonic() - running_attempt.started >= timeout:
+				running_attempt.process.terminate()
+				result = (None, None, f'timed out after {timeout} seconds', True)
+			else:
+				continue
+			running.remove(running_attempt)
+			running_attempt.connection.close()
+			running_attempt.process.join()
+			finish(running_attempt, result)
+
+		for running_attempt in list(running):
+			if points[running_attempt.attempt.point] is not None:
+				running_attempt.process.terminate()
+				running_attempt.process.join()
+				running_attempt.connection.close()
+				running.remove(running_attempt)
+
+	return points
@@ -3,20 +3,37 @@ import typing
 from tequila import QubitHamiltonian
 from tequila.quantumchemistry.pyscf_interface import QuantumChemistryPySCF
 
+from helpinghand.hamiltonian_cache import HamiltonianCache, MoleculeSource, hamiltonian_and_fci
+
+
+# distance -> molecule, or the keyword arguments of tq.Molecule that create it
+MoleculeCreator = typing.Callable[
+	[float],
+	typing.Union[QuantumChemistryPySCF, typing.Dict[str, typing.Any]]
+]
+
 
 def pyscf_create_hamiltonians(
-	molecule_creator: typing.Callable[[float], QuantumChemistryPySCF],
-	distances: typing.List[float]
+	molecule_creator: MoleculeCreator,
+	distances: typing.List[float],
+	cache: HamiltonianCache = None
 ) -> typing.Tuple[
 	typing.List[QubitHamiltonian],
 	typing.List[float],
 	typing.List[float]
 ]:
-	"""Returns (hamiltonians, distances, fci_energies)"""
+	"""
+	Returns (hamiltonians, distances, fci_energies)
+
+	molecule_creator returns a molecule or the keyword arguments of tq.Molecule for it. With
+	the arguments a molecule is only created for distances that are not in the cache, with
+	the pyscf backend unless they name another one.
+	"""
 	hamiltonians: typing.List[QubitHamiltonian] = []
 	fci_energies: typing.List[float] = []
 	for distance in distances:
-		molecule: QuantumChemistryPySCF = molecule_creator(distance)
-		hamiltonians.append(molecule.make_hamiltonian())
-		fci_energies.append(molecule.compute_energy('fci'))
+		molecule: MoleculeSource = molecule_creator(distance)
+		hamiltonian, fci_energy = hamiltonian_and_fci(molecule, cache, "pyscf")
+		hamiltonians.append(hamiltonian)
+		fci_energies.append(fci_energy)
 	return (hamiltonians, distances, fci_energies)
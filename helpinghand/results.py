@@ -0,0 +1,146 @@
+import os
+import typing
+
+import numpy as np
+from tequila.optimizers.optimizer_base import OptimizerResults
+
+_ARRAYS: typing.List[str] = [
+	"variables",
+	"energies",
+	"angles",
+	"gradients",
+	"energy_offsets",
+	"gradient_offsets",
+	"final_energies",
+	"final_angles",
+]
+
+
+def _dicts_to_array(
+	values: typing.List[typing.Mapping[typing.Any, float]],
+	variables: typing.List[str]
+) -> np.ndarray:
+	array = np.full((len(values), len(variables)), np.nan)
+	column = {variable: i for i, variable in enumerate(variables)}
+	for row, value in enumerate(values):
+		for variable, number in value.items():
+			array[row, column[str(variable)]] = float(number)
+	return array
+
+
+class CompactResults:
+	"""
+	Optimizer histories of one or more runs as dense arrays.
+
+	The iterations of all runs are stacked along the first axis. Run i owns the rows
+	energy_offsets[i]:energy_offsets[i + 1] of energies and angles and the rows
+	gradient_offsets[i]:gradient_offsets[i + 1] of gradients. The columns of angles
+	and gradients follow `variables`.
+	"""
+	def __init__(
+		self,
+		variables: np.ndarray,
+		energies: np.ndarray,
+		angles: np.ndarray,
+		gradients: np.ndarray,
+		energy_offsets: np.ndarray,
+		gradient_offsets: np.ndarray,
+		final_energies: np.ndarray,
+		final_angles: np.ndarray
+	):
+		self.variables: np.ndarray = variables
+		self.energies: np.ndarray = energies
+		self.angles: np.ndarray = angles
+		self.gradients: np.ndarray = gradients
+		self.energy_offsets: np.ndarray = energy_offsets
+		self.gradient_offsets: np.ndarray = gradient_offsets
+		self.final_energies: np.ndarray = final_energies
+		self.final_angles: np.ndarray = final_angles
+
+	@classmethod
+	def from_results(
+		cls,
+		results: typing.Union[OptimizerResults, typing.Iterable[OptimizerResults]],
+		variables: typing.List[str] = None
+	) -> 'CompactResults':
+		"""
+		Converts results one at a time, so a generator of results is never held in
+		memory. Without `variables` the sorted variables of the first run are used.
+		"""
+		if isinstance(results, OptimizerResults):
+			results = [results]
+		energies, angles, gradients = [], [], []
+		energy_offsets, gradient_offsets = [0], [0]
+		final_energies, final_angles = [], []
+		for result in results:
+			if variables is None:
+				variables = sorted(str(variable) for variable in result.angles.keys())
+			history = result.history
+			energies.append(np.asarray(history.energies, dtype=float))
+			angles.append(_dicts_to_array(history.angles, variables))
+			gradients.append(_dicts_to_array(history.gradients, variables))
+			energy_offsets.append(energy_offsets[-1] + len(history.energies))
+			gradient_offsets.append(gradient_offsets[-1] + len(history.gradients))
+			final_energies.append(float(result.energy))
+			final_angles.append(_dicts_to_array([result.angles], variables))
+		variables = [] if variables is None else variables
+		width = len(variables)
+		return cls(
+			variables=np.array(variables, dtype=str),
+			energies=np.concatenate(energies) if energies else np.zeros(0),
+			angles=np.concatenate(angles) if angles else np.zeros((0, width)),
+			gradients=np.concatenate(gradients) if gradients else np.zeros((0, width)),
+			energy_offsets=np.array(energy_offsets, dtype=np.int64),
+			gradient_offsets=np.array(gradient_offsets, dtype=np.int64),
+			final_energies=np.array(final_energies, dtype=float),
+			final_angles=np.concatenate(final_angles) if final_angles else np.zeros((0, width))
+		)
+
+	def __len__(self) -> int:
+		return len(self.final_energies)
+
+	def __getitem__(self, run: int) -> 'CompactResults':
+		"""The history of a single run, as views into the arrays of this one."""
+		if run < 0:
+			run += len(self)
+		if not 0 <= run < len(self):
+			raise IndexError(f'Run {run} out of range for {len(self)} runs.')
+		energy_start, energy_stop = self.energy_offsets[run:run + 2]
+		gradient_start, gradient_stop = self.gradient_offsets[run:run + 2]
+		return CompactResults(
+			variables=self.variables,
+			energies=self.energies[energy_start:energy_stop],
+			angles=self.angles[energy_start:energy_stop],
+			gradients=self.gradients[gradient_start:gradient_stop],
+			energy_offsets=np.array([0, energy_stop - energy_start], dtype=np.int64),
+			gradient_offsets=np.array([0, gradient_stop - gradient_start], dtype=np.int64),
+			final_energies=self.final_energies[run:run + 1],
+			final_angles=self.final_angles[run:run + 1]
+		)
+
+	def max_gradients(self) -> np.ndarray:
+		"""Largest absolute gradient component of every stored gradient iteration."""
+		if self.gradients.shape[1] == 0:
+			return np.zeros(len(self.gradients))
+		return np.nanmax(np.abs(self.gradients), axis=1)
+
+	def save(self, path: str) -> None:
+		"""Saves to a .npz file, or to a directory of .npy files that load memory mapped."""
+		arrays = {name: getattr(self, name) for name in _ARRAYS}
+		if path.endswith('.npz'):
+			np.savez(path, **arrays)
+			return
+		os.makedirs(path, exist_ok=True)
+		for name, array in arrays.items():
+			np.save(os.path.join(path, f'{name}.npy'), array)
+
+	@classmethod
+	def load(cls, path: str, mmap_mode: str = None) -> 'CompactResults':
+		"""mmap_mode (e.g. 'r') only applies to directories written by save."""
+		if path.endswith('.npz'):
+			with np.load(path) as arrays:
+				return cls(**{name: arrays[name] for name in _ARRAYS})
+		return cls(**{
+			name: np.load(os.path.join(path, f'{name}.npy'), mmap_mode=mmap_mode)
+			for name in _ARRAYS
+		})
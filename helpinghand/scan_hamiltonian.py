@@ -0,0 +1,119 @@
+import typing
+from functools import cached_property
+
+import numpy as np
+from tequila import QubitHamiltonian
+from tequila.hamiltonian.qubit_hamiltonian import PauliString
+from tequila.wavefunction.qubit_wavefunction import QubitWaveFunction
+
+from helpinghand.paulis import PauliTerms, pauli_coefficients
+
+
+class ScanHamiltonian:
+	"""
+	The hamiltonians of a scan over one shared basis of pauli strings.
+
+	Every pauli string of any point is stored once, as packed X and Z bit rows (Y sets
+	both), together with a dense (points x terms) coefficient matrix that holds 0 where
+	a point lacks a term. Indexing and iterating give QubitHamiltonians, so a scan can
+	be used wherever a list of hamiltonians is expected.
+	"""
+	def __init__(
+		self,
+		x_bits: np.ndarray,
+		z_bits: np.ndarray,
+		coefficients: np.ndarray,
+		n_qubits: int,
+		distances: typing.Sequence[float] = None
+	):
+		self.x_bits: np.ndarray = x_bits
+		self.z_bits: np.ndarray = z_bits
+		self.coefficients: np.ndarray = coefficients
+		self.n_qubits: int = n_qubits
+		self.distances: typing.Optional[np.ndarray] = (
+			None if distances is None else np.asarray(distances, dtype=float)
+		)
+
+	@classmethod
+	def from_hamiltonians(
+		cls,
+		hamiltonians: typing.Sequence[QubitHamiltonian],
+		distances: typing.Sequence[float] = None
+	) -> 'ScanHamiltonian':
+		columns: typing.Dict[typing.Tuple, int] = {}
+		rows: typing.List[typing.Dict[int, complex]] = []
+		for hamiltonian in hamiltonians:
+			rows.append({
+				columns.setdefault(key, len(columns)): coefficient
+				for key, coefficient in pauli_coefficients(hamiltonian).items()
+			})
+
+		n_qubits = max((qubit + 1 for key in columns for qubit, _ in key), default=0)
+		x = np.zeros((len(columns), n_qubits), dtype=bool)
+		z = np.zeros((len(columns), n_qubits), dtype=bool)
+		for key, column in columns.items():
+			for qubit, pauli in key:
+				x[column, qubit] = pauli in ("X", "Y")
+				z[column, qubit] = pauli in ("Z", "Y")
+		coefficients = np.zeros((len(rows), len(columns)), dtype=np.complex128)
+		for point, row in enumerate(rows):
+			coefficients[point, list(row)] = list(row.values())
+		if not coefficients.imag.any():
+			coefficients = coefficients.real
+		return cls(np.packbits(x, axis=1), np.packbits(z, axis=1), coefficients, n_qubits, distances)
+
+	@property
+	def n_terms(self) -> int:
+		return self.coefficients.shape[1]
+
+	@property
+	def nbytes(self) -> int:
+		return self.x_bits.nbytes + self.z_bits.nbytes + self.coefficients.nbytes
+
+	def paulis(self) -> typing.Tuple[np.ndarray, np.ndarray]:
+		"""Unpacked (terms x qubits) X and Z bits."""
+		return (
+			np.unpackbits(self.x_bits, axis=1, count=self.n_qubits).astype(bool),
+			np.unpackbits(self.z_bits, axis=1, count=self.n_qubits).astype(bool),
+		)
+
+	@cached_property
+	def terms(self) -> PauliTerms:
+		return PauliTerms(*self.paulis())
+
+	def __len__(self) -> int:
+		return len(self.coefficients)
+
+	def __getitem__(self, point: int) -> QubitHamiltonian:
+		x, z = self.paulis()
+		names = np.array([["", "X"], ["Z", "Y"]])[z.astype(int), x.astype(int)]
+		coefficients = self.coefficients[point]
+		paulistrings = [
+			PauliString(
+				data={qubit: names[term, qubit] for qubit in np.flatnonzero(x[term] | z[term]).tolist()},
+				coeff=coefficients[term]
+			)
+			for term in np.flatnonzero(coefficients).tolist()
+		]
+		return QubitHamiltonian.from_paulistrings(paulistrings)
+
+	def __iter__(self) -> typing.Iterator[QubitHamiltonian]:
+		return (self[point] for point in range(len(self)))
+
+	def term_expectation_values(
+		self,
+		state: typing.Union[np.ndarray, QubitWaveFunction]
+	) -> np.ndarray:
+		"""<state|P|state> of every pauli string P of the basis."""
+		if isinstance(state, QubitWaveFunction):
+			if state.n_qubits != self.n_qubits:
+				raise ValueError(f"Expected a state on {self.n_qubits} qubits, got {state.n_qubits}.")
+			state = state.to_array()
+		state = np.asarray(state, dtype=complex)
+		if state.shape != (2 ** self.n_qubits,):
+			raise ValueError(f"Expected a state vector of length {2 ** self.n_qubits}.")
+		return self.terms.expectation_values(state[None])[0]
+
+	def energies(self, state: typing.Union[np.ndarray, QubitWaveFunction]) -> np.ndarray:
+		"""<state|H|state> at every point of the scan, in one matrix vector product."""
+		return (self.coefficients @ self.term_expectation_values(state)).real
@@ -0,0 +1,284 @@
+import functools
+import typing
+
+import numpy as np
+from tequila import QCircuit, QubitHamiltonian, TequilaException
+from tequila.simulators import simulator_api
+from tequila.simulators.simulator_base import BackendCircuit, BackendExpectationValue
+from tequila.utils.bitstrings import BitNumbering
+from tequila.wavefunction.qubit_wavefunction import QubitWaveFunction
+
+from helpinghand import instrumentation
+from helpinghand.cache import LRUCache
+from helpinghand.hashing import hamiltonian_hash
+from helpinghand.paulis import PauliTerms, pauli_coefficients
+
+# Name under which the simulator is registered with tequila.
+BACKEND: str = "numpy"
+
+_RX, _RY, _RZ, _FIXED = range(4)
+_ROTATIONS = {"Rx": _RX, "Ry": _RY, "Rz": _RZ}
+_FIXED_GATES = {
+	"I": np.eye(2, dtype=complex),
+	"X": np.array([[0, 1], [1, 0]], dtype=complex),
+	"Y": np.array([[0, -1j], [1j, 0]], dtype=complex),
+	"Z": np.array([[1, 0], [0, -1]], dtype=complex),
+	"H": np.array([[1, 1], [1, -1]], dtype=complex) / np.sqrt(2),
+}
+
+
+class _RotationBlock:
+	"""Consecutive single qubit gates, applied as one 2x2 matrix per qubit."""
+	def __init__(self):
+		self.kinds: typing.List[int] = []
+		self.parameters: typing.List[typing.Any] = []
+		self.fixed: typing.List[np.ndarray] = []
+		# qubit -> indices of its gates in order
+		self.gates: typing.Dict[int, typing.List[int]] = {}
+
+	def add(self, qubit: int, kind: int, parameter: typing.Any, fixed: np.ndarray) -> None:
+		self.gates.setdefault(qubit, []).append(len(self.kinds))
+		self.kinds.append(kind)
+		self.parameters.append(parameter)
+		self.fixed.append(fixed)
+
+	def freeze(self) -> None:
+		self.kinds = np.array(self.kinds)
+		self.fixed = np.array(self.fixed)
+
+	def matrices(self, angles: np.ndarray) -> typing.Dict[int, np.ndarray]:
+		"""Matrix of every qubit, (n_points, 2, 2) for angles of shape (n_points, n_gates)."""
+		matrices = np.repeat(self.fixed[None], len(angles), axis=0)
+		for kind, matrix in (_RX, _rx), (_RY, _ry), (_RZ, _rz):
+			selected = self.kinds == kind
+			if selected.any():
+				matrices[:, selected] = matrix(angles[:, selected])
+		return {
+			qubit: functools.reduce(
+				lambda total, gate: matrices[:, gate] @ total, gates[1:], matrices[:, gates[0]]
+			)
+			for qubit, gates in self.gates.items()
+		}
+
+
+def _matrix(rows: typing.List[typing.List[np.ndarray]]) -> np.ndarray:
+	return np.moveaxis(np.array(rows, dtype=complex), (0, 1), (-2, -1))
+
+
+def _rx(angles: np.ndarray) -> np.ndarray:
+	cos, sin = np.cos(angles / 2), np.sin(angles / 2)
+	return _matrix([[cos, -1j * sin], [-1j * sin, cos]])
+
+
+def _ry(angles: np.ndarray) -> np.ndarray:
+	cos, sin = np.cos(angles / 2), np.sin(angles / 2)
+	return _matrix([[cos, -sin], [sin, cos]])
+
+
+def _rz(angles: np.ndarray) -> np.ndarray:
+	zero = np.zeros_like(angles)
+	return _matrix([[np.exp(-0.5j * angles), zero], [zero, np.exp(0.5j * angles)]])
+
+
+class BackendCircuitStatevector(BackendCircuit):
+	"""
+	NumPy statevector simulation of circuits made of single qubit gates, CZ and CNOT.
+
+	Consecutive single qubit gates are merged into one matrix per qubit, consecutive
+	controlled Z gates into one diagonal phase mask and consecutive CNOTs into one index
+	permutation, so hardware efficient ansaetze need a few vectorized steps per layer.
+	Qubit 0 is the most significant bit of the state index, as in tequila.
+	"""
+
+	compiler_arguments = {
+		"trotterized": True,
+		"swap": True,
+		"multitarget": True,
+		"controlled_rotation": True,
+		"generalized_rotation": True,
+		"exponential_pauli": True,
+		"controlled_exponential_pauli": True,
+		"phase": True,
+		"power": True,
+		"hadamard_power": True,
+		"controlled_power": True,
+		"controlled_phase": True,
+		"toffoli": True,
+		"phase_to_z": True,
+		"cc_max": True
+	}
+
+	numbering = BitNumbering.MSB
+
+	def initialize_circuit(self, *args, **kwargs) -> typing.List:
+		n_qubits = self.n_qubits
+		self.indices = np.arange(2 ** n_qubits)
+		# bits[q] is the value of qubit q in every basis state
+		self.bits = (self.indices[None, :] >> (n_qubits - 1 - np.arange(n_qubits))[:, None]) & 1
+		return []
+
+	def create_circuit(self, abstract_circuit: QCircuit, circuit=None, *args, **kwargs) -> typing.List:
+		with instrumentation.stage("compile", backend=BACKEND, gates=len(abstract_circuit.gates)):
+			blocks = super().create_circuit(abstract_circuit, circuit, *args, **kwargs)
+		# parameter of every single qubit gate in order, None for fixed gates
+		self.parameters: typing.List[typing.Any] = []
+		for kind, block in blocks:
+			if kind == "rotation":
+				block.freeze()
+				self.parameters.extend(block.parameters)
+		return blocks
+
+	def _qubit(self, abstract_qubit: int) -> int:
+		return self.qubit_map[abstract_qubit].number
+
+	def _block(self, circuit: typing.List, kind: str, new: typing.Callable) -> typing.Any:
+		if not circuit or circuit[-1][0] != kind:
+			circuit.append((kind, new()))
+		return circuit[-1][1]
+
+	def add_parametrized_gate(self, gate, circuit, *args, **kwargs) -> None:
+		if gate.name not in _ROTATIONS or gate.control:
+			raise TequilaException(f'Gate {gate.name} is not supported by the {BACKEND} backend.')
+		block = self._block(circuit, "rotation", _RotationBlock)
+		block.add(self._qubit(gate.target[0]), _ROTATIONS[gate.name], gate.parameter, _FIXED_GATES["I"])
+
+	def add_basic_gate(self, gate, circuit, *args, **kwargs) -> None:
+		if gate.name not in _FIXED_GATES or len(gate.target) != 1:
+			raise TequilaException(f'Gate {gate.name} is not supported by the {BACKEND} backend.')
+		target = self._qubit(gate.target[0])
+		controls = [self._qubit(qubit) for qubit in gate.control]
+		if not controls:
+			block = self._block(circuit, "rotation", _RotationBlock)
+			block.add(target, _FIXED, None, _FIXED_GATES[gate.name])
+			return
+		active = np.all(self.bits[controls], axis=0)
+		if gate.name == "Z":
+			mask = self._block(circuit, "diagonal", lambda: np.ones(len(self.indices)))
+			mask *= 1 - 2 * (active & self.bits[target])
+		elif gate.name == "X":
+			permutation = self._block(circuit, "permutation", lambda: self.indices.copy())
+			flip = active * (1 << (self.n_qubits - 1 - target))
+			# applying the new permutation after the old one
+			permutation[:] = permutation[self.indices ^ flip]
+		else:
+			raise TequilaException(
+				f'Controlled gate {gate.name} is not supported by the {BACKEND} backend.'
+			)
+
+	def update_variables(self, variables) -> None:
+		# angles are evaluated on every simulation
+		pass
+
+	def angles(self, variables) -> np.ndarray:
+		"""Angle of every single qubit gate for the given variables, 0 for fixed gates."""
+		return np.array([
+			0.0 if parameter is None else float(parameter(variables))
+			for parameter in self.parameters
+		])
+
+	def statevectors(self, angles: np.ndarray, initial_state: int = 0) -> np.ndarray:
+		"""States of shape (n_points, 2**n_qubits) for angles of shape (n_points, n_gates)."""
+		state = np.zeros((len(angles), 2 ** self.n_qubits), dtype=complex)
+		state[:, initial_state] = 1
+		offset = 0
+		for kind, block in self.circuit:
+			if kind == "rotation":
+				block_angles = angles[:, offset:offset + len(block.kinds)]
+				offset += len(block.kinds)
+				for qubit, matrix in block.matrices(block_angles).items():
+					view = state.reshape(len(angles), 2 ** qubit, 2, -1)
+					state = np.matmul(matrix[:, None], view).reshape(len(angles), -1)
+			elif kind == "diagonal":
+				state = state * block
+			else:
+				state = state[:, block]
+		return state
+
+	def statevector(self, variables, initial_state: int = 0) -> np.ndarray:
+		return self.statevectors(self.angles(variables)[None], initial_state)[0]
+
+	def do_simulate(self, variables, initial_state, *args, **kwargs) -> QubitWaveFunction:
+		return QubitWaveFunction.from_array(
+			arr=self.statevector(variables, initial_state), numbering=self.numbering
+		)
+
+
+class PauliSum:
+	"""
+	A hamiltonian as diagonals grouped by the qubits its terms flip.
+
+	All pauli strings flipping the same qubits x add up to one diagonal d_x, see
+	PauliTerms, and <psi|H|psi> = sum_x <psi[i ^ x]| d_x |psi>.
+	"""
+	def __init__(self, hamiltonian: QubitHamiltonian, qubits: typing.Dict[int, int], n_qubits: int):
+		coefficients = pauli_coefficients(hamiltonian)
+		terms = PauliTerms.from_keys(list(coefficients), qubits, n_qubits)
+		diagonals = terms.diagonals(np.array(list(coefficients.values()), dtype=complex))
+		self.shape: typing.Tuple[int, ...] = (2,) * n_qubits
+		# flipping qubits reverses their axes of the state as a (2, 2, ...) tensor
+		self.flips: typing.List[typing.Tuple[int, ...]] = [
+			tuple(qubit for qubit in range(n_qubits) if flip >> (n_qubits - 1 - qubit) & 1)
+			for flip in diagonals
+		]
+		self.diagonals: typing.List[np.ndarray] = [
+			diagonal.real if not diagonal.imag.any() else diagonal for diagonal in diagonals.values()
+		]
+
+	def expectation_value(self, state: np.ndarray) -> float:
+		return float(self.expectation_values(state[None])[0])
+
+	def expectation_values(self, states: np.ndarray) -> np.ndarray:
+		"""Expectation values of states of shape (n_points, 2**n_qubits)."""
+		result = np.zeros(len(states))
+		tensors = states.reshape((len(states),) + self.shape)
+		for flip, diagonal in zip(self.flips, self.diagonals):
+			if flip:
+				flipped = np.flip(tensors, [axis + 1 for axis in flip]).reshape(len(states), -1)
+			else:
+				flipped = states
+			result += np.einsum("ij,ij->i", flipped.conj(), diagonal * states).real
+		return result
+
+
+_PAULI_SUMS = LRUCache(maxsize=32)
+
+
+def pauli_sum(
+	hamiltonian: QubitHamiltonian,
+	qubits: typing.Dict[int, int],
+	n_qubits: int
+) -> PauliSum:
+	"""Cached PauliSum, shared by the expectation values of e.g. the gradient objectives."""
+	key = (hamiltonian_hash(hamiltonian), tuple(sorted(qubits.items())), n_qubits)
+	result = _PAULI_SUMS.get(key)
+	if result is None:
+		result = PauliSum(hamiltonian, qubits, n_qubits)
+		_PAULI_SUMS.put(key, result)
+	return result
+
+
+class BackendExpectationValueStatevector(BackendExpectationValue):
+	BackendCircuitType = BackendCircuitStatevector
+
+	def initialize_hamiltonian(self, hamiltonians: tuple) -> tuple:
+		qubits = {qubit: backend.number for qubit, backend in self.U.qubit_map.items()}
+		return tuple(pauli_sum(H, qubits, self.n_qubits) for H in hamiltonians)
+
+	def simulate(self, variables, *args, **kwargs) -> np.ndarray:
+		state = self.U.statevector(variables)
+		return np.asarray([H.expectation_value(state) for H in self.H])
+
+	def sample(self, variables, samples, *args, **kwargs) -> np.ndarray:
+		raise TequilaException(f'The {BACKEND} backend does not support sampling.')
+
+
+def _register() -> None:
+	if BACKEND not in simulator_api.SUPPORTED_BACKENDS:
+		simulator_api.SUPPORTED_BACKENDS.append(BACKEND)
+	simulator_api.INSTALLED_SIMULATORS[BACKEND] = simulator_api.BackendTypes(
+		CircType=BackendCircuitStatevector,
+		ExpValueType=BackendExpectationValueStatevector
+	)
+
+
+_register()
@@ -3,6 +3,11 @@ from tequila.circuit import gates
 import helpinghand.convenience_gates as congates
 from tequila.objective.objective import FixedVariable, Objective, Variable
 import numpy as np
+import typing
+
+from helpinghand.cache import LRUCache
+from helpinghand.hashing import circuit_hash
+from helpinghand.variables import VariableOrder
 
 HAS_PYTKET = True
 try:
@@ -48,6 +53,38 @@ TKET_TO_TQ = {
 }
 
 
+# Name of the tequila gate each tket operation becomes in from_tket.
+TKET_TO_TQ_NAMES = {
+	OpType.X: "X",
+	OpType.CX: "X",
+	OpType.CCX: "X",
+	OpType.Y: "Y",
+	OpType.CY: "Y",
+	OpType.Z: "Z",
+	OpType.CZ: "Z",
+	OpType.H: "H",
+	OpType.CH: "H",
+	OpType.Rx: "Rx",
+	OpType.CRx: "Rx",
+	OpType.Ry: "Ry",
+	OpType.CRy: "Ry",
+	OpType.Rz: "Rz",
+	OpType.CRz: "Rz",
+	OpType.SWAP: "SWAP",
+	OpType.CSWAP: "SWAP",
+	OpType.V: "Rx",
+	OpType.Vdg: "Rx",
+	OpType.CV: "Rx",
+	OpType.CVdg: "Rx",
+}
+
+# Number of target qubits of tket operations with more than one.
+TKET_TARGET_COUNTS = {
+	OpType.SWAP: 2,
+	OpType.CSWAP: 2,
+}
+
+
 class ConvertToTKETError(Exception):
 	pass
 
@@ -56,6 +93,20 @@ class ConvertFromTKETError(Exception):
 	pass
 
 
+def _gate_function(gate):
+	gate_function = TQ_TO_TKET.get(gate.name, None)
+	if not len(gate.target) == 1:
+		raise ConvertToTKETError("Only converting single target gates is supported.")
+	if not gate_function:
+		raise ConvertToTKETError(f'Converting gate {gate.name} is not supported.')
+	n_control = len(gate.control)
+	if n_control > len(gate_function) - 1:
+		raise ConvertToTKETError(
+			f'Converting gate {gate.name} with {n_control} controls is not supported.'
+		)
+	return gate_function[n_control]
+
+
 def to_tket(circuit: tq.QCircuit) -> Circuit:
 	if not HAS_PYTKET:
 		raise ModuleNotFoundError("Needed module pytket not found.")
@@ -63,16 +114,7 @@ def to_tket(circuit: tq.QCircuit) -> Circuit:
 	variable_map = {}
 
 	for gate in circuit.gates:
-		gate_function = TQ_TO_TKET.get(gate.name, None)
-		if not len(gate.target) == 1:
-			raise ConvertToTKETError("Only converting single target gates is supported.")
-		if not gate_function:
-			raise ConvertToTKETError(f'Converting gate {gate.name} is not supported.')
-		n_control = len(gate.control)
-		if n_control > len(gate_function) - 1:
-			raise ConvertToTKETError(
-				f'Converting gate {gate.name} with {n_control} controls is not supported.'
-			)
+		gate_function = _gate_function(gate)
 		if gate.is_parametrized():
 			variable = gate.parameter
 			if isinstance(variable, FixedVariable):
@@ -92,16 +134,104 @@ def to_tket(circuit: tq.QCircuit) -> Circuit:
 					variable_map[str(variable.name)] = parameter
 			else:
 				raise ConvertToTKETError("I have no idea anymore about what is going on...")
-			gate_function[n_control](circ)(parameter, *gate.control, *gate.target)
+			gate_function(circ)(parameter, *gate.control, *gate.target)
 		else:
-			gate_function[n_control](circ)(*gate.control, *gate.target)
+			gate_function(circ)(*gate.control, *gate.target)
 	return circ
 
 
+class TketTemplate(VariableOrder):
+	"""
+	A tequila circuit converted to tket once, with symbols in place of its parameters.
+
+	Gates sharing a variable share a symbol, gates parametrized by an objective get one
+	symbol each. bind and bind_many only substitute angles into a copy of the template.
+	"""
+
+	def __init__(self, circuit: tq.QCircuit):
+		if not HAS_PYTKET:
+			raise ModuleNotFoundError("Needed module pytket not found.")
+		self.circuit = Circuit(circuit.n_qubits)
+		self.variables: typing.List[Variable] = []
+		self.index: typing.Dict[typing.Hashable, int] = {}
+		self._symbols = []
+		self._objective_symbols = []
+		self._objectives = []
+
+		for gate in circuit.gates:
+			gate_function = _gate_function(gate)
+			if not gate.is_parametrized():
+				gate_function(self.circuit)(*gate.control, *gate.target)
+				continue
+			variable = gate.parameter
+			if isinstance(variable, FixedVariable):
+				parameter = float(variable) / np.pi
+			elif isinstance(variable, Variable):
+				parameter = self._symbol(variable)
+			elif isinstance(variable, Objective):
+				for inner in variable.extract_variables():
+					self._symbol(inner)
+				parameter = fresh_symbol("objective")
+				self._objective_symbols.append(parameter)
+				self._objectives.append(variable)
+			else:
+				raise ConvertToTKETError(f'Unknown parameter type {type(variable).__name__}.')
+			gate_function(self.circuit)(parameter, *gate.control, *gate.target)
+
+	def _symbol(self, variable: Variable):
+		if variable.name not in self.index:
+			self.index[variable.name] = len(self.variables)
+			self.variables.append(variable)
+			self._symbols.append(fresh_symbol(str(variable.name)))
+		return self._symbols[self.index[variable.name]]
+
+	def _substitution(self, angles: np.ndarray) -> typing.Dict:
+		substitution = dict(zip(self._symbols, (angles / np.pi).tolist()))
+		if self._objectives:
+			values = dict(zip(self.variables, angles.tolist()))
+			for symbol, objective in zip(self._objective_symbols, self._objectives):
+				substitution[symbol] = float(objective(values)) / np.pi
+		return substitution
+
+	def bind(self, values: typing.Union[typing.Dict, np.ndarray]) -> Circuit:
+		"""Return a tket circuit with the given angles, a dictionary or an array in variable order."""
+		if isinstance(values, dict):
+			angles = self.to_array(values)
+		else:
+			angles = np.asarray(values, dtype=float)
+		if angles.shape != (len(self.variables),):
+			raise ValueError(f'Expected {len(self.variables)} values, got shape {angles.shape}.')
+		circ = self.circuit.copy()
+		circ.symbol_substitution(self._substitution(angles))
+		return circ
+
+	def bind_many(self, values: np.ndarray) -> typing.List[Circuit]:
+		"""Bind every row of a (n_points, n_variables) array."""
+		values = np.asarray(values, dtype=float)
+		if values.ndim != 2 or values.shape[1] != len(self.variables):
+			raise ValueError(
+				f'Expected an array of shape (n, {len(self.variables)}), got {values.shape}.'
+			)
+		return [self.bind(row) for row in values]
+
+
+_TEMPLATES = LRUCache(maxsize=64)
+
+
+def tket_template(circuit: tq.QCircuit) -> TketTemplate:
+	"""Cached TketTemplate of the circuit, shared by structurally equal circuits."""
+	key = circuit_hash(circuit)
+	template = _TEMPLATES.get(key)
+	if template is None:
+		template = TketTemplate(circuit)
+		_TEMPLATES.put(key, template)
+	return template
+
+
 def from_tket(circuit: Circuit) -> tq.QCircuit:
 	if not HAS_PYTKET:
 		raise ModuleNotFoundError("Needed module pytket not found.")
-	circ = tq.QCircuit()
+	gates = []
 
 	for gate in circuit:
 		gate_function = TKET_TO_TQ.get(gate.op.type, None)
@@ -115,9 +245,15 @@ def from_tket(circuit: Circuit) -> tq.QCircuit:
 		arguments = [arg.index[0] for arg in gate.args]
 		if parameters and isinstance(parameters[0], float):
 			q_gate = gate_function(parameters[0] * np.pi, target=arguments[-1], control=arguments[:-1])
+		elif parameters and not getattr(parameters[0], "free_symbols", True):
+			# Substituted symbolic angles stay sympy numbers.
+			q_gate = gate_function(
+				float(parameters[0]) * np.pi, target=arguments[-1], control=arguments[:-1]
+			)
 		elif parameters:
 			q_gate = gate_function(parameters[0].name, target=arguments[-1], control=arguments[:-1])
 		else:
 			q_gate = gate_function(target=arguments[-1], control=arguments[:-1])
-		circ += q_gate
-	return circ
+		gates.extend(q_gate.gates)
+	# Building the circuit once avoids merging the parameter map for every gate.
+	return tq.QCircuit(gates=gates)
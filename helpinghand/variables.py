@@ -0,0 +1,24 @@
+import typing
+
+import numpy as np
+from tequila.objective.objective import Variable, assign_variable
+
+
+class VariableOrder:
+	"""Conversion between variable -> value dictionaries and vectors ordered like `variables`."""
+	variables: typing.List[Variable]
+
+	def to_array(self, values: typing.Dict) -> np.ndarray:
+		"""Order a variable -> value dictionary like self.variables."""
+		values = {assign_variable(k).name: v for k, v in values.items()}
+		return np.array([float(values[variable.name]) for variable in self.variables])
+
+	def to_dict(
+		self,
+		array: typing.Union[np.ndarray, typing.Sequence[float]]
+	) -> typing.Dict[Variable, float]:
+		"""Variable -> value dictionary of a vector ordered like self.variables."""
+		array = np.asarray(array, dtype=float)
+		if array.shape != (len(self.variables),):
+			raise ValueError(f"Expected {len(self.variables)} values, got shape {array.shape}.")
+		return dict(zip(self.variables, array.tolist()))
@@ -0,0 +1,111 @@
+import collections
+
+import numpy as np
+import pytest
+
+pytest.importorskip("pytket.routing")
+
+from helpinghand import architectures  # noqa: E402
+from helpinghand.architectures import architecture_info, select_architecture  # noqa: E402
+
+
+def breadth_first_distances(info, start):
+	distances = {start: 0}
+	queue = collections.deque([start])
+	while queue:
+		node = queue.popleft()
+		for neighbour in info.qubits[info.adjacency[info.index[node]]].tolist():
+			if neighbour not in distances:
+				distances[neighbour] = distances[node] + 1
+				queue.append(neighbour)
+	return distances
+
+
+@pytest.mark.parametrize("name", ["ourense", "melbourne", "falcon", "sycamore"])
+def test_distances_match_breadth_first_search(name):
+	info = architecture_info(name)
+	for start in info.qubits.tolist():
+		reachable = breadth_first_distances(info, start)
+		for end in info.qubits.tolist():
+			assert info.distance(start, end) == reachable.get(end, -1)
+	assert info.degrees.tolist() == info.adjacency.sum(axis=1).tolist()
+
+
+def test_tables_are_built_on_first_use():
+	architectures._REGISTRY.clear()
+	info = architecture_info("hummingbird")
+	assert "distances" not in info.__dict__
+	assert "adjacency" not in info.__dict__
+	assert info.distance(0, 1) == 1
+	assert "distances" in info.__dict__
+
+
+def test_registry_shares_entries():
+	architectures._REGISTRY.clear()
+	info = architecture_info("ourense")
+	assert architecture_info("Valencia") is info
+	assert select_architecture("vigo") is info.architecture
+	assert architecture_info("line", 4) is not architecture_info("line", 5)
+	assert architecture_info("line", 4) is architecture_info("line", 4)
+
+
+def test_registry_is_bounded():
+	architectures._REGISTRY.clear()
+	for qubits in range(2, architectures._REGISTRY.maxsize + 10):
+		architecture_info("ring", qubits)
+	assert len(architectures._REGISTRY) == architectures._REGISTRY.maxsize
+
+
+def test_unknown_and_too_small_architectures():
+	with pytest.raises(ValueError):
+		architecture_info("unknown")
+	with pytest.raises(ValueError):
+		architecture_info("line")
+	with pytest.raises(ValueError):
+		architecture_info("ourense", 6)
+
+
+def test_disconnected_nodes_have_no_distance():
+	info = architectures.ArchitectureInfo("pair", architectures.Architecture([[0, 1], [2, 3]]))
+	assert info.distance(0, 3) == -1
+	assert np.array_equal(info.distances, info.distances.T)
+
+
+@pytest.mark.parametrize("rows, columns", [(1, 4), (3, 3), (2, 5)])
+def test_grid_edges(rows, columns):
+	edges = architectures.grid_edges(rows, columns)
+	assert len(edges) == rows * (columns - 1) + (rows - 1) * columns
+	assert all(abs(first - second) in (1, columns) for first, second in edges.tolist())
+
+
+@pytest.mark.parametrize("qubits", [2, 3, 7])
+def test_ring_edges(qubits):
+	edges = architectures.ring_edges(qubits)
+	assert len(edges) == (qubits if qubits > 2 else 1)
+	if qubits > 2:
+		assert architecture_info("ring", qubits).degrees.tolist() == [2] * qubits
+
+
+def test_all_to_all_edges():
+	info = architecture_info("all_to_all", 6)
+	assert len(architectures.all_to_all_edges(6)) == 15
+	assert info.distances[~np.eye(6, dtype=bool)].tolist() == [1] * 30
+
+
+def test_heavy_hex_edges():
+	edges = architectures.heavy_hex_edges(3, 11)
+	info = architectures.ArchitectureInfo("heavy_hex", architectures.Architecture(edges.tolist()))
+	# two gaps of three bridge qubits between three rows of eleven
+	assert info.n_qubits == 39
+	assert info.degrees.max() == 3
+	assert sorted(set(info.degrees.tolist())) == [1, 2, 3]
+	assert info.distances.min() == 0
+
+
+@pytest.mark.parametrize("name", ["line", "ring", "grid", "heavy_hex", "all_to_all"])
+@pytest.mark.parametrize("qubits", [2, 5, 16, 27, 65])
+def test_scalable_architectures_fit_the_qubits(name, qubits):
+	info = architecture_info(name, qubits)
+	assert info.n_qubits >= qubits
+	# every node can reach every other
+	assert info.distances.min() == 0
@@ -0,0 +1,59 @@
+import importlib.util
+import os
+
+import pytest
+
+BENCHMARKS = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "benchmarks")
+
+
+def load(name: str):
+	path = os.path.join(BENCHMARKS, f"{name}.py")
+	spec = importlib.util.spec_from_file_location(f"benchmarks_{name}", path)
+	module = importlib.util.module_from_spec(spec)
+	spec.loader.exec_module(module)
+	return module
+
+
+def load_run():
+	# the benchmarks include the circuit analysis, which routes with pytket
+	pytest.importorskip("pytket.routing")
+	return load("run")
+
+
+def test_import_time_measure():
+	import_time = load("import_time")
+	duration, heavy = import_time.measure("import json")
+	assert duration >= 0
+	assert heavy == []
+	_, heavy = import_time.measure("import tequila")
+	assert "tequila" in heavy
+	with pytest.raises(import_time.StatementFailed, match="ZeroDivisionError"):
+		import_time.measure("1 / 0")
+
+
+def test_light_statements_stay_light():
+	import_time = load("import_time")
+	for statement in import_time.LIGHT_STATEMENTS:
+		assert import_time.measure(statement)[1] == []
+
+
+def test_regressions_ignore_noise():
+	run = load_run()
+	baseline = {"time": 0.1, "peak_memory": 10 * 2 ** 20}
+	assert run.regressions({"time": 0.11, "peak_memory": 10 * 2 ** 20}, baseline, 0.25) == []
+	assert run.regressions({"time": 0.2, "peak_memory": 30 * 2 ** 20}, baseline, 0.25) == [
+		"time x2.00", "memory x3.00"
+	]
+	# relatively large, but below the absolute noise limits
+	tiny = {"time": 1e-5, "peak_memory": 1024}
+	assert run.regressions({"time": 1e-4, "peak_memory": 4096}, tiny, 0.25) == []
+
+
+def test_quick_benchmark_runs():
+	run = load_run()
+	names = [case.name for case in run.BENCHMARKS]
+	assert len(names) == len(set(names))
+	case = next(case for case in run.BENCHMARKS if case.name == "measurement_grouping/qwc_n12")
+	result = run.measure(case, repeat=2)
+	assert set(result) == {"time", "median", "peak_memory"}
+	assert 0 < result["time"] <= result["median"]
@@ -0,0 +1,19 @@
+import os
+
+from helpinghand.checkpoint import Checkpoint
+
+
+def test_drops_torn_record(tmp_path):
+	path = str(tmp_path / "checkpoint")
+	checkpoint = Checkpoint(path)
+	checkpoint.append("first", 1.0)
+	checkpoint.append("second", 2.0)
+	with open(path, "r+b") as file:
+		file.truncate(os.path.getsize(path) - 3)
+
+	reopened = Checkpoint(path)
+	assert "first" in reopened and "second" not in reopened
+	assert reopened.load("first") == 1.0
+	reopened.append("third", 3.0)
+	assert len(Checkpoint(path)) == 2
+	assert Checkpoint(path).load("third") == 3.0
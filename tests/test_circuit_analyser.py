@@ -0,0 +1,83 @@
+import pytest
+import tequila as tq
+
+pytest.importorskip("pytket.routing")
+
+from helpinghand.analyse import CircuitAnalyser, CircuitArrays, CircuitMetrics  # noqa: E402
+from helpinghand.hardware_ansatz import create_hardware_ansatz  # noqa: E402
+from helpinghand.tket import from_tket  # noqa: E402
+
+
+def test_memoizes_structurally_equal_circuits():
+	analyser = CircuitAnalyser()
+	analytics = analyser(create_hardware_ansatz(3, 1))
+	assert analyser(create_hardware_ansatz(3, 1)) is analytics
+	assert analyser(create_hardware_ansatz(3, 2)) is not analytics
+	assert analyser(create_hardware_ansatz(3, 1), "ourense") is not analytics
+	assert analyser.cache.hits == 1
+
+
+def test_compiler_settings_are_part_of_the_key():
+	circuit = tq.gates.Ry("a", 0) + tq.gates.CNOT(0, 1)
+	first = CircuitAnalyser()(circuit)
+	second = CircuitAnalyser(compiler_arguments={"ry_gate": True})(circuit)
+	assert first.gate_counts != second.gate_counts
+
+
+def test_batch_matches_single_analyses():
+	circuits = [create_hardware_ansatz(3, 1), create_hardware_ansatz(4, 2)]
+	analyser = CircuitAnalyser()
+	rows = analyser.batch(circuits, [None, "ourense", "unknown"], processes=2)
+	assert [(row["circuit"], row["architecture"]) for row in rows] == [
+		(circuit, architecture)
+		for circuit in range(2)
+		for architecture in (None, "ourense", "unknown")
+	]
+	for row in rows:
+		if row["architecture"] == "unknown":
+			assert isinstance(row["error"], Exception)
+			continue
+		assert row["error"] is None
+		single = CircuitAnalyser()(circuits[row["circuit"]], row["architecture"])
+		assert row["depth"] == single.gate_depth
+		assert row["gates"] == single.gate_count
+		assert row["two_qubit_gates"] == single.gate_qubit_counts.get(2, 0)
+	# the results are memoized for single calls
+	assert analyser(circuits[0], "ourense").gate_depth == rows[1]["depth"]
+	assert analyser.cache.hits == 1
+
+
+def test_metrics_are_computed_on_demand():
+	analytics = CircuitAnalyser()(create_hardware_ansatz(3, 1), "ourense")
+	assert analytics.parameter_count > 0
+	assert "tket_circuit" not in analytics.__dict__
+	assert analytics.gate_depth > 0
+	assert "tket_circuit" in analytics.__dict__
+
+
+def test_disk_cache_stores_computed_metrics(tmp_path):
+	circuit = create_hardware_ansatz(3, 1)
+	analyser = CircuitAnalyser(cache_directory=str(tmp_path))
+	analytics = analyser(circuit)
+	assert list(tmp_path.iterdir()) == []
+	depth = analytics.gate_depth
+	analyser.flush()
+	assert len(list(tmp_path.iterdir())) == 1
+
+	loaded = CircuitAnalyser(cache_directory=str(tmp_path))(circuit)
+	assert loaded.__dict__["gate_depth"] == depth
+	assert "gate_count" not in loaded.__dict__
+	assert loaded.gate_count == analytics.gate_count
+	assert loaded.parameter_count == analytics.parameter_count
+
+
+def test_routed_metrics_skip_the_round_trip():
+	analytics = CircuitAnalyser()(create_hardware_ansatz(4, 2), "ourense")
+	gate_counts, depth = analytics.gate_counts, analytics.gate_depth
+	# the metrics come from the routed tket circuit, not from a round trip to tequila
+	assert "circuit" not in analytics.__dict__
+
+	round_trip = CircuitArrays.from_tequila(from_tket(analytics.tket_circuit))
+	assert gate_counts == round_trip.gate_counts()[0]
+	assert depth == CircuitMetrics(round_trip).depth
+	assert analytics.qubit_count == round_trip.n_qubits
@@ -0,0 +1,72 @@
+import random
+
+import pytest
+import tequila as tq
+
+pytest.importorskip("pytket.routing")
+
+from helpinghand.analyse import CircuitArrays, CircuitMetrics  # noqa: E402
+from helpinghand.hardware_ansatz import create_hardware_ansatz  # noqa: E402
+
+
+def random_gates(n_qubits: int, count: int, seed: int):
+	generator = random.Random(seed)
+	gates = []
+	for _ in range(count):
+		qubits = generator.sample(range(n_qubits), generator.choice([1, 2, 3]))
+		gates.append(("X", qubits[:1], qubits[1:]))
+	return gates
+
+
+def naive_layers(gates):
+	layers = []
+	for i, (_, targets, controls) in enumerate(gates):
+		qubits = set(targets) | set(controls)
+		earlier = [
+			layers[j] for j in range(i) if qubits & (set(gates[j][1]) | set(gates[j][2]))
+		]
+		layers.append(max(earlier, default=0) + 1)
+	return layers
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_metrics_match_naive_computation(seed):
+	gates = random_gates(5, 40, seed)
+	metrics = CircuitMetrics(CircuitArrays.from_gates(gates, 5))
+	layers = naive_layers(gates)
+	assert metrics.layers.tolist() == layers
+	assert metrics.depth == max(layers)
+	assert sum(metrics.layer_histogram) == len(gates)
+	multi_qubit = [(name, targets, controls) for name, targets, controls in gates if controls]
+	assert metrics.two_qubit_depth == max(naive_layers(multi_qubit), default=0)
+
+	path = metrics.critical_path
+	assert len(path) == metrics.depth
+	assert [layers[gate] for gate in path] == list(range(1, metrics.depth + 1))
+	for earlier, later in zip(path, path[1:]):
+		assert set(gates[earlier][1] + gates[earlier][2]) & set(gates[later][1] + gates[later][2])
+
+
+def test_metrics_of_tequila_circuit():
+	circuit = tq.gates.H(0) + tq.gates.CNOT(0, 1) + tq.gates.X(2) + tq.gates.CNOT(1, 2)
+	metrics = CircuitMetrics(circuit)
+	assert metrics.depth == 3
+	assert metrics.two_qubit_depth == 2
+	assert metrics.qubit_busy_time.tolist() == [2, 2, 2]
+	assert metrics.critical_path == [0, 1, 3]
+	gate_counts, gate_qubit_counts = metrics.arrays.gate_counts()
+	assert list(gate_counts.items()) == [("H (1)", 1), ("CX (2)", 2), ("X (1)", 1)]
+	assert list(gate_qubit_counts.items()) == [(1, 2), (2, 2)]
+
+
+def test_gate_counts_keep_order_of_appearance():
+	arrays = CircuitArrays.from_tequila(create_hardware_ansatz(3, 1))
+	gate_counts, gate_qubit_counts = arrays.gate_counts()
+	assert sum(gate_counts.values()) == len(arrays) == sum(gate_qubit_counts.values())
+
+
+def test_empty_circuit():
+	metrics = CircuitMetrics(CircuitArrays.from_gates([], 2))
+	assert metrics.depth == 0
+	assert metrics.two_qubit_depth == 0
+	assert metrics.critical_path == []
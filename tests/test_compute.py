@@ -0,0 +1,156 @@
+import functools
+import os
+
+import pytest
+import tequila as tq
+
+from helpinghand import instrumentation
+from helpinghand.checkpoint import Checkpoint
+from helpinghand.compute import _describe, compute, compute_many, compute_stream
+from helpinghand.hardware_ansatz import create_hardware_ansatz
+
+OPTIMIZER = functools.partial(tq.minimize, method="BFGS", silent=True)
+
+
+def hamiltonians(count: int = 3):
+	return [
+		tq.paulis.Z(0) + distance * tq.paulis.X(0) * tq.paulis.X(1) + 0.5 * tq.paulis.Z(1)
+		for distance in [0.2 + 0.3 * i for i in range(count)]
+	]
+
+
+def test_parallel_matches_sequential():
+	circuit = create_hardware_ansatz(2, 1)
+	sequential = compute_many(hamiltonians(), circuit, 0.1, OPTIMIZER, mark=False)
+	parallel = compute_many(
+		hamiltonians(), circuit, 0.1, OPTIMIZER, mark=False, parallel=True, processes=2
+	)
+	# both run on the same backend, only the process differs
+	assert [result.energy for result in parallel] == pytest.approx(
+		[result.energy for result in sequential], abs=1e-6
+	)
+
+
+def test_parallel_returns_exceptions_in_place():
+	results = compute_many(
+		hamiltonians(2), create_hardware_ansatz(2, 1), 0.1, "not an optimizer", mark=False,
+		parallel=True, processes=2
+	)
+	assert all(isinstance(result, Exception) for result in results)
+
+
+def test_continuation_argument_checks():
+	with pytest.raises(ValueError):
+		compute_many(hamiltonians(), tq.gates.Ry("a", 0), 0, OPTIMIZER, parallel=True, continuation=True)
+	with pytest.raises(ValueError, match="bidirectional requires continuation"):
+		compute_many(hamiltonians(), tq.gates.Ry("a", 0), 0, OPTIMIZER, bidirectional=True)
+
+
+def test_bidirectional_is_not_worse_than_one_sweep():
+	circuit = create_hardware_ansatz(2, 1)
+	forward = compute_many(hamiltonians(), circuit, 0.1, OPTIMIZER, mark=False, continuation=True)
+	both = compute_many(
+		hamiltonians(), circuit, 0.1, OPTIMIZER, mark=False, continuation=True, bidirectional=True
+	)
+	for single, best in zip(forward, both):
+		assert best.energy <= single.energy + 1e-9
+
+
+def numpy_only_optimizer(**arguments):
+	if arguments.get("backend") != "numpy":
+		raise ValueError(f"Expected the numpy backend, got {arguments.get('backend')}.")
+	return OPTIMIZER(**arguments)
+
+
+@pytest.mark.parametrize("parallel", [False, True])
+def test_backend_reaches_compute(parallel):
+	results = compute_many(
+		hamiltonians(2), tq.gates.Ry("a", 0), 0.1, numpy_only_optimizer, mark=False,
+		parallel=parallel, processes=2, backend="numpy"
+	)
+	assert not any(isinstance(result, Exception) for result in results)
+
+
+@pytest.mark.parametrize("optimizer", [
+	tq.optimizers.OptimizerSciPy(method="BFGS", silent=True),
+	OPTIMIZER,
+])
+def test_compute_with_numpy_backend(optimizer):
+	events = []
+	instrumentation.add_hook(events.append)
+	try:
+		result = compute(
+			tq.paulis.Z(0) + 0.5 * tq.paulis.X(0), tq.gates.Ry("a", 0), optimizer, 0.1, backend="numpy"
+		)
+	finally:
+		instrumentation.remove_hook(events.append)
+	assert result.energy == pytest.approx(-(1.25 ** 0.5), abs=1e-6)
+	assert any(event["event"] == "compile" and event.get("backend") == "numpy" for event in events)
+
+
+def stream_energies(path, optimizer=OPTIMIZER, **arguments):
+	return [
+		result.energy
+		for _, result in compute_stream(
+			hamiltonians(), create_hardware_ansatz(2, 1), 0.1, optimizer, path, **arguments
+		)
+	]
+
+
+def count_optimizations(function):
+	events = []
+	instrumentation.add_hook(events.append)
+	try:
+		function()
+	finally:
+		instrumentation.remove_hook(events.append)
+	return sum(event["event"] == "optimize" for event in events)
+
+
+def test_compute_stream_resumes_from_checkpoint(tmp_path):
+	path = str(tmp_path / "checkpoint")
+	first = stream_energies(path)
+	# a crash while writing the last point
+	with open(path, "r+b") as file:
+		file.truncate(os.path.getsize(path) - 5)
+	assert len(Checkpoint(path)) == 2
+
+	resumed = []
+	assert count_optimizations(lambda: resumed.extend(stream_energies(path))) == 1
+	assert resumed == pytest.approx(first, abs=1e-6)
+	assert len(Checkpoint(path)) == 3
+
+
+@pytest.mark.parametrize("arguments", [
+	{"optimizer": functools.partial(tq.minimize, method="COBYLA", silent=True)},
+	{"grouping": "qwc"},
+	{"backend": "numpy"},
+])
+def test_compute_stream_does_not_reuse_other_settings(tmp_path, arguments):
+	path = str(tmp_path / "checkpoint")
+	stream_energies(path)
+	assert count_optimizations(lambda: stream_energies(path, **arguments)) == 3
+
+
+def test_optimizer_descriptions():
+	assert _describe(functools.partial(tq.minimize, method="BFGS")) == _describe(
+		functools.partial(tq.minimize, method="BFGS")
+	)
+	assert _describe(functools.partial(tq.minimize, method="BFGS")) != _describe(
+		functools.partial(tq.minimize, method="COBYLA")
+	)
+	assert _describe(tq.optimizers.OptimizerSciPy(method="BFGS")) != _describe(
+		tq.optimizers.OptimizerSciPy(method="COBYLA")
+	)
+	with pytest.raises(ValueError):
+		_describe(lambda **arguments: tq.minimize(**arguments))
+
+
+def test_compute_stream_with_optimizer_key(tmp_path):
+	path = str(tmp_path / "checkpoint")
+	with pytest.raises(ValueError, match="optimizer_key"):
+		stream_energies(path, lambda **arguments: OPTIMIZER(**arguments))
+	stream_energies(path, lambda **arguments: OPTIMIZER(**arguments), optimizer_key="bfgs")
+	assert count_optimizations(
+		lambda: stream_energies(path, lambda **arguments: OPTIMIZER(**arguments), optimizer_key="bfgs")
+	) == 0
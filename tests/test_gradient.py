@@ -0,0 +1,23 @@
+import pytest
+import tequila as tq
+
+from helpinghand.gradient import get_max_from_VQE
+
+
+class FakeMolecule:
+	def make_hamiltonian(self):
+		return tq.paulis.Z(0) + 0.5 * tq.paulis.X(0)
+
+
+@pytest.mark.parametrize("optimizer", [
+	tq.optimizers.OptimizerSciPy(method="BFGS", silent=True),
+	lambda **arguments: tq.minimize(method="BFGS", silent=True, **arguments),
+])
+def test_get_max_from_VQE_with_numpy_backend(optimizer):
+	gradients, qubits, energy = get_max_from_VQE(
+		FakeMolecule(), lambda molecule: tq.gates.Ry("a", 0), optimizer, 0.1, backend="numpy"
+	)
+	assert qubits == 1
+	assert energy == pytest.approx(-(1.25 ** 0.5), abs=1e-6)
+	assert gradients[-1] < 1e-3 < gradients[0]
+	assert all(gradient >= 0 for gradient in gradients)
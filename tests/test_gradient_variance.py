@@ -0,0 +1,76 @@
+import numpy as np
+import pytest
+import scipy.stats
+import tequila as tq
+
+from helpinghand.gradient_variance import (
+	GradientVarianceSampler,
+	RunningStatistics,
+	scan_gradient_variance
+)
+from helpinghand.hardware_ansatz import create_hardware_ansatz
+
+
+def hamiltonian(n_qubits: int) -> tq.QubitHamiltonian:
+	return tq.paulis.Z(0) * tq.paulis.Z(n_qubits - 1)
+
+
+def sampler(**arguments) -> GradientVarianceSampler:
+	return GradientVarianceSampler(hamiltonian(2), create_hardware_ansatz(2, 2), **arguments)
+
+
+def test_running_statistics_match_numpy():
+	values = np.random.default_rng(0).normal(size=(50, 3))
+	statistics = RunningStatistics(3)
+	for batch in np.array_split(values, [1, 7, 30]):
+		statistics.update(batch)
+	assert statistics.count == 50
+	assert statistics.mean == pytest.approx(values.mean(axis=0))
+	assert statistics.variance == pytest.approx(values.var(axis=0, ddof=1))
+
+
+def test_estimate_matches_the_sampled_gradients():
+	estimate = sampler(batch_size=16, seed=3).run(max_samples=400, rtol=0)
+	gradients = sampler(batch_size=16, seed=3).sample(400)
+	assert estimate.samples == 400
+	assert not estimate.converged
+	assert estimate.variance == pytest.approx(gradients.var(axis=0, ddof=1))
+	assert estimate.mean_variance == pytest.approx(gradients.var(axis=0, ddof=1).mean())
+
+	# confidence interval of the mean variance itself
+	deviations = ((gradients - gradients.mean(axis=0)) ** 2).mean(axis=1)
+	half_width = scipy.stats.norm.ppf(0.975) * deviations.std(ddof=1) / np.sqrt(400)
+	assert estimate.half_width == pytest.approx(half_width, rel=0.05)
+
+
+def test_stops_once_converged():
+	estimates = list(sampler(batch_size=8, seed=0).stream(min_samples=16, rtol=10))
+	assert estimates[-1].converged
+	assert estimates[-1].samples == 16
+
+
+@pytest.mark.parametrize("arguments", [
+	{"max_samples": 1},
+	{"rtol": -0.1},
+	{"confidence": 1},
+])
+def test_invalid_stream_arguments(arguments):
+	with pytest.raises(ValueError):
+		sampler().stream(**arguments)
+	with pytest.raises(ValueError):
+		scan_gradient_variance(hamiltonian, create_hardware_ansatz, [2], [1], **arguments)
+
+
+def test_invalid_sampler_arguments():
+	with pytest.raises(ValueError):
+		sampler(batch_size=0)
+	with pytest.raises(ValueError):
+		sampler(low=1, high=1)
+
+
+def test_scan_rows():
+	rows = scan_gradient_variance(
+		hamiltonian, create_hardware_ansatz, [2, 3], [1, 2], seed=0, max_samples=32
+	)
+	assert [(row["qubits"], row["depth"]) for row in rows] == [(2, 1), (2, 2), (3, 1), (3, 2)]
+	assert all(row["samples"] == 32 and row["variance"] > 0 for row in rows)
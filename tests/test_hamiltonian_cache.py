@@ -0,0 +1,80 @@
+import os
+from unittest import mock
+
+import pytest
+import tequila as tq
+
+from helpinghand.hamiltonian_cache import (
+	HamiltonianCache,
+	arguments_key,
+	hamiltonian_and_fci,
+	resolve_backend
+)
+
+H2 = {"geometry": "H 0 0 0\nH 0 0 0.7", "basis_set": "STO-3G", "backend": "pyscf"}
+
+
+def test_round_trip_without_creating_the_molecule(tmp_path):
+	hamiltonian = tq.paulis.Z(0) - 0.25 * tq.paulis.X(0) * tq.paulis.Y(2) + 0.5j * tq.paulis.Z(1)
+	cache = HamiltonianCache(str(tmp_path))
+	assert cache.load(H2) is None
+	cache.store(H2, hamiltonian, -1.1)
+	with mock.patch.object(tq, "Molecule", side_effect=AssertionError("molecule created")):
+		loaded, fci_energy = hamiltonian_and_fci(H2, cache)
+	assert fci_energy == -1.1
+	assert loaded == hamiltonian
+
+
+def test_key_ignores_spelling_but_not_backend():
+	assert arguments_key(H2) == arguments_key(
+		{"backend": "pyscf", "basis_set": "sto-3g", "geometry": "H 0.0 0.0 0.0\nH 0.0 0.0 0.70"}
+	)
+	assert arguments_key(H2) != arguments_key({**H2, "backend": "psi4"})
+	assert arguments_key({**H2, "backend": None}) == arguments_key(
+		{**H2, "backend": resolve_backend({**H2, "backend": None})}
+	)
+
+
+def test_default_backend_of_the_helper(tmp_path):
+	cache = HamiltonianCache(str(tmp_path))
+	cache.store(H2, tq.paulis.Z(0), -1.0)
+	without_backend = {name: value for name, value in H2.items() if name != "backend"}
+	with mock.patch.object(tq, "Molecule", side_effect=AssertionError("molecule created")):
+		assert hamiltonian_and_fci(without_backend, cache, "pyscf")[1] == -1.0
+		if resolve_backend(without_backend) != "pyscf":
+			with pytest.raises(AssertionError):
+				hamiltonian_and_fci(without_backend, cache)
+
+
+def test_evicts_least_recently_used(tmp_path):
+	cache = HamiltonianCache(str(tmp_path))
+	first = {**H2, "geometry": "H 0 0 0\nH 0 0 0.7"}
+	cache.store(first, tq.paulis.Z(0), -1.0)
+	entry, = os.scandir(str(tmp_path))
+	os.utime(entry.path, (0, 0))
+	cache.max_bytes = entry.stat().st_size
+	cache.store({**H2, "geometry": "H 0 0 0\nH 0 0 0.8"}, tq.paulis.Z(0), -1.0)
+	assert len(os.listdir(str(tmp_path))) == 1
+	assert cache.load(first) is None
+
+
+def test_pyscf_helper_uses_the_cache(tmp_path):
+	pytest.importorskip("pyscf")
+	from helpinghand.pyscf_helper import pyscf_create_hamiltonians
+
+	def creator(distance):
+		return {"geometry": f"H 0 0 0\nH 0 0 {distance}", "basis_set": "sto-3g"}
+
+	cache = HamiltonianCache(str(tmp_path / "cache"))
+	directory = os.getcwd()
+	# tequila writes the molecule next to the working directory
+	os.chdir(str(tmp_path))
+	try:
+		hamiltonians, _, fci_energies = pyscf_create_hamiltonians(creator, [0.7], cache)
+		with mock.patch.object(tq, "Molecule", side_effect=AssertionError("molecule created")):
+			cached, _, cached_energies = pyscf_create_hamiltonians(creator, [0.7], cache)
+	finally:
+		os.chdir(directory)
+	assert cached_energies == fci_energies
+	assert cached[0] == hamiltonians[0]
+	assert fci_energies[0] == pytest.approx(-1.136, abs=1e-3)
@@ -0,0 +1,72 @@
+import numpy as np
+import pytest
+import tequila as tq
+
+from helpinghand.hardware_ansatz import create_hardware_ansatz, hardware_ansatz_template
+from helpinghand.hashing import circuit_hash
+
+
+def naive_ansatz(n_qubits: int, d: int, uent: tq.QCircuit = None) -> tq.QCircuit:
+	def rotations(depth):
+		circuit = tq.QCircuit()
+		for qubit in range(n_qubits):
+			for k, gate in enumerate((tq.gates.Rz, tq.gates.Rx, tq.gates.Rz)):
+				circuit += gate(f'{qubit}^{depth}_{k}', target=qubit)
+		return circuit
+
+	if uent is None:
+		uent = tq.QCircuit()
+		pairs = [(i - 1, i) for i in range(1, n_qubits, 2)] + [(i - 1, i) for i in range(2, n_qubits, 2)]
+		for control, target in pairs:
+			uent += tq.gates.CZ(target=target, control=control)
+	circuit = rotations(0)
+	for depth in range(d):
+		circuit += uent + rotations(depth + 1)
+	return circuit
+
+
+@pytest.mark.parametrize("n_qubits, d", [(1, 0), (2, 1), (4, 3), (5, 2)])
+def test_matches_naive_construction(n_qubits, d):
+	assert circuit_hash(create_hardware_ansatz(n_qubits, d)) == circuit_hash(naive_ansatz(n_qubits, d))
+
+
+def test_custom_entangler():
+	uent = tq.gates.CNOT(0, 1) + tq.gates.CNOT(1, 2)
+	custom = circuit_hash(create_hardware_ansatz(3, 2, uent))
+	assert custom == circuit_hash(naive_ansatz(3, 2, uent))
+	assert custom != circuit_hash(create_hardware_ansatz(3, 2))
+
+
+def test_circuits_do_not_share_gates():
+	first = create_hardware_ansatz(3, 2)
+	second = create_hardware_ansatz(3, 2)
+	assert not {id(gate) for gate in first.gates} & {id(gate) for gate in second.gates}
+	first.add_controls([3])
+	assert all(3 in gate.control for gate in first.gates)
+	assert not any(gate.control and 3 in gate.control for gate in create_hardware_ansatz(3, 2).gates)
+
+
+def test_parameter_map_points_at_own_gates():
+	circuit = create_hardware_ansatz(3, 2)
+	for variable, positions in circuit.make_parameter_map().items():
+		for position, gate in positions:
+			assert circuit.gates[position] is gate
+			assert gate.parameter == variable
+	# replacing a variable changes only this circuit
+	mapped = circuit.map_variables({tq.Variable("0^0_0"): 0.5})
+	assert tq.Variable("0^0_0") not in mapped.extract_variables()
+	assert tq.Variable("0^0_0") in create_hardware_ansatz(3, 2).extract_variables()
+
+
+def test_template_vector_conversion():
+	template = hardware_ansatz_template(2, 1)
+	assert template.n_parameters == 12
+	values = np.arange(template.n_parameters, dtype=float)
+	as_dict = template.to_dict(values)
+	assert list(as_dict) == template.variables
+	assert template.to_array(as_dict) == pytest.approx(values)
+	by_name = {str(variable.name): value for variable, value in as_dict.items()}
+	assert template.to_array(by_name) == pytest.approx(values)
+	with pytest.raises(ValueError):
+		template.to_dict(values[1:])
+	assert hardware_ansatz_template(2, 1) is template
@@ -0,0 +1,23 @@
+import tequila as tq
+
+from helpinghand.hardware_ansatz import create_hardware_ansatz
+from helpinghand.hashing import circuit_hash, hamiltonian_hash
+
+
+def test_circuit_hash_is_structural():
+	assert circuit_hash(create_hardware_ansatz(2, 1)) == circuit_hash(create_hardware_ansatz(2, 1))
+	assert circuit_hash(tq.gates.Ry("a", 0)) != circuit_hash(tq.gates.Ry("b", 0))
+	assert circuit_hash(tq.gates.Ry("a", 0)) != circuit_hash(tq.gates.Rx("a", 0))
+	assert circuit_hash(tq.gates.Ry("a", 0)) != circuit_hash(tq.gates.Ry("a", 1))
+	assert circuit_hash(tq.gates.Ry(2 * tq.Variable("a"), 0)) != circuit_hash(
+		tq.gates.Ry(3 * tq.Variable("a"), 0)
+	)
+
+
+def test_hamiltonian_hash():
+	first = tq.paulis.Z(0) + 0.5 * tq.paulis.X(1)
+	assert hamiltonian_hash(first) == hamiltonian_hash(0.5 * tq.paulis.X(1) + tq.paulis.Z(0))
+	assert hamiltonian_hash(first) != hamiltonian_hash(tq.paulis.Z(0) + 0.6 * tq.paulis.X(1))
+	assert hamiltonian_hash(first, coefficients=False) == hamiltonian_hash(
+		tq.paulis.Z(0) + 0.6 * tq.paulis.X(1), coefficients=False
+	)
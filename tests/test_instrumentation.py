@@ -0,0 +1,57 @@
+import functools
+
+import pytest
+import tequila as tq
+
+from helpinghand import instrumentation
+from helpinghand.compute import compute
+
+
+def test_without_hooks_stages_do_nothing():
+	assert not instrumentation.enabled()
+	with instrumentation.stage("nothing") as stage:
+		stage.update(count=1)
+	assert instrumentation.stage("other") is stage
+
+
+def test_stage_emits_duration_fields_and_errors():
+	events = []
+	instrumentation.add_hook(events.append)
+	try:
+		with instrumentation.stage("work", size=3) as stage:
+			stage.update(result=4)
+		with pytest.raises(KeyError):
+			with instrumentation.stage("failing"):
+				raise KeyError("missing")
+	finally:
+		instrumentation.remove_hook(events.append)
+	assert not instrumentation.enabled()
+	assert [event["event"] for event in events] == ["work", "failing"]
+	assert events[0]["size"] == 3 and events[0]["result"] == 4
+	assert events[0]["duration"] >= 0
+	assert events[1]["error"] == "KeyError"
+
+
+def test_json_lines_recorder(tmp_path):
+	path = str(tmp_path / "events.jsonl")
+	with instrumentation.JsonLinesRecorder(path):
+		instrumentation.emit("first", value=1)
+		instrumentation.emit("second", value=object())
+	instrumentation.emit("after")
+	records = instrumentation.read_records(path)
+	assert [record["event"] for record in records] == ["first", "second"]
+	assert records[0]["value"] == 1
+	assert isinstance(records[1]["value"], str)
+
+
+def test_compute_reports_its_stages(tmp_path):
+	path = str(tmp_path / "events.jsonl")
+	optimizer = functools.partial(tq.minimize, method="BFGS", silent=True)
+	with instrumentation.JsonLinesRecorder(path):
+		result = compute(tq.paulis.Z(0) + 0.5 * tq.paulis.X(0), tq.gates.Ry("a", 0), optimizer, 0.1)
+	records = {record["event"]: record for record in instrumentation.read_records(path)}
+	assert records["objective"]["terms"] == 2
+	assert records["objective"]["expectation_values"] == 1
+	assert records["optimize"]["energy"] == pytest.approx(result.energy)
+	assert records["optimize"]["iterations"] > 0
+	assert records["optimize"]["energy_evaluations"] > 0
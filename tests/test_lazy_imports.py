@@ -0,0 +1,54 @@
+import os
+import subprocess
+import sys
+import textwrap
+
+import helpinghand
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(helpinghand.__file__)))
+
+
+def run_python(code: str) -> None:
+	subprocess.run([sys.executable, "-c", textwrap.dedent(code)], check=True, cwd=ROOT)
+
+
+def test_import_does_not_load_dependencies():
+	run_python("""
+		import sys
+		import helpinghand
+		assert "tequila" not in sys.modules
+		assert "pytket" not in sys.modules
+		helpinghand.create_hardware_ansatz(2, 1)
+		assert "tequila" in sys.modules
+	""")
+
+
+def test_missing_optional_dependency_hides_its_names():
+	run_python("""
+		import sys
+		sys.modules["pyscf"] = None
+		import helpinghand
+		assert "pyscf_create_hamiltonians" not in helpinghand.__all__
+		assert "pyscf_create_hamiltonians" not in dir(helpinghand)
+		assert not hasattr(helpinghand, "pyscf_create_hamiltonians")
+		try:
+			from helpinghand import pyscf_create_hamiltonians
+		except ImportError:
+			pass
+		else:
+			raise AssertionError("pyscf_create_hamiltonians was imported")
+	""")
+
+
+def test_submodule_import_keeps_the_function():
+	import helpinghand.compute  # noqa: F401
+	from helpinghand import compute
+	assert callable(compute)
+	assert helpinghand.compute is sys.modules["helpinghand.compute"].compute
+
+
+def test_public_names():
+	assert set(helpinghand.__all__) <= set(dir(helpinghand))
+	assert helpinghand.statevector is sys.modules["helpinghand.statevector"]
+	assert helpinghand.ScanHamiltonian.__name__ == "ScanHamiltonian"
+	assert not hasattr(helpinghand, "not_a_name")
@@ -0,0 +1,42 @@
+import pytest
+import tequila as tq
+
+from helpinghand.hardware_ansatz import create_hardware_ansatz
+from helpinghand.measurement_grouping import grouped_expectation_value, qwc_groups
+
+HAMILTONIANS = [
+	# a single Y, whose sign depends on the basis rotation
+	tq.QubitHamiltonian.from_string("1.0*Y(0) + 0.5*Z(1)"),
+	tq.QubitHamiltonian.from_string("1.0*X(0)Y(1) + 0.5*Y(2) - 0.3*Z(0)Z(2) + 0.2*Y(0)Y(1)Y(2)"),
+	tq.QubitHamiltonian.from_string("0.7*X(1)X(2) + 0.4*Y(1)Y(2) - 0.2*Z(1)Z(2) + 0.1*X(2)"),
+]
+
+
+@pytest.mark.parametrize("hamiltonian", HAMILTONIANS)
+def test_qwc_matches_symbolic(hamiltonian):
+	circuit = create_hardware_ansatz(3, 1)
+	values = {variable: 0.3 * i - 1 for i, variable in enumerate(circuit.extract_variables())}
+	grouped = grouped_expectation_value(hamiltonian, circuit, "qwc")
+	expected = tq.ExpectationValue(H=hamiltonian, U=circuit)
+	assert tq.simulate(grouped, variables=values, backend="symbolic") == pytest.approx(
+		tq.simulate(expected, variables=values, backend="symbolic"), abs=1e-10
+	)
+
+
+def test_single_y_value():
+	objective = grouped_expectation_value(HAMILTONIANS[0], tq.gates.Rx(-0.5, 0) + tq.gates.X(1))
+	# <Y> = sin(0.5) after Rx(-0.5) and <Z> = -1 after X
+	assert tq.simulate(objective, backend="symbolic") == pytest.approx(0.479425538604203 - 0.5)
+
+
+def test_groups_commute_qubit_wise():
+	groups = qwc_groups(HAMILTONIANS[2])
+	assert sum(len(group.terms) for group in groups) == 4
+	for group in groups:
+		for term in group.terms:
+			assert all(group.basis[qubit] == pauli for qubit, pauli in term)
+
+
+def test_unknown_groupings_are_refused():
+	with pytest.raises(ValueError):
+		grouped_expectation_value(HAMILTONIANS[0], tq.gates.Ry("a", 0), "commuting")
@@ -0,0 +1,56 @@
+import gc
+import pickle
+
+import pytest
+import tequila as tq
+from tequila.simulators import simulator_api
+
+from helpinghand.compute import compute
+from helpinghand.hardware_ansatz import create_hardware_ansatz
+from helpinghand.objective_cache import ObjectiveCache
+
+
+def test_reuses_compiled_circuits():
+	circuit = create_hardware_ansatz(2, 1)
+	values = {variable: 0.3 for variable in circuit.extract_variables()}
+	with ObjectiveCache() as cache:
+		for hamiltonian in (tq.paulis.Z(0), tq.paulis.X(1), tq.paulis.Z(0) * tq.paulis.Z(1)):
+			expectation_value = tq.ExpectationValue(H=hamiltonian, U=circuit)
+			assert tq.simulate(expectation_value, values, backend=cache.backend) == pytest.approx(
+				tq.simulate(expectation_value, values, backend=cache.base_backend), abs=1e-12
+			)
+		assert len(cache) == 1
+		assert cache.circuits.hits == 2
+		assert pickle.loads(pickle.dumps(cache)) is cache
+
+
+def test_unregisters_backend():
+	with ObjectiveCache() as cache:
+		backend = cache.backend
+		assert backend in simulator_api.INSTALLED_SIMULATORS
+	assert backend not in simulator_api.INSTALLED_SIMULATORS
+	assert backend not in simulator_api.SUPPORTED_BACKENDS
+	assert len(cache) == 0
+
+	cache = ObjectiveCache()
+	backend = cache.backend
+	del cache
+	gc.collect()
+	assert backend not in simulator_api.INSTALLED_SIMULATORS
+
+
+@pytest.mark.parametrize("optimizer", [
+	tq.optimizers.OptimizerSciPy(method="BFGS", silent=True),
+	lambda **arguments: tq.minimize(method="BFGS", silent=True, **arguments),
+])
+def test_compute_with_cache(optimizer):
+	hamiltonian = tq.paulis.Z(0) + 0.5 * tq.paulis.X(0)
+	circuit = tq.gates.Ry("a", 0)
+	# double precision, whatever the default simulator is
+	with ObjectiveCache(backend="numpy") as cache:
+		result = compute(hamiltonian, circuit, optimizer, 0.1, objective_cache=cache)
+		assert len(cache) > 0
+	assert result.energy == pytest.approx(-(1.25 ** 0.5), abs=1e-6)
+	if isinstance(optimizer, tq.optimizers.OptimizerSciPy):
+		# the backend is set on a copy
+		assert optimizer.backend != cache.backend
@@ -0,0 +1,61 @@
+import numpy as np
+import pytest
+import tequila as tq
+
+from helpinghand.compute import compute
+from helpinghand.hardware_ansatz import create_hardware_ansatz
+from helpinghand.parameter_shift import ParameterShiftGradient, ParameterShiftOptimizer
+
+HAMILTONIAN = tq.QubitHamiltonian.from_string("1.0*X(0)Y(1) + 0.5*Y(2) - 0.3*Z(0)Z(2) + 0.2*X(1)")
+
+
+def circuit() -> tq.QCircuit:
+	a = tq.Variable("a")
+	# an objective angle and a variable shared by two gates, both need the chain rule
+	return create_hardware_ansatz(2, 1) + tq.gates.Ry(2 * a + 0.1, 1) + tq.gates.Rx(a, 2)
+
+
+def symbolic_gradient(gradient: ParameterShiftGradient, point: np.ndarray) -> np.ndarray:
+	objective = tq.ExpectationValue(H=HAMILTONIAN, U=gradient.circuit)
+	values = gradient.to_dict(point)
+	return np.array([
+		tq.simulate(tq.grad(objective, variable), variables=values, backend="symbolic")
+		for variable in gradient.variables
+	])
+
+
+def test_gradients_match_symbolic():
+	gradient = ParameterShiftGradient(HAMILTONIAN, circuit(), batch_size=5)
+	points = np.random.default_rng(0).uniform(-np.pi, np.pi, (2, len(gradient.variables)))
+	gradients = gradient.gradients(points)
+	assert gradients.shape == points.shape
+	for point, result in zip(points, gradients):
+		assert result == pytest.approx(symbolic_gradient(gradient, point), abs=1e-10)
+
+
+def test_energies_match_symbolic():
+	gradient = ParameterShiftGradient(HAMILTONIAN, circuit())
+	point = np.linspace(-1, 1, len(gradient.variables))
+	objective = tq.ExpectationValue(H=HAMILTONIAN, U=gradient.circuit)
+	assert gradient.energies(point)[0] == pytest.approx(
+		tq.simulate(objective, variables=gradient.to_dict(point), backend="symbolic"), abs=1e-10
+	)
+	assert gradient.to_array(gradient.to_dict(point)) == pytest.approx(point)
+
+
+def test_worker_pool_matches_this_process():
+	gradient = ParameterShiftGradient(HAMILTONIAN, circuit(), batch_size=4)
+	points = np.random.default_rng(1).uniform(-np.pi, np.pi, (3, len(gradient.variables)))
+	with ParameterShiftGradient(HAMILTONIAN, circuit(), batch_size=4, processes=2) as parallel:
+		assert parallel.gradients(points) == pytest.approx(gradient.gradients(points), abs=1e-12)
+		assert parallel._executor is not None
+	assert parallel._executor is None
+
+
+def test_optimizer_in_compute():
+	hamiltonian = tq.paulis.Z(0) + 0.5 * tq.paulis.X(0)
+	result = compute(hamiltonian, tq.gates.Ry("a", 0), ParameterShiftOptimizer(), 0.1, backend="numpy")
+	assert result.energy == pytest.approx(-(1.25 ** 0.5), abs=1e-8)
+	assert len(result.history.energies) == len(result.history.gradients) > 0
+	with pytest.raises(ValueError):
+		compute(hamiltonian, tq.gates.Ry("a", 0), ParameterShiftOptimizer(), 0.1, backend="qulacs")
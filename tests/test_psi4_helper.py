@@ -0,0 +1,92 @@
+import os
+import time
+
+import pytest
+import tequila as tq
+
+from helpinghand.psi4_helper import (
+	POINT_APPROXIMATED,
+	POINT_FAILED,
+	POINT_OK,
+	scan_psi4_distances
+)
+
+
+class FakeMolecule:
+	"""Stands in for a psi4 molecule, the energy is the distance."""
+	def __init__(self, distance: float):
+		self.distance = distance
+
+	def make_hamiltonian(self) -> tq.QubitHamiltonian:
+		return self.distance * tq.paulis.Z(0)
+
+	def compute_energy(self, method: str) -> float:
+		return self.distance
+
+
+def working(distance):
+	return FakeMolecule(distance)
+
+
+def fails_exactly_at_one(distance):
+	if distance == 1.0:
+		raise SystemError("psi4 did not converge")
+	return FakeMolecule(distance)
+
+
+def always_fails(distance):
+	raise SystemError("psi4 did not converge")
+
+
+def broken_creator(distance):
+	raise TypeError("not a molecule")
+
+
+def hangs_at_one(distance):
+	if distance == 1.0:
+		time.sleep(60)
+	return FakeMolecule(distance)
+
+
+def crashes_at_one(distance):
+	if distance == 1.0:
+		os._exit(3)
+	return FakeMolecule(distance)
+
+
+def test_ok_points():
+	points = scan_psi4_distances(working, [0.5, 1.0], processes=2, retries=2)
+	assert [point.status for point in points] == [POINT_OK, POINT_OK]
+	assert [point.fci_energy for point in points] == [0.5, 1.0]
+	assert points[1].hamiltonian == tq.paulis.Z(0)
+
+
+@pytest.mark.parametrize("creator", [fails_exactly_at_one, crashes_at_one])
+def test_approximated_point(creator):
+	points = scan_psi4_distances(creator, [0.5, 1.0], processes=2, retries=2, step=0.01)
+	assert points[0].status == POINT_OK
+	assert points[1].status == POINT_APPROXIMATED
+	assert points[1].computed_distance == pytest.approx(0.99)
+	assert len(points[1].errors) == 1
+
+
+def test_failed_point_after_retries():
+	point, = scan_psi4_distances(always_fails, [1.0], processes=2, retries=2)
+	assert point.status == POINT_FAILED
+	assert point.hamiltonian is None
+	assert len(point.errors) == 3
+
+
+def test_other_exceptions_are_not_retried():
+	point, = scan_psi4_distances(broken_creator, [1.0], processes=2, retries=2)
+	assert point.status == POINT_FAILED
+	assert len(point.errors) == 1
+	assert "TypeError" in point.errors[0]
+
+
+def test_timeout_is_retried():
+	start = time.monotonic()
+	point, = scan_psi4_distances(hangs_at_one, [1.0], processes=2, timeout=2, retries=1, step=0.01)
+	assert time.monotonic() - start < 30
+	assert point.status == POINT_APPROXIMATED
+	assert "timed out" in point.errors[0]
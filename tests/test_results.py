@@ -0,0 +1,42 @@
+import numpy as np
+import pytest
+import tequila as tq
+
+from helpinghand.gradient import get_max_from_result
+from helpinghand.results import CompactResults
+
+
+@pytest.fixture(scope="module")
+def results():
+	circuit = tq.gates.Ry("a", 0) + tq.gates.Rx("b", 1)
+	return [
+		tq.minimize(
+			tq.ExpectationValue(H=tq.paulis.Z(0) + scale * tq.paulis.Z(1), U=circuit),
+			initial_values={"a": 0.3, "b": 0.2}, method="BFGS", silent=True
+		)
+		for scale in (0.5, 1.0)
+	]
+
+
+def test_runs_keep_their_history(results):
+	compact = CompactResults.from_results(iter(results))
+	assert len(compact) == 2
+	assert list(compact.variables) == ["a", "b"]
+	for run, result in enumerate(results):
+		assert np.allclose(compact[run].energies, result.history.energies)
+		assert compact[run].final_energies[0] == pytest.approx(result.energy)
+		assert compact[run].max_gradients().tolist() == pytest.approx(get_max_from_result(result))
+	assert get_max_from_result(compact[-1]) == pytest.approx(get_max_from_result(results[-1]))
+	with pytest.raises(IndexError):
+		compact[2]
+
+
+@pytest.mark.parametrize("name", ["results.npz", "results"])
+def test_save_and_load(results, tmp_path, name):
+	compact = CompactResults.from_results(results)
+	path = str(tmp_path / name)
+	compact.save(path)
+	loaded = CompactResults.load(path, mmap_mode="r")
+	assert np.array_equal(loaded.gradients, compact.gradients)
+	assert np.array_equal(loaded.energy_offsets, compact.energy_offsets)
+	assert list(loaded.variables) == list(compact.variables)
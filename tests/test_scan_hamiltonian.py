@@ -0,0 +1,62 @@
+import numpy as np
+import pytest
+import tequila as tq
+
+from helpinghand.hardware_ansatz import create_hardware_ansatz
+from helpinghand.scan_hamiltonian import ScanHamiltonian
+
+
+def scan():
+	return [
+		tq.QubitHamiltonian.from_string(
+			f"{distance}*X(0)Y(1) + 0.5*Y(2) - 0.3*Z(0)Z(2) + {distance ** 2}*Z(1)"
+		)
+		for distance in (0.5, 1.0, 1.5)
+	] + [tq.QubitHamiltonian.from_string("0.2*X(0)X(1)X(2) + 0.1*Y(0)Z(1)")]
+
+
+def symbolic_state():
+	circuit = create_hardware_ansatz(3, 1)
+	values = {variable: 0.1 * i + 0.2 for i, variable in enumerate(circuit.extract_variables())}
+	return circuit, values, tq.simulate(circuit, variables=values, backend="symbolic")
+
+
+def test_indexing_gives_the_hamiltonians_back():
+	hamiltonians = scan()
+	shared = ScanHamiltonian.from_hamiltonians(hamiltonians, distances=[0.5, 1.0, 1.5, 2.0])
+	assert len(shared) == 4
+	# six distinct pauli strings over all points
+	assert shared.n_terms == 6
+	assert [str(hamiltonian) for hamiltonian in shared] == [str(h) for h in hamiltonians]
+	assert shared.distances.tolist() == [0.5, 1.0, 1.5, 2.0]
+
+
+def test_energies_match_symbolic():
+	hamiltonians = scan()
+	circuit, values, state = symbolic_state()
+	energies = ScanHamiltonian.from_hamiltonians(hamiltonians).energies(state)
+	expected = [
+		tq.simulate(tq.ExpectationValue(H=hamiltonian, U=circuit), variables=values, backend="symbolic")
+		for hamiltonian in hamiltonians
+	]
+	assert energies == pytest.approx(expected, abs=1e-10)
+
+
+def test_term_values_match_symbolic():
+	shared = ScanHamiltonian.from_hamiltonians(scan())
+	circuit, values, state = symbolic_state()
+	x, z = shared.paulis()
+	for term, value in enumerate(shared.term_expectation_values(state.to_array())):
+		coefficients = np.zeros(shared.n_terms)
+		coefficients[term] = 1
+		single = ScanHamiltonian(shared.x_bits, shared.z_bits, coefficients[None], shared.n_qubits)[0]
+		expected = tq.simulate(
+			tq.ExpectationValue(H=single, U=circuit), variables=values, backend="symbolic"
+		)
+		assert value == pytest.approx(expected, abs=1e-10)
+
+
+def test_state_size_is_checked():
+	shared = ScanHamiltonian.from_hamiltonians(scan())
+	with pytest.raises(ValueError):
+		shared.term_expectation_values(np.ones(4))
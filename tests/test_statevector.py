@@ -0,0 +1,63 @@
+import numpy as np
+import pytest
+import tequila as tq
+
+from helpinghand import statevector
+from helpinghand.hardware_ansatz import create_hardware_ansatz
+
+HAMILTONIAN = tq.QubitHamiltonian.from_string("1.0*X(0)Y(1) + 0.5*Y(2) - 0.3*Z(0)Z(2) + 0.2*X(1)")
+
+
+def circuit() -> tq.QCircuit:
+	mixed = tq.gates.H(0) + tq.gates.CNOT(0, 2) + tq.gates.Rz("c", 1) + tq.gates.CZ(1, 2)
+	# the controlled rotation is compiled to CNOTs and single qubit gates
+	controlled = tq.gates.Ry("e", 0, control=1)
+	return create_hardware_ansatz(3, 1) + mixed + tq.gates.Y(1) + tq.gates.Rx("d", 2) + controlled
+
+
+def random_values(objective, seed: int = 0):
+	generator = np.random.default_rng(seed)
+	return {variable: generator.uniform(-np.pi, np.pi) for variable in objective.extract_variables()}
+
+
+def test_statevector_matches_symbolic():
+	U = circuit()
+	values = random_values(U)
+	state = tq.simulate(U, variables=values, backend=statevector.BACKEND)
+	expected = tq.simulate(U, variables=values, backend="symbolic")
+	assert abs(state.inner(expected)) == pytest.approx(1, abs=1e-10)
+	assert state.inner(state) == pytest.approx(1, abs=1e-10)
+
+
+@pytest.mark.parametrize("seed", range(3))
+def test_expectation_value_matches_symbolic(seed):
+	E = tq.ExpectationValue(H=HAMILTONIAN, U=circuit())
+	values = random_values(E, seed)
+	assert tq.simulate(E, variables=values, backend=statevector.BACKEND) == pytest.approx(
+		tq.simulate(E, variables=values, backend="symbolic"), abs=1e-10
+	)
+
+
+def test_gradient_matches_symbolic():
+	E = tq.ExpectationValue(H=HAMILTONIAN, U=circuit())
+	values = random_values(E)
+	for variable in E.extract_variables()[:4]:
+		gradient = tq.grad(E, variable)
+		assert tq.simulate(gradient, variables=values, backend=statevector.BACKEND) == pytest.approx(
+			tq.simulate(gradient, variables=values, backend="symbolic"), abs=1e-10
+		)
+
+
+def test_batched_states_match_single_states():
+	U = tq.compile(circuit(), backend=statevector.BACKEND)
+	points = [random_values(circuit(), seed) for seed in range(3)]
+	angles = np.array([U.angles(values) for values in points])
+	states = U.statevectors(angles)
+	for state, values in zip(states, points):
+		assert np.allclose(state, U.statevector(values))
+
+
+def test_sampling_is_refused():
+	E = tq.ExpectationValue(H=HAMILTONIAN, U=circuit())
+	with pytest.raises(tq.TequilaException):
+		tq.simulate(E, variables=random_values(E), samples=10, backend=statevector.BACKEND)
@@ -0,0 +1,68 @@
+import pytest
+import tequila as tq
+
+pytest.importorskip("pytket.routing")
+
+from helpinghand.analyse import CircuitArrays, SwapEstimator  # noqa: E402
+from helpinghand.architectures import architecture_info  # noqa: E402
+
+
+def chain(qubits: int) -> tq.QCircuit:
+	circuit = tq.QCircuit()
+	for qubit in range(qubits - 1):
+		circuit += tq.gates.CNOT(qubit, qubit + 1)
+	return circuit
+
+
+def star(qubits: int) -> tq.QCircuit:
+	circuit = tq.QCircuit()
+	for qubit in range(1, qubits):
+		circuit += tq.gates.CNOT(0, qubit)
+	return circuit
+
+
+def counted_swaps(estimate, circuit, info):
+	pairs, _ = SwapEstimator.interactions(CircuitArrays.from_tequila(circuit))
+	return sum(
+		max(info.distance(estimate.placement[first], estimate.placement[second]) - 1, 0)
+		for first, second in pairs.tolist()
+	)
+
+
+def test_chain_fits_a_line_without_swaps():
+	estimate = SwapEstimator("line", 6)(chain(6))
+	assert estimate.swaps == 0
+	assert estimate.cx_count == 5
+	assert estimate.cx_depth == 5
+	assert sorted(estimate.placement.values()) == list(range(6))
+
+
+def test_all_to_all_needs_no_swaps():
+	estimate = SwapEstimator("all_to_all", 5)(star(5) + chain(5))
+	assert estimate.swaps == 0
+
+
+@pytest.mark.parametrize("anneal_steps", [0, 500])
+def test_estimate_matches_its_placement(anneal_steps):
+	info = architecture_info("melbourne")
+	circuit = star(8) + chain(8)
+	estimate = SwapEstimator(info, anneal_steps=anneal_steps, seed=1)(circuit)
+	assert len(set(estimate.placement.values())) == 8
+	assert estimate.swaps == counted_swaps(estimate, circuit, info)
+	assert estimate.swaps > 0
+	assert estimate.cx_count == 14 + 3 * estimate.swaps
+
+
+def test_annealing_is_not_worse():
+	circuit = star(10) + chain(10)
+	greedy = SwapEstimator("falcon")(circuit)
+	annealed = SwapEstimator("falcon", anneal_steps=2000, seed=0)(circuit)
+	assert annealed.swaps <= greedy.swaps
+
+
+def test_rank_and_size_check():
+	estimator = SwapEstimator("ourense")
+	ranking = estimator.rank([star(5), chain(3)])
+	assert [index for index, _ in ranking] == [1, 0]
+	with pytest.raises(ValueError):
+		estimator(chain(6))
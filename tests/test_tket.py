@@ -0,0 +1,59 @@
+import numpy as np
+import pytest
+import tequila as tq
+
+pytest.importorskip("pytket")
+
+from helpinghand.hardware_ansatz import create_hardware_ansatz  # noqa: E402
+from helpinghand.tket import TketTemplate, from_tket, tket_template, to_tket  # noqa: E402
+
+
+def fidelity(circuit: tq.QCircuit, reference: tq.QCircuit, variables=None) -> float:
+	state = tq.simulate(circuit, backend="symbolic")
+	expected = tq.simulate(reference, variables=variables, backend="symbolic")
+	return abs(state.inner(expected)) ** 2
+
+
+def test_round_trip_keeps_the_state():
+	circuit = create_hardware_ansatz(3, 1)
+	values = {variable: 0.1 * (i + 1) for i, variable in enumerate(circuit.extract_variables())}
+	bound = circuit.map_variables(values)
+	assert fidelity(from_tket(to_tket(bound)), circuit, values) == pytest.approx(1, abs=1e-10)
+
+
+def test_bind_matches_conversion_of_the_bound_circuit():
+	circuit = create_hardware_ansatz(3, 1)
+	template = TketTemplate(circuit)
+	angles = np.linspace(0.1, 1.5, len(template.variables))
+	values = dict(zip(template.variables, angles))
+	for bound in [template.bind(values), template.bind(angles)]:
+		assert not bound.free_symbols()
+		assert fidelity(from_tket(bound), circuit, values) == pytest.approx(1, abs=1e-10)
+
+
+def test_bind_many_binds_every_row():
+	template = TketTemplate(create_hardware_ansatz(2, 1))
+	rows = np.random.default_rng(0).uniform(0, np.pi, (3, len(template.variables)))
+	circuits = template.bind_many(rows)
+	assert [circuit.get_commands() for circuit in circuits] == [
+		template.bind(row).get_commands() for row in rows
+	]
+	with pytest.raises(ValueError):
+		template.bind_many(rows[:, 1:])
+	with pytest.raises(ValueError):
+		template.bind(rows[0, 1:])
+
+
+def test_objective_parameters_are_evaluated():
+	a = tq.Variable("a")
+	circuit = tq.gates.Ry(a, 0) + tq.gates.Rx(2 * a, 1)
+	template = TketTemplate(circuit)
+	assert [variable.name for variable in template.variables] == ["a"]
+	bound = from_tket(template.bind({"a": 0.3}))
+	assert fidelity(bound, circuit, {"a": 0.3}) == pytest.approx(1, abs=1e-10)
+
+
+def test_templates_are_shared_by_equal_circuits():
+	template = tket_template(create_hardware_ansatz(2, 1))
+	assert tket_template(create_hardware_ansatz(2, 1)) is template
+	assert tket_template(create_hardware_ansatz(2, 2)) is not template